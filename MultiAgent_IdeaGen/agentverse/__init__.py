@@ -9,6 +9,7 @@ from .environments.simulation_env.rules.visibility import visibility_registry
 from .simulation import Simulation
 from .initialization import (
     prepare_task_config,
+    build_task_config,
     load_agent,
     load_environment,
     load_llm,
@@ -6,4 +6,14 @@ agent_registry = Registry(name="AgentRegistry")
 
 from .base import BaseAgent
 from agentverse.agents.simulation_agent.conversation import ConversationAgent
-from agentverse.agents.simulation_agent.tool import ToolAgent
+
+# Needs langchain, imported on first use
+agent_registry.register_lazy("tool", "agentverse.agents.simulation_agent.tool:ToolAgent")
+
+
+def __getattr__(name):
+    if name == "ToolAgent":
+        from agentverse.agents.simulation_agent.tool import ToolAgent
+
+        return ToolAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,6 @@
 import logging
 from abc import abstractmethod
-from typing import List, NamedTuple, Set, Union
-from string import Template
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Union
 
 from pydantic import BaseModel, Field
 from agentverse.llms import BaseLLM
@@ -10,6 +9,12 @@ from agentverse.logging import logger
 from agentverse.llms.utils import count_string_tokens
 from agentverse.memory import BaseMemory, ChatHistoryMemory
 from agentverse.message import Message
+from agentverse.utils import fill_template
+from agentverse.agents.context_budget import (
+    TokenReport,
+    fill_prompt_within_budget,
+    prompt_budget,
+)
 from agentverse.output_parser import OutputParser
 from agentverse.memory_manipulator import BaseMemoryManipulator
 
@@ -29,6 +34,10 @@ class BaseAgent(BaseModel):
     max_retry: int = Field(default=3)
     receiver: Set[str] = Field(default=set({"all"}))
     async_mode: bool = Field(default=True)
+    # Keep the prompt within the model's context window (see context_budget)
+    context_budget: bool = Field(default=True)
+    max_prompt_tokens: Optional[int] = Field(default=None)
+    last_token_report: Optional[TokenReport] = Field(default=None)
 
     @abstractmethod
     def step(self, env_description: str = "") -> Message:
@@ -60,10 +69,8 @@ class BaseAgent(BaseModel):
         return two_trailing
 
     def get_all_prompts(self, **kwargs):
-        prepend_prompt = Template(self.prepend_prompt_template).safe_substitute(
-            **kwargs
-        )
-        append_prompt = Template(self.append_prompt_template).safe_substitute(**kwargs)
+        prepend_prompt = fill_template(self.prepend_prompt_template, kwargs)
+        append_prompt = fill_template(self.append_prompt_template, kwargs)
 
         # TODO: self.llm.args.model is not generalizable
         num_prepend_prompt_token = count_string_tokens(
@@ -79,6 +86,39 @@ class BaseAgent(BaseModel):
             num_prepend_prompt_token + num_append_prompt_token,
         )
 
+    def _fill_within_budget(self, input_arguments: Dict[str, Any]) -> str:
+        """Fill the prompt template, dropping the oldest turns and then truncating
+        the tool observations if the prompt would not fit the context window"""
+        if not self.context_budget or not isinstance(self.memory, ChatHistoryMemory):
+            return fill_template(self.prompt_template, input_arguments)
+        model = getattr(self.llm.args, "model", "")
+        budget = prompt_budget(
+            model, getattr(self.llm.args, "max_tokens", 0), self.max_prompt_tokens
+        )
+        prompt, report = fill_prompt_within_budget(
+            self.prompt_template,
+            input_arguments,
+            self.memory.history(),
+            model,
+            budget,
+            summary=self.memory.summary if self.memory.has_summary else "",
+            full_history=input_arguments.get("chat_history"),
+        )
+        self.last_token_report = report
+        logger.debug(
+            f"{self.name} prompt tokens: {report.total}/{report.budget} "
+            f"(fixed {report.fixed}, history {report.history} in "
+            f"{report.history_messages} messages, summary {report.summary}, "
+            f"observations {report.observations})"
+        )
+        if report.trimmed:
+            logger.warn(
+                f"{self.name}'s prompt exceeds {report.budget} tokens: dropped "
+                f"{report.dropped_messages} old messages, truncated "
+                f"{report.truncated_observations or 'no observations'}"
+            )
+        return prompt
+
     def get_receiver(self) -> Set[str]:
         return self.receiver
 
@@ -0,0 +1,200 @@
+"""
+Fit an agent's prompt into the context window of its model.
+
+The prompt is filled by priority: the template with the role and
+instructions always, then the most recent turns of the chat history, the
+memory's running summary of older turns when it has one, and finally the
+tool observations, which are truncated to what is left. When everything
+fits, the prompt is exactly the one the template would give.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from agentverse.llms.utils import count_rendered_message_tokens, count_string_tokens
+from agentverse.logging import logger
+from agentverse.memory.chat_history import SUMMARY_TEMPLATE
+from agentverse.memory.transcript import render_message
+from agentverse.message import Message
+from agentverse.utils import fill_template
+
+# Context window (prompt + completion) in tokens, matched by model name prefix
+MODEL_CONTEXT_LENGTHS = {
+    "deepseek-r1": 65536,
+    "deepseek-reasoner": 65536,
+    "deepseek-v3": 65536,
+    "deepseek-chat": 65536,
+    "o1-mini": 128000,
+    "o1": 200000,
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4-32k": 32768,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo-16k": 16385,
+    "gpt-3.5-turbo": 16385,
+    "qwen": 32768,
+    "llama-2": 4096,
+    "vicuna": 4096,
+}
+DEFAULT_CONTEXT_LENGTH = 8192
+# Slack for tokenizer mismatch and the chat format overhead
+SAFETY_MARGIN = 256
+# Prompt tokens kept when max_tokens leaves less of the context window (at
+# most half of it), instead of a budget that would drop the whole history
+MIN_PROMPT_BUDGET = 2048
+
+_warned_budgets = set()
+
+TRUNCATION_MARK = "\n[... truncated to fit the context window]"
+
+
+def get_context_length(model: str) -> int:
+    name = model.lower()
+    # The longest matching prefix wins, e.g. gpt-4o over gpt-4
+    matches = [prefix for prefix in MODEL_CONTEXT_LENGTHS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_LENGTH
+    return MODEL_CONTEXT_LENGTHS[max(matches, key=len)]
+
+
+class TokenReport(BaseModel):
+    """How the prompt budget of one turn was spent"""
+
+    model: str
+    budget: int
+    fixed: int = 0
+    history: int = 0
+    history_messages: int = 0
+    dropped_messages: int = 0
+    summary: int = 0
+    observations: int = 0
+    truncated_observations: List[str] = []
+
+    @property
+    def total(self) -> int:
+        return self.fixed + self.history + self.summary + self.observations
+
+    @property
+    def trimmed(self) -> bool:
+        return self.dropped_messages > 0 or len(self.truncated_observations) > 0
+
+
+def _truncate(text: str, max_tokens: int, model: str) -> str:
+    if max_tokens <= 0:
+        return ""
+    tokens = count_string_tokens(text, model)
+    if tokens <= max_tokens:
+        return text
+    # Cut proportionally, then shrink until it fits
+    length = int(len(text) * max_tokens / tokens)
+    while length > 0:
+        candidate = text[:length] + TRUNCATION_MARK
+        if count_string_tokens(candidate, model) <= max_tokens:
+            return candidate
+        length = int(length * 0.9)
+    return ""
+
+
+def fill_prompt_within_budget(
+    template: str,
+    arguments: Dict[str, Any],
+    history: List[Message],
+    model: str,
+    budget: int,
+    summary: str = "",
+    history_key: str = "chat_history",
+    observation_keys: Tuple[str, ...] = ("tool_observation",),
+    full_history: Optional[str] = None,
+) -> Tuple[str, TokenReport]:
+    """Fill `template` with `arguments` and the rendered `history` within `budget` tokens.
+
+    `arguments[history_key]` is ignored, the history is rendered from
+    `summary` and `history` (or taken from `full_history`, which must include
+    the summary, when it all fits). Arguments named in `observation_keys`
+    are the first to go.
+    """
+    report = TokenReport(model=model, budget=budget)
+    observations = {k: str(arguments[k]) for k in observation_keys if k in arguments}
+    fixed_arguments = {
+        **{k: v for k, v in arguments.items() if k not in observations},
+        history_key: "",
+        **{k: "" for k in observations},
+    }
+    report.fixed = count_string_tokens(fill_template(template, fixed_arguments), model)
+
+    # One extra token per message for the line break joining the history
+    history_tokens = [count_rendered_message_tokens(m, model) + 1 for m in history]
+    observation_tokens = {k: count_string_tokens(v, model) for k, v in observations.items()}
+    summary_text = SUMMARY_TEMPLATE.format(summary=summary) if summary else ""
+    summary_tokens = count_string_tokens(summary_text, model) + 1 if summary else 0
+
+    remaining = budget - report.fixed
+    if (
+        sum(history_tokens) + summary_tokens + sum(observation_tokens.values())
+        <= remaining
+    ):
+        kept = len(history)
+        report.history = sum(history_tokens)
+        report.summary = summary_tokens
+        report.observations = sum(observation_tokens.values())
+        if full_history is None:
+            full_history = "\n".join(
+                ([summary_text] if summary_text else [])
+                + [render_message(m, True) for m in history]
+            )
+        history_text = full_history
+        summary_text = ""
+    else:
+        # Most recent turns first
+        kept = 0
+        for tokens in reversed(history_tokens):
+            if report.history + tokens > remaining:
+                break
+            report.history += tokens
+            kept += 1
+        remaining -= report.history
+        if summary_tokens <= remaining:
+            report.summary = summary_tokens
+            remaining -= summary_tokens
+        else:
+            summary_text = ""
+        history_text = "\n".join(
+            [render_message(m, True) for m in history[len(history) - kept :]]
+        )
+        for key, value in observations.items():
+            if observation_tokens[key] > remaining:
+                value = _truncate(value, remaining, model)
+                observations[key] = value
+                report.truncated_observations.append(key)
+                observation_tokens[key] = count_string_tokens(value, model)
+            report.observations += observation_tokens[key]
+            remaining -= observation_tokens[key]
+
+    report.history_messages = kept
+    report.dropped_messages = len(history) - kept
+    if summary_text:
+        history_text = f"{summary_text}\n{history_text}" if history_text else summary_text
+    prompt = fill_template(
+        template, {**arguments, **observations, history_key: history_text}
+    )
+    return prompt, report
+
+
+def prompt_budget(model: str, max_tokens: int, max_prompt_tokens: Optional[int] = None) -> int:
+    """Tokens available to the prompt once the completion is reserved"""
+    if max_prompt_tokens is not None:
+        return max_prompt_tokens
+    context_length = get_context_length(model)
+    budget = context_length - max_tokens - SAFETY_MARGIN
+    floor = min(MIN_PROMPT_BUDGET, context_length // 2)
+    if budget >= floor:
+        return budget
+    if (model, max_tokens) not in _warned_budgets:
+        _warned_budgets.add((model, max_tokens))
+        logger.warn(
+            f"max_tokens {max_tokens} leaves {budget} of the {context_length} tokens of "
+            f"{model or 'the model'}'s context window to the prompt, budgeting {floor} "
+            "prompt tokens instead. Lower max_tokens or set max_prompt_tokens."
+        )
+    return floor
@@ -1,8 +1,16 @@
 from .conversation import ConversationAgent
-from .tool import ToolAgent
 
 
 __all__ = [
     "ConversationAgent",
     "ToolAgent",
 ]
+
+
+def __getattr__(name):
+    # Needs langchain, imported on first use
+    if name == "ToolAgent":
+        from .tool import ToolAgent
+
+        return ToolAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,10 +4,11 @@ from colorama import Fore
 # import logging
 from agentverse.logging import get_logger
 import bdb
-from string import Template
 from typing import TYPE_CHECKING, List
 
+from agentverse.llms.utils.response_cache import CacheMissError
 from agentverse.message import Message
+from agentverse.tracing import current_span
 
 # from . import agent_registry
 # from .base import BaseAgent
@@ -28,11 +29,13 @@ class ConversationAgent(BaseAgent):
                 response = self.llm.generate_response(prompt)
                 parsed_response = self.output_parser.parse(response)
                 break
-            except KeyboardInterrupt:
+            except (KeyboardInterrupt, CacheMissError):
+                # A replayed run must not go on without the missing response
                 raise
             except Exception as e:
                 logger.error(e)
                 logger.warn("Retrying...")
+                current_span().add("retries", 1)
                 continue
 
         if parsed_response is None:
@@ -61,11 +64,12 @@ class ConversationAgent(BaseAgent):
                 #              f" {response.content}")
                 parsed_response = self.output_parser.parse(response)
                 break
-            except (KeyboardInterrupt, bdb.BdbQuit):
+            except (KeyboardInterrupt, bdb.BdbQuit, CacheMissError):
                 raise
             except Exception as e:
                 logger.error(e)
                 logger.warn("Retrying...")
+                current_span().add("retries", 1)
                 continue
 
         if parsed_response is None:
@@ -97,7 +101,7 @@ class ConversationAgent(BaseAgent):
             "chat_history": self.memory.to_string(add_sender_prefix=True),
             **extra_vars,
         }
-        return Template(self.prompt_template).safe_substitute(input_arguments)
+        return self._fill_within_budget(input_arguments)
 
     def add_message_to_memory(self, messages: List[Message]) -> None:
         self.memory.add_message(messages)
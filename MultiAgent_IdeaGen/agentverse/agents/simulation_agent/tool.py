@@ -1,14 +1,15 @@
-from string import Template
 from typing import List, NamedTuple, Optional, Union
 
 from langchain.tools import BaseTool
 from pydantic import Field
 
 
+from agentverse.llms.utils.response_cache import CacheMissError
 from agentverse.memory import BaseMemory, ChatHistoryMemory
 from agentverse.message import Message
 from agentverse.utils import AgentAction, AgentFinish
 from agentverse.logging import logger
+from agentverse.tracing import current_span, span
 
 # from . import agent_registry
 # from .base import BaseAgent
@@ -50,9 +51,13 @@ class ToolAgent(BaseAgent):
                             + f"\nObservation: {observation.strip()}"
                         )
                     break
+                except CacheMissError:
+                    # A replayed run must not go on without the missing response
+                    raise
                 except BaseException as e:
                     logger.error(e)
                     logger.warn("Retrying...")
+                    current_span().add("retries", 1)
                     continue
             if parsed_response is None or isinstance(parsed_response, AgentFinish):
                 break
@@ -92,9 +97,12 @@ class ToolAgent(BaseAgent):
                             + f"\nObservation: {observation.strip()}"
                         )
                     break
+                except CacheMissError:
+                    raise
                 except BaseException as e:
                     logger.error(e)
                     logger.warn("Retrying...")
+                    current_span().add("retries", 1)
                     continue
             if parsed_response is None or isinstance(parsed_response, AgentFinish):
                 break
@@ -119,7 +127,8 @@ class ToolAgent(BaseAgent):
         if response.tool not in name_to_tool:
             raise ToolNotExistError(response.tool)
         tool = name_to_tool[response.tool]
-        observation = tool.run(response.tool_input, verbose=self.verbose)
+        with span("tool_call", tool=response.tool):
+            observation = tool.run(response.tool_input, verbose=self.verbose)
         return observation
 
     async def _acall_tool(self, response: NamedTuple) -> str:
@@ -128,7 +137,8 @@ class ToolAgent(BaseAgent):
         if response.tool not in name_to_tool:
             raise ToolNotExistError(response.tool)
         tool = name_to_tool[response.tool]
-        observation = await tool.arun(response.tool_input, verbose=self.verbose)
+        with span("tool_call", tool=response.tool):
+            observation = await tool.arun(response.tool_input, verbose=self.verbose)
         return observation
 
     def _update_tool_memory(self, tool_observation: List[str]):
@@ -167,7 +177,7 @@ class ToolAgent(BaseAgent):
             "tool_names": tool_names,
             "tool_observation": "\n".join(tool_observation),
         }
-        return Template(self.prompt_template).safe_substitute(input_arguments)
+        return self._fill_within_budget(input_arguments)
 
     def add_message_to_memory(self, messages: List[Message]) -> None:
         self.memory.add_message(messages)
@@ -0,0 +1,270 @@
+"""
+Run many discussions (topics x collaboration patterns x runs) in one process.
+
+Every discussion is an asyncio task on a single event loop, so the LLM calls
+of all runs share the pooled clients and rate limiters instead of each
+`run_dynamic_topic.py --parallel` worker re-importing the whole stack. A
+global semaphore caps the number of discussions in flight, and per-provider
+limits from the manifest are injected into the llm config of every agent.
+"""
+
+import asyncio
+import datetime
+import io
+import json
+import logging
+import os
+import sys
+import time
+import traceback
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+import yaml
+from pydantic import BaseModel, Field
+
+from agentverse.simulation import Simulation, _close_clients_after
+
+TASKS_DIR = os.path.join(os.path.dirname(__file__), "tasks", "simulation")
+
+
+class BatchJob(BaseModel):
+    topic: str
+    pattern: str
+    run_id: int = 0
+
+    @property
+    def prefix(self) -> str:
+        # Same file prefix as the pattern's own run_dynamic_topic.py
+        return "single" if self.pattern.startswith("Solitary") else "multi"
+
+    @property
+    def name(self) -> str:
+        topic_lower = self.topic.lower().replace(" ", "_")
+        return f"{self.prefix}_{topic_lower}_run{self.run_id}"
+
+
+class BatchManifest(BaseModel):
+    """Which discussions to run and how.
+
+    `topics` x `patterns` x `num_runs` is expanded into jobs, and `jobs` lists
+    additional explicit ones. `providers` maps an llm_type (e.g. deepseek) to
+    llm arguments such as requests_per_minute, tokens_per_minute and
+    max_concurrency that are applied to every agent using it.
+    """
+
+    topics: List[str] = Field(default_factory=list)
+    patterns: List[str] = Field(default_factory=list)
+    num_runs: int = 1
+    jobs: List[BatchJob] = Field(default_factory=list)
+    max_concurrency: int = 8
+    providers: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    output_dir: str = "batch_outputs"
+    tasks_dir: str = TASKS_DIR
+    skip_finished: bool = True
+
+    def expand(self) -> List[BatchJob]:
+        jobs = [
+            BatchJob(topic=topic, pattern=pattern, run_id=run_id)
+            for topic in self.topics
+            for pattern in self.patterns
+            for run_id in range(self.num_runs)
+        ]
+        return jobs + list(self.jobs)
+
+
+def load_manifest(path: str) -> BatchManifest:
+    """Load a YAML manifest, or a JSONL file with one job per line.
+
+    A JSONL line may give `num_runs` instead of `run_id` to expand into runs.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if not path.endswith(".jsonl"):
+            return BatchManifest(**(yaml.safe_load(f) or {}))
+        jobs = []
+        for line in f:
+            if not line.strip():
+                continue
+            job = json.loads(line)
+            num_runs = job.pop("num_runs", None)
+            if num_runs is None:
+                jobs.append(BatchJob(**job))
+            else:
+                jobs.extend(BatchJob(**job, run_id=i) for i in range(num_runs))
+        return BatchManifest(jobs=jobs)
+
+
+def load_job_config(
+    job: BatchJob, tasks_dir: str = TASKS_DIR, providers: Optional[Dict] = None
+) -> Dict:
+    """Read the config of the job's pattern with its topic filled in"""
+    config_path = os.path.join(tasks_dir, job.pattern, "config.yaml")
+    if not os.path.exists(config_path):
+        raise ValueError(f"Pattern {job.pattern} has no config.yaml in {tasks_dir}")
+    with open(config_path, "r", encoding="utf-8") as f:
+        config_content = f.read()
+    config_content = config_content.replace("{topic}", job.topic)
+    config_content = config_content.replace("{topic_lower}", job.topic.lower())
+    config = yaml.safe_load(config_content)
+
+    for agent_config in config["agents"]:
+        llm_config = agent_config.get("llm")
+        if not isinstance(llm_config, dict):
+            continue
+        llm_config.update((providers or {}).get(llm_config.get("llm_type"), {}))
+    return config
+
+
+_job_stdout: ContextVar[Optional[io.StringIO]] = ContextVar("job_stdout", default=None)
+
+
+class _JobStdout(io.TextIOBase):
+    """sys.stdout replacement writing to the buffer of the current job.
+
+    redirect_stdout cannot be used with concurrent jobs because it swaps the
+    process-wide stream; the buffer is looked up in a context variable
+    instead, which asyncio copies into the tasks a job spawns.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, s: str) -> int:
+        buffer = _job_stdout.get()
+        return (self.stream if buffer is None else buffer).write(s)
+
+    def flush(self) -> None:
+        if _job_stdout.get() is None:
+            self.stream.flush()
+
+
+# The agentverse logger prints its records, so _JobStdout already routes them
+_PRINTING_LOGGERS = ("TYPER", "LOGGER", "JSON_LOGGER")
+
+
+class _JobLogHandler(logging.Handler):
+    """Root log handler writing the records of the current job to its buffer.
+
+    Standard library loggers (e.g. the rate limiter's) would otherwise write
+    to stderr, outside the job's output; records logged outside a job still
+    go to stderr.
+    """
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+        self.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.name in _PRINTING_LOGGERS:
+            return
+        buffer = _job_stdout.get()
+        try:
+            (self.stream if buffer is None else buffer).write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+
+def _finished_jobs(results_path: str) -> set:
+    finished = set()
+    if not os.path.exists(results_path):
+        return finished
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if result.get("status") == "ok":
+                finished.add((result["pattern"], result["topic"], result["run_id"]))
+    return finished
+
+
+async def _run_job(
+    job: BatchJob,
+    manifest: BatchManifest,
+    semaphore: asyncio.Semaphore,
+    results_path: str,
+) -> Dict[str, Any]:
+    async with semaphore:
+        buffer = io.StringIO()
+        token = _job_stdout.set(buffer)
+        start = time.time()
+        error = None
+        try:
+            config = load_job_config(job, manifest.tasks_dir, manifest.providers)
+            simulation = Simulation.from_config(config, job.pattern)
+            simulation.cache_run = job.name
+            checkpoint_path = os.path.join(
+                manifest.output_dir, job.pattern, "checkpoints", f"{job.name}.json"
+            )
+            simulation.environment.checkpoint_path = checkpoint_path
+            if os.path.exists(checkpoint_path):
+                await simulation.aresume(checkpoint_path)
+            else:
+                await simulation.arun()
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            traceback.print_exc(file=buffer)
+        finally:
+            _job_stdout.reset(token)
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_path = os.path.join(
+        manifest.output_dir, job.pattern, "outputs", f"{job.name}_{timestamp}.txt"
+    )
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(buffer.getvalue())
+
+    result = {
+        "topic": job.topic,
+        "pattern": job.pattern,
+        "run_id": job.run_id,
+        "status": "ok" if error is None else "error",
+        "error": error,
+        "output": output_path,
+        "seconds": round(time.time() - start, 1),
+    }
+    with open(results_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    print(f"[{result['status']}] {job.pattern} / {job.name} -> {output_path}")
+    return result
+
+
+async def arun_batch(manifest: BatchManifest) -> List[Dict[str, Any]]:
+    """Run every job of the manifest, writing each output as soon as it is done.
+
+    Results are appended to `results.jsonl` in the output directory. With
+    `skip_finished`, jobs already recorded as successful there are skipped,
+    so an interrupted sweep can be restarted with the same manifest; the
+    jobs it interrupted continue from their last checkpointed turn.
+    """
+    os.makedirs(manifest.output_dir, exist_ok=True)
+    results_path = os.path.join(manifest.output_dir, "results.jsonl")
+    jobs = manifest.expand()
+    if manifest.skip_finished:
+        finished = _finished_jobs(results_path)
+        jobs = [j for j in jobs if (j.pattern, j.topic, j.run_id) not in finished]
+
+    semaphore = asyncio.Semaphore(max(1, manifest.max_concurrency))
+    stdout = sys.stdout
+    sys.stdout = _JobStdout(stdout)
+    log_handler = _JobLogHandler(sys.stderr)
+    logging.getLogger().addHandler(log_handler)
+    try:
+        return await _close_clients_after(
+            asyncio.gather(
+                *[_run_job(job, manifest, semaphore, results_path) for job in jobs]
+            )
+        )
+    finally:
+        logging.getLogger().removeHandler(log_handler)
+        sys.stdout = stdout
+
+
+def run_batch(manifest: BatchManifest) -> List[Dict[str, Any]]:
+    """Run a batch on a new event loop until every job is done."""
+    return asyncio.run(arun_batch(manifest))
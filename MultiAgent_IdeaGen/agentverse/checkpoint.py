@@ -0,0 +1,178 @@
+"""
+Per-turn checkpoints of a simulation environment.
+
+A checkpoint is one JSON file with everything the next turn depends on: the
+turn counter, the rule parameters and the state of the rule components
+(order, visibility, ...), the state of the `random` module, the last
+messages, the shared transcript and every agent's receivers, memory and
+tool memory, in the order of the environment's agents. A message shared by
+several memories is stored once in a message table and referenced by its
+index.
+
+The same snapshot, taken with `share_messages=True`, is how a discussion is
+forked: the children then reference the parent's message objects instead
+of copies of them.
+"""
+
+import copy
+import json
+import os
+import random
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from agentverse.message import Message, message_from_dict, message_to_dict
+
+if TYPE_CHECKING:
+    from agentverse.environments.base import BaseEnvironment
+
+CHECKPOINT_VERSION = 1
+RULE_COMPONENTS = ("order", "visibility", "selector", "updater", "describer", "terminator")
+
+
+class _MessageTable:
+    def __init__(self, rows: List[Dict] = None):
+        self.rows = rows if rows is not None else []
+        self._index: Dict[int, int] = {}
+        self._decoded: Dict[int, Message] = {}
+
+    def encode(self, message: Message) -> int:
+        key = id(message)
+        if key not in self._index:
+            self._index[key] = len(self.rows)
+            self.rows.append(message_to_dict(message))
+        return self._index[key]
+
+    def decode(self, index: int) -> Message:
+        # The same row gives the same object, so shared messages stay shared
+        if index not in self._decoded:
+            self._decoded[index] = message_from_dict(self.rows[index])
+        return self._decoded[index]
+
+
+class _SharedMessages:
+    """Message "table" of in-memory snapshots, messages are kept as they are"""
+
+    rows = None
+
+    @staticmethod
+    def encode(message: Message) -> Message:
+        return message
+
+    @staticmethod
+    def decode(message: Message) -> Message:
+        return message
+
+
+def environment_state(
+    environment: "BaseEnvironment", share_messages: bool = False
+) -> Dict[str, Any]:
+    """Snapshot the state of `environment`.
+
+    The snapshot is a JSON-serializable dict, unless `share_messages` is set,
+    in which case it references the environment's messages and can only be
+    restored in the same process.
+    """
+    table = _SharedMessages() if share_messages else _MessageTable()
+    rule = {
+        name: json.loads(getattr(environment.rule, name).json())
+        for name in RULE_COMPONENTS
+        if hasattr(environment.rule, name)
+    }
+    # Encode the transcript first, so the table follows the order of the discussion
+    transcript = environment.transcript.state_dict(table.encode)
+    agents = []
+    for agent in environment.agents:
+        state = {
+            "name": agent.name,
+            "receiver": sorted(agent.receiver),
+            "memory": agent.memory.state_dict(table.encode),
+        }
+        if hasattr(agent, "tool_memory"):
+            state["tool_memory"] = agent.tool_memory.state_dict(table.encode)
+        agents.append(state)
+    return {
+        "version": CHECKPOINT_VERSION,
+        "cnt_turn": environment.cnt_turn,
+        "max_turns": environment.max_turns,
+        "rule_params": copy.deepcopy(environment.rule_params),
+        "rule": rule,
+        "random_state": environment.get_random_state(),
+        "transcript": transcript,
+        "last_messages": [table.encode(m) for m in environment.last_messages],
+        "agents": agents,
+        "messages": table.rows,
+    }
+
+
+def restore_environment(
+    environment: "BaseEnvironment",
+    state: Dict[str, Any],
+    random_state: Optional[tuple] = None,
+) -> None:
+    """Bring `environment` back to a state returned by `environment_state`.
+
+    `random_state` replaces the saved state of the environment's random stream.
+    """
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {state.get('version')}")
+    if state["messages"] is None:
+        table = _SharedMessages()
+    else:
+        table = _MessageTable(state["messages"])
+
+    environment.cnt_turn = state["cnt_turn"]
+    environment.rule_params = copy.deepcopy(state["rule_params"])
+    for name, fields in state["rule"].items():
+        component = getattr(environment.rule, name)
+        # Parse through the model, so that e.g. sets come back as sets
+        restored = type(component).parse_obj(fields)
+        for field in restored.__fields__:
+            setattr(component, field, getattr(restored, field))
+    if random_state is None:
+        version, internal, gauss = state["random_state"]
+        random_state = (version, tuple(internal), gauss)
+    environment.set_random_state(random_state)
+
+    environment.transcript.load_state_dict(state["transcript"], table.decode)
+    environment.last_messages = [table.decode(i) for i in state["last_messages"]]
+    # Agents are matched by position, names are not unique: the final tool
+    # agent of a config usually takes the name of a discussion agent
+    if len(state["agents"]) != len(environment.agents):
+        raise ValueError(
+            f"Checkpoint has {len(state['agents'])} agents, the environment {len(environment.agents)}"
+        )
+    for agent, agent_state in zip(environment.agents, state["agents"]):
+        if agent.name != agent_state["name"]:
+            raise ValueError(
+                f"Checkpoint has agent {agent_state['name']} where the environment has {agent.name}"
+            )
+        agent.set_receiver(set(agent_state["receiver"]))
+        agent.memory.load_state_dict(agent_state["memory"], table.decode)
+        if "tool_memory" in agent_state and hasattr(agent, "tool_memory"):
+            agent.tool_memory.load_state_dict(agent_state["tool_memory"], table.decode)
+
+
+def save_checkpoint(environment: "BaseEnvironment", path: str) -> None:
+    """Write the state of `environment` to `path` atomically"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(environment_state(environment), f, ensure_ascii=False, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    # A crash mid-write leaves the previous checkpoint intact
+    os.replace(tmp_path, path)
+
+
+def fork_random_states(state: tuple, num_children: int) -> List[tuple]:
+    """Independent random states for the children of a fork, derived from `state`"""
+    parent = random.Random()
+    parent.setstate(state)
+    return [random.Random(parent.getrandbits(64)).getstate() for _ in range(num_children)]
+
+
+def load_checkpoint(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -1,10 +1,15 @@
 from __future__ import annotations
 from agentverse.logging import logger
+from agentverse.llms.utils.response_cache import get_response_cache
+from agentverse.memory.transcript import Transcript
 
+import random
+import sys
 from abc import abstractmethod
-from typing import TYPE_CHECKING, Any, Dict, List
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, PrivateAttr
 
 # from agentverse.agents.agent import Agent
 
@@ -28,6 +33,9 @@ class BaseEnvironment(BaseModel):
         cnt_turn: Current turn number
         last_messages: Messages from last turn
         rule_params: Variables set by the rule
+        transcript: Shared log of all the messages of the environment
+        checkpoint_path: File the state is saved to after every turn, if set
+        seed: Seed of the environment's random stream (default: drawn from `random`)
     """
 
     agents: List[BaseAgent]
@@ -36,6 +44,10 @@ class BaseEnvironment(BaseModel):
     cnt_turn: int = 0
     last_messages: List[Message] = []
     rule_params: Dict = {}
+    transcript: Transcript = Field(default_factory=Transcript)
+    checkpoint_path: Optional[str] = None
+    seed: Optional[int] = None
+    _random_state: Optional[Tuple] = PrivateAttr(default=None)
 
     @abstractmethod
     async def step(self) -> List[Message]:
@@ -47,11 +59,63 @@ class BaseEnvironment(BaseModel):
         """Reset the environment"""
         pass
 
+    def attach_transcript(self) -> None:
+        """Let the agents whose memory is a transcript view read this environment's log"""
+        for i, agent in enumerate(self.agents):
+            if hasattr(agent.memory, "attach"):
+                # Agents may share a name, their private messages are kept apart by index
+                agent.memory.attach(self.transcript, agent.name, i)
+
+    def get_random_state(self) -> Tuple:
+        if self._random_state is None:
+            seed = self.seed if self.seed is not None else random.getrandbits(64)
+            self._random_state = random.Random(seed).getstate()
+        return self._random_state
+
+    def set_random_state(self, state: Tuple) -> None:
+        self._random_state = state
+
+    @contextmanager
+    def rule_random(self):
+        """Let the rules draw from this environment's own random stream.
+
+        The rules use the `random` module, so its state is swapped in for the
+        duration of the block. Environments running on the same event loop, or
+        forked from the same discussion, then draw independent sequences.
+        """
+        outer_state = random.getstate()
+        random.setstate(self.get_random_state())
+        try:
+            yield
+        finally:
+            self._random_state = random.getstate()
+            random.setstate(outer_state)
+
+    def save_checkpoint(self) -> None:
+        """Save the state reached by the last turn to `checkpoint_path`"""
+        if self.checkpoint_path:
+            from agentverse.checkpoint import save_checkpoint
+
+            save_checkpoint(self, self.checkpoint_path)
+
+    def restore_checkpoint(self, path: str) -> None:
+        """Continue from the state saved in a checkpoint file"""
+        from agentverse.checkpoint import load_checkpoint, restore_environment
+
+        restore_environment(self, load_checkpoint(path))
+
     def report_metrics(self) -> None:
         """Report useful metrics"""
         total_spent = sum([agent.get_spend() for agent in self.agents])
-        logger.info(f"Total spent: ${total_spent}")
-        pass
+        logger.info(f"Total spent: ${total_spent:.4f}")
+        cache = get_response_cache()
+        if cache is not None:
+            logger.info(f"LLM response cache: {cache.stats()}")
+        # Only loaded when a configuration uses the literature tools
+        tools = sys.modules.get("agentverse.tools.ai_researcher_tools")
+        literature_stats = tools.get_literature_stats() if tools is not None else None
+        if literature_stats is not None:
+            logger.info(f"Literature tools: {literature_stats}")
 
     def is_done(self) -> bool:
         """Check if the environment is done"""
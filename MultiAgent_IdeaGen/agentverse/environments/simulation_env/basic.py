@@ -9,7 +9,9 @@ from agentverse.agents.simulation_agent.conversation import BaseAgent
 
 # from agentverse.environments.simulation_env.rules.base import Rule
 from agentverse.environments.simulation_env.rules.base import SimulationRule as Rule
+from agentverse.llms.utils.response_cache import CacheMissError
 from agentverse.message import Message
+from agentverse.tracing import span
 
 logger = get_logger()
 
@@ -29,6 +31,10 @@ class BasicEnvironment(BaseEnvironment):
         cnt_turn: Current turn number
         last_messages: Messages from last turn
         rule_params: Variables set by the rule
+        transcript: Shared log of all the messages of the environment
+        checkpoint_path: File the state is saved to after every turn, if set
+        concurrent_step: Generate the messages of all speakers of a turn concurrently
+        max_concurrent_agents: Maximum number of agents generating at the same time
     """
 
     agents: List[BaseAgent]
@@ -37,6 +43,8 @@ class BasicEnvironment(BaseEnvironment):
     cnt_turn: int = 0
     last_messages: List[Message] = []
     rule_params: Dict = {}
+    concurrent_step: bool = True
+    max_concurrent_agents: int = 8
 
     def __init__(self, rule, **kwargs):
         rule_config = rule
@@ -45,46 +53,101 @@ class BasicEnvironment(BaseEnvironment):
         selector_config = rule_config.get("selector", {"type": "basic"})
         updater_config = rule_config.get("updater", {"type": "basic"})
         describer_config = rule_config.get("describer", {"type": "basic"})
+        terminator_config = rule_config.get("terminator", {"type": "basic"})
         rule = Rule(
             order_config,
             visibility_config,
             selector_config,
             updater_config,
             describer_config,
+            terminator_config,
         )
         super().__init__(rule=rule, **kwargs)
+        self.attach_transcript()
 
     async def step(self) -> List[Message]:
         """Run one step of the environment"""
+        with span("turn", turn=self.cnt_turn):
+            return await self._step()
 
-        # Get the next agent index
-        agent_ids = self.rule.get_next_agent_idx(self)
+    async def _step(self) -> List[Message]:
+        with self.rule_random():
+            # Get the next agent index
+            agent_ids = self.rule.get_next_agent_idx(self)
 
-        # Generate current environment description
-        env_descriptions = self.rule.get_env_description(self)
+            # Generate current environment description
+            env_descriptions = self.rule.get_env_description(self)
 
         # Generate the next message
-        messages = []
-        for idx, i in enumerate(agent_ids):
-            is_final_turn = (self.cnt_turn == self.max_turns - 1) and (idx == len(agent_ids) - 1)
-            msg = await self.agents[i].astep(env_descriptions[i], is_final_turn=is_final_turn)
-            messages.append(msg)
-
-        # Some rules will select certain messages from all the messages
-        selected_messages = self.rule.select_message(self, messages)
-        self.last_messages = selected_messages
-        self.print_messages(selected_messages)
-
-        # Update the memory of the agents
-        self.rule.update_memory(self)
-
-        # Update the set of visible agents for each agent
-        self.rule.update_visible_agents(self)
+        if self.concurrent_step and len(agent_ids) > 1:
+            messages = await self._concurrent_astep(agent_ids, env_descriptions)
+        else:
+            messages = []
+            for idx, i in enumerate(agent_ids):
+                is_final_turn = (self.cnt_turn == self.max_turns - 1) and (idx == len(agent_ids) - 1)
+                msg = await self._agent_astep(i, env_descriptions[i], is_final_turn)
+                messages.append(msg)
+
+        with self.rule_random():
+            # Some rules will select certain messages from all the messages
+            selected_messages = self.rule.select_message(self, messages)
+            self.last_messages = selected_messages
+            self.print_messages(selected_messages)
+
+            # Update the memory of the agents
+            self.rule.update_memory(self)
+
+            # Update the set of visible agents for each agent
+            self.rule.update_visible_agents(self)
 
         self.cnt_turn += 1
+        if self.cnt_turn < self.max_turns - 1 and self.rule.is_converged(self):
+            # Nothing new is being said, go straight to the final turn
+            logger.info(f"Discussion converged after {self.cnt_turn} turns")
+            self.cnt_turn = self.max_turns - 1
+        self.save_checkpoint()
 
         return selected_messages
 
+    async def _agent_astep(self, i: int, env_description: str, is_final_turn: bool) -> Message:
+        agent = self.agents[i]
+        with span("agent_step", agent=agent.name):
+            return await agent.astep(env_description, is_final_turn=is_final_turn)
+
+    async def _concurrent_astep(
+        self, agent_ids: List[int], env_descriptions: List[str]
+    ) -> List[Message]:
+        """Let all speakers of this turn generate at once.
+
+        Speakers only see the memory of previous turns, so the result is the
+        same as generating one after another. Messages keep the order of
+        `agent_ids`, and an agent that fails is logged and contributes an
+        empty message, which the updater skips, instead of discarding the
+        responses of the other speakers. Interrupts and replay cache misses
+        still stop the run.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent_agents))
+
+        async def astep(idx: int, i: int) -> Message:
+            is_final_turn = (self.cnt_turn == self.max_turns - 1) and (idx == len(agent_ids) - 1)
+            async with semaphore:
+                return await self._agent_astep(i, env_descriptions[i], is_final_turn)
+
+        results = await asyncio.gather(
+            *[astep(idx, i) for idx, i in enumerate(agent_ids)], return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, (KeyboardInterrupt, asyncio.CancelledError, CacheMissError)):
+                raise result
+        messages = []
+        for i, result in zip(agent_ids, results):
+            if isinstance(result, BaseException):
+                agent = self.agents[i]
+                logger.error(f"{agent.name} failed to generate a response: {result}")
+                result = Message(content="", sender=agent.name, receiver=agent.get_receiver())
+            messages.append(result)
+        return messages
+
     def print_messages(self, messages: List[Message]) -> None:
         for message in messages:
             if message is not None:
@@ -94,7 +157,9 @@ class BasicEnvironment(BaseEnvironment):
     def reset(self) -> None:
         """Reset the environment"""
         self.cnt_turn = 0
+        self._random_state = None
         self.rule.reset()
+        self.transcript.reset()
         for agent in self.agents:
             agent.reset()
 
@@ -12,6 +12,10 @@ from agentverse.environments.simulation_env.rules.selector import (
     BaseSelector,
     selector_registry,
 )
+from agentverse.environments.simulation_env.rules.terminator import (
+    BaseTerminator,
+    terminator_registry,
+)
 from agentverse.environments.simulation_env.rules.updater import (
     BaseUpdater,
     updater_registry,
@@ -32,7 +36,8 @@ from agentverse.message import Message
 class SimulationRule(BaseRule):
     """
     Rule for the environment. It controls the speaking order of the agents
-    and maintain the set of visible agents for each agent.
+    and maintain the set of visible agents for each agent. The terminator can
+    end a discussion before its last turn.
     """
 
     order: BaseOrder
@@ -40,6 +45,7 @@ class SimulationRule(BaseRule):
     selector: BaseSelector
     updater: BaseUpdater
     describer: BaseDescriber
+    terminator: BaseTerminator
 
     def __init__(
         self,
@@ -48,18 +54,21 @@ class SimulationRule(BaseRule):
         selector_config,
         updater_config,
         describer_config,
+        terminator_config=None,
     ):
         order = order_registry.build(**order_config)
         visibility = visibility_registry.build(**visibility_config)
         selector = selector_registry.build(**selector_config)
         updater = updater_registry.build(**updater_config)
         describer = describer_registry.build(**describer_config)
+        terminator = terminator_registry.build(**(terminator_config or {"type": "basic"}))
         super().__init__(
             order=order,
             visibility=visibility,
             selector=selector,
             updater=updater,
             describer=describer,
+            terminator=terminator,
         )
 
     def get_next_agent_idx(
@@ -90,9 +99,14 @@ class SimulationRule(BaseRule):
         """Return the description of the environment for each agent"""
         return self.describer.get_env_description(environment, *args, **kwargs)
 
+    def is_converged(self, environment: BaseEnvironment, *args, **kwargs) -> bool:
+        """Whether the discussion can skip to its final turn"""
+        return self.terminator.is_converged(environment, *args, **kwargs)
+
     def reset(self) -> None:
         self.order.reset()
         self.visibility.reset()
         self.selector.reset()
         self.updater.reset()
         self.describer.reset()
+        self.terminator.reset()
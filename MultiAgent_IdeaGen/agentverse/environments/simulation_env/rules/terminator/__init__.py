@@ -0,0 +1,7 @@
+from agentverse.registry import Registry
+
+terminator_registry = Registry(name="TerminatorRegistry")
+
+from .base import BaseTerminator
+from .basic import BasicTerminator
+from .novelty import NoveltyTerminator
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pydantic import BaseModel
+
+from . import terminator_registry as TerminatorRegistry
+from abc import abstractmethod
+
+if TYPE_CHECKING:
+    from agentverse.environments import BaseEnvironment
+
+
+@TerminatorRegistry.register("base")
+class BaseTerminator(BaseModel):
+    """
+    Base class for all terminators
+    """
+
+    @abstractmethod
+    def is_converged(self, environment: BaseEnvironment) -> bool:
+        """Whether the discussion can skip to its final turn, called after each turn"""
+        pass
+
+    def reset(self) -> None:
+        pass
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from . import terminator_registry as TerminatorRegistry
+from .base import BaseTerminator
+
+if TYPE_CHECKING:
+    from agentverse.environments import BaseEnvironment
+
+
+@TerminatorRegistry.register("basic")
+class BasicTerminator(BaseTerminator):
+    """
+    The discussion always runs for max_turns turns
+    """
+
+    def is_converged(self, environment: BaseEnvironment) -> bool:
+        return False
+
+    def reset(self) -> None:
+        pass
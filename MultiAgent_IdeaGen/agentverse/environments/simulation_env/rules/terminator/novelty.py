@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import re
+import zlib
+from typing import TYPE_CHECKING, List, Set
+
+from pydantic import PrivateAttr
+
+from agentverse.logging import get_logger
+from agentverse.message import Message
+
+from . import terminator_registry as TerminatorRegistry
+from .base import BaseTerminator
+
+if TYPE_CHECKING:
+    from agentverse.environments import BaseEnvironment
+
+logger = get_logger()
+
+_WORD = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 3) -> Set[int]:
+    """Hashes of the word n-grams of a text (crc32, stable across processes)"""
+    words = _WORD.findall(str(text).lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i : i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+@TerminatorRegistry.register("novelty")
+class NoveltyTerminator(BaseTerminator):
+    """
+    Ends the discussion early once it stops bringing new content.
+
+    The novelty of a turn is the fraction of the word shingles of its messages
+    that appear nowhere earlier in the transcript. After `patience`
+    consecutive turns with a novelty below `threshold`, the discussion skips to
+    its final turn.
+
+    Args:
+        threshold: Novelty under which a turn counts as repetitive
+        patience: Number of consecutive repetitive turns before stopping
+        min_turns: Turns that are always run
+        shingle_size: Number of words per shingle
+    """
+
+    threshold: float = 0.3
+    patience: int = 2
+    min_turns: int = 2
+    shingle_size: int = 3
+    # State, kept in checkpoints
+    stale_turns: int = 0
+    processed: int = 0
+    last_novelty: float = 1.0
+    # Shingles of transcript[:processed], rebuilt from the transcript when restored
+    _seen: Set[int] = PrivateAttr(default_factory=set)
+    _seen_upto: int = PrivateAttr(default=0)
+
+    def _absorb(self, messages: List[Message]) -> None:
+        for message in messages:
+            if message.sender != "":
+                self._seen |= shingles(message.content, self.shingle_size)
+
+    def is_converged(self, environment: BaseEnvironment) -> bool:
+        transcript = environment.transcript
+        if self._seen_upto != self.processed or self.processed > len(transcript):
+            self._seen = set()
+            self.processed = min(self.processed, len(transcript))
+            self._absorb(transcript.messages[: self.processed])
+
+        new_shingles: Set[int] = set()
+        for message in transcript.messages[self.processed :]:
+            if message.sender != "":
+                new_shingles |= shingles(message.content, self.shingle_size)
+        if new_shingles:
+            self.last_novelty = len(new_shingles - self._seen) / len(new_shingles)
+        else:
+            # Nobody spoke
+            self.last_novelty = 0.0
+        self._seen |= new_shingles
+        self.processed = self._seen_upto = len(transcript)
+
+        if self.last_novelty < self.threshold:
+            self.stale_turns += 1
+        else:
+            self.stale_turns = 0
+        logger.debug(
+            f"Turn {environment.cnt_turn} novelty {self.last_novelty:.2f}, "
+            f"{self.stale_turns} repetitive turn(s) in a row"
+        )
+        return self.stale_turns >= self.patience and environment.cnt_turn >= self.min_turns
+
+    def reset(self) -> None:
+        self.stale_turns = 0
+        self.processed = 0
+        self.last_novelty = 1.0
+        self._seen = set()
+        self._seen_upto = 0
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Tuple
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from . import updater_registry as UpdaterRegistry
 from .base import BaseUpdater
 from agentverse.message import Message
+from agentverse.memory.transcript import Transcript
 from agentverse.logging import get_logger
 
 if TYPE_CHECKING:
@@ -19,10 +20,13 @@ class BasicUpdater(BaseUpdater):
     """
     The basic version of updater.
     The messages will be seen by all the receiver specified in the message.
+    Every message is appended once to the environment's transcript, agents
+    whose memory is a view of it are not given their own copy.
     """
 
     def update_memory(self, environment: BaseEnvironment):
         added = False
+        transcript = environment.transcript
         for message in environment.last_messages:
             if len(message.tool_response) > 0:
                 self.add_tool_response(
@@ -30,11 +34,16 @@ class BasicUpdater(BaseUpdater):
                 )
             if message.content == "":
                 continue
-            added |= self.add_message_to_all_agents(environment.agents, message)
+            transcript.append(message)
+            added |= self.add_message_to_all_agents(
+                environment.agents, message, transcript
+            )
         # If no one speaks in this turn. Add an empty message to all agents
         if not added:
+            transcript.append(Message(content="[Silence]"))
             for agent in environment.agents:
-                agent.add_message_to_memory([Message(content="[Silence]")])
+                if not self.reads_transcript(agent, transcript):
+                    agent.add_message_to_memory([Message(content="[Silence]")])
 
     def add_tool_response(
         self,
@@ -49,20 +58,31 @@ class BasicUpdater(BaseUpdater):
                 agent.tool_memory.add_message(tool_response)
             break
 
+    @staticmethod
+    def reads_transcript(agent: BaseAgent, transcript: Optional[Transcript]) -> bool:
+        return transcript is not None and (
+            getattr(agent.memory, "transcript", None) is transcript
+        )
+
     def add_message_to_all_agents(
-        self, agents: List[BaseAgent], message: Message
+        self,
+        agents: List[BaseAgent],
+        message: Message,
+        transcript: Optional[Transcript] = None,
     ) -> bool:
         if "all" in message.receiver:
             # If receiver is all, then add the message to all agents
             for agent in agents:
-                agent.add_message_to_memory([message])
+                if not self.reads_transcript(agent, transcript):
+                    agent.add_message_to_memory([message])
             return True
         else:
             # If receiver is not all, then add the message to the specified agents
             receiver_set = message.receiver
             for agent in agents:
                 if agent.name in receiver_set:
-                    agent.add_message_to_memory([message])
+                    if not self.reads_transcript(agent, transcript):
+                        agent.add_message_to_memory([message])
                     receiver_set.remove(agent.name)
             if len(receiver_set) > 0:
                 missing_receiver = ", ".join(list(receiver_set))
@@ -29,6 +29,8 @@ def load_llm(llm_config: Dict):
 
 def load_memory(memory_config: Dict):
     memory_type = memory_config.pop("memory_type", "chat_history")
+    if isinstance(memory_config.get("summary_llm"), dict):
+        memory_config["summary_llm"] = load_llm(memory_config["summary_llm"])
     return memory_registry.build(memory_type, **memory_config)
 
 
@@ -54,28 +56,29 @@ def load_tools(tool_config: List[Dict]):
             
             # Only include tools actually used in your configuration
             if tool_name == "semantic_scholar_search":
-                from agentverse.tools.ai_researcher_tools import semantic_scholar_search
-                from langchain.tools import tool
+                from agentverse.tools.ai_researcher_tools import SemanticScholarSearchTool
                 
-                @tool
-                def semantic_scholar_search_tool(query: str, limit: int = 10) -> str:
-                    """Direct Semantic Scholar API search for papers"""
-                    return semantic_scholar_search(query, limit)
-                
-                semantic_scholar_search_tool.name = "semantic_scholar_search"
-                semantic_scholar_search_tool.description = tool_dict.get("description", "Direct Semantic Scholar API search")
-                all_tools_list.append(semantic_scholar_search_tool)
+                tool_instance = SemanticScholarSearchTool(backend=tool_dict.get("backend", ""), index_path=tool_dict.get("index_path", ""))
+                tool_instance.description = tool_dict.get("description", "Direct Semantic Scholar API search")
+                all_tools_list.append(tool_instance)
                 
             elif tool_name == "get_paper_details":
                 from agentverse.tools.ai_researcher_tools import GetPaperDetailsTool
                 
-                tool_instance = GetPaperDetailsTool()
+                tool_instance = GetPaperDetailsTool(backend=tool_dict.get("backend", ""), index_path=tool_dict.get("index_path", ""))
                 tool_instance.description = tool_dict.get("description", "Get comprehensive paper details")
                 all_tools_list.append(tool_instance)
                 
+            elif tool_name == "get_papers_details":
+                from agentverse.tools.ai_researcher_tools import GetPapersDetailsTool
+                
+                tool_instance = GetPapersDetailsTool(backend=tool_dict.get("backend", ""), index_path=tool_dict.get("index_path", ""))
+                tool_instance.description = tool_dict.get("description", tool_instance.description)
+                all_tools_list.append(tool_instance)
+                
             else:
                 # Log warning for unsupported tools
-                logger.warning(f"Unsupported tool: {tool_name}. Only semantic_scholar_search and get_paper_details are supported.")
+                logger.warn(f"Unsupported tool: {tool_name}. Only semantic_scholar_search, get_paper_details and get_papers_details are supported.")
     
     return all_tools_list
 
@@ -92,6 +95,11 @@ def load_agent(agent_config: Dict) -> BaseAgent:
 
 
 def prepare_task_config(task, tasks_dir):
+    """Read and build the yaml config of the given task in `tasks` directory."""
+    return build_task_config(read_task_config(task, tasks_dir), task)
+
+
+def read_task_config(task, tasks_dir) -> Dict:
     """Read the yaml config of the given task in `tasks` directory."""
     all_task_dir = tasks_dir
     task_path = os.path.join(all_task_dir, task)
@@ -115,8 +123,11 @@ def prepare_task_config(task, tasks_dir):
         raise ValueError(
             "You should include the config.yaml file in the task directory"
         )
-    task_config = yaml.safe_load(open(config_path, encoding="utf-8"))
+    return yaml.safe_load(open(config_path, encoding="utf-8"))
+
 
+def build_task_config(task_config: Dict, task: str = "") -> Dict:
+    """Build the memories, llms, tools and output parsers of a parsed task config."""
     for i, agent_configs in enumerate(task_config["agents"]):
         agent_configs["memory"] = load_memory(agent_configs.get("memory", {}))
         
@@ -124,7 +135,14 @@ def prepare_task_config(task, tasks_dir):
 
         if agent_configs.get("tool_memory", None) is not None:
             agent_configs["tool_memory"] = load_memory(agent_configs["tool_memory"])
-        llm = load_llm(agent_configs.get("llm", "text-davinci-003"))
+        llm_config = agent_configs.get("llm", "text-davinci-003")
+        if isinstance(llm_config, dict) and llm_config.get("adaptive_max_tokens"):
+            # Completion lengths are learned per agent of the task
+            adaptive = llm_config["adaptive_max_tokens"]
+            adaptive = {} if adaptive is True else dict(adaptive)
+            adaptive.setdefault("key", f"{task}:{agent_configs.get('name', i)}")
+            llm_config["adaptive_max_tokens"] = adaptive
+        llm = load_llm(llm_config)
         agent_configs["llm"] = llm
 
         memory_manipulator = load_memory_manipulator(
@@ -40,16 +40,22 @@ LOCAL_LLMS_MAPPING = {
 # Base classes and main functionality
 from .base import BaseLLM, BaseChatModel, BaseCompletionModel, LLMResult
 
-# Main LLM implementations
-from .deepseek import DeepSeekChat  # Primary LLM for this project
-
+# LLM implementations are imported on first use, they pull in the openai client
+llm_registry.register_lazy("deepseek", "agentverse.llms.deepseek:DeepSeekChat")  # Primary LLM for this project
+llm_registry.register_lazy("o1mini", "agentverse.llms.o1mini:OpenAIChat")
 # Compatibility placeholders (not actively used)
-from .openai import OpenAIChat
-try:
-    from .o1mini import *
-except ImportError:
-    pass  # Skip if module has issues
-try:
-    from .gpt_4omini import *
-except ImportError:
-    pass  # Skip if module has issues
+llm_registry.register_lazy("gpt_4omini", "agentverse.llms.gpt_4omini:GPT4OMiniChat")
+
+_LAZY_ATTRIBUTES = {
+    "DeepSeekChat": "agentverse.llms.deepseek",
+    "OpenAIChat": "agentverse.llms.o1mini",
+    "GPT4OMiniChat": "agentverse.llms.gpt_4omini",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        import importlib
+
+        return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,21 @@
 from abc import abstractmethod
-from typing import Any, Dict, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field, PrivateAttr, validator
+
+from agentverse.logging import logger
+from agentverse.llms.utils.adaptive_max_tokens import (
+    AdaptiveMaxTokens,
+    CompletionLengthTracker,
+    get_length_tracker,
+)
+from agentverse.llms.utils.pricing import completion_cost
+from agentverse.llms.utils.response_cache import (
+    CacheMissError,
+    get_cache_run,
+    get_response_cache,
+    make_cache_key,
+)
+from agentverse.tracing import current_span, span
 
 
 class LLMResult(BaseModel):
@@ -10,10 +25,33 @@ class LLMResult(BaseModel):
     send_tokens: int = 0
     recv_tokens: int = 0
     total_tokens: int = 0
+    # "stop", "length", ... as reported by the API
+    finish_reason: str = ""
 
 
 class BaseModelArgs(BaseModel):
-    pass
+    # Shared per-endpoint budgets, see agentverse.llms.utils.rate_limiter
+    requests_per_minute: Optional[float] = Field(default=None)
+    tokens_per_minute: Optional[float] = Field(default=None)
+    max_concurrency: Optional[int] = Field(default=None)
+    seed: Optional[int] = Field(default=None)
+    # Generation ends before the first of these strings, which is not returned
+    stop: Optional[List[str]] = Field(default=None)
+    # Enforce `stop` on a streamed response instead of sending it to the API
+    stream_stop: bool = Field(default=False)
+    # Request fewer tokens than max_tokens, from the observed completion lengths
+    adaptive_max_tokens: Optional[AdaptiveMaxTokens] = Field(default=None)
+    # USD per million (prompt, completion) tokens, default: agentverse.llms.utils.pricing
+    price_per_million_tokens: Optional[Tuple[float, float]] = Field(default=None)
+
+    @validator("adaptive_max_tokens", pre=True)
+    def _adaptive_max_tokens_flag(cls, value):
+        # `adaptive_max_tokens: true` enables the default policy
+        if value is True:
+            return {}
+        if value is False:
+            return None
+        return value
 
 
 class BaseLLM(BaseModel):
@@ -39,7 +77,138 @@ class BaseLLM(BaseModel):
 
 
 class BaseChatModel(BaseLLM):
-    pass
+    """
+    Chat model whose responses go through the on-disk response cache.
+    Subclasses implement `_request_kwargs`, which also defines the cache key,
+    and `_generate_response` / `_agenerate_response`, which request
+    `max_tokens` tokens at most when it is given (see adaptive_max_tokens).
+    Every request sent to the API is priced and counted in `get_spend`, and
+    traced as part of the `llm_call` span when tracing is on.
+    """
+
+    _length_tracker: Optional[CompletionLengthTracker] = PrivateAttr(default=None)
+    _spend: float = PrivateAttr(default=0.0)
+
+    def _request_kwargs(self, prompt: str, max_tokens: Optional[int] = None) -> dict:
+        raise NotImplementedError
+
+    def _generate_response(self, prompt: str, max_tokens: Optional[int] = None) -> LLMResult:
+        raise NotImplementedError
+
+    async def _agenerate_response(
+        self, prompt: str, max_tokens: Optional[int] = None
+    ) -> LLMResult:
+        raise NotImplementedError
+
+    def get_spend(self) -> float:
+        return self._spend
+
+    def _account(self, result: LLMResult) -> LLMResult:
+        """Count the usage and the cost of a response the API was paid for"""
+        cost = completion_cost(
+            getattr(self.args, "model", ""),
+            result.send_tokens,
+            result.recv_tokens,
+            self.args.price_per_million_tokens,
+        )
+        self._spend += cost
+        trace = current_span()
+        trace.add("requests", 1)
+        trace.add("prompt_tokens", result.send_tokens)
+        trace.add("completion_tokens", result.recv_tokens)
+        trace.add("cost", cost)
+        return result
+
+    def _completion_budget(self) -> Optional[int]:
+        """max_tokens of the next request, None to use the configured one"""
+        policy = self.args.adaptive_max_tokens
+        max_tokens = getattr(self.args, "max_tokens", None)
+        if policy is None or max_tokens is None:
+            return None
+        if self._length_tracker is None:
+            self._length_tracker = get_length_tracker(policy)
+        return self._length_tracker.budget(max_tokens)
+
+    def _next_budget(self, result: LLMResult, budget: int) -> Optional[int]:
+        """A larger budget if `result` was cut off by the adaptive one, else None"""
+        if result.finish_reason != "length" or budget >= self.args.max_tokens:
+            return None
+        larger = min(self.args.max_tokens, budget * 2)
+        logger.warn(f"Response truncated at {budget} tokens, retrying with {larger}")
+        return larger
+
+    def _generate_adaptive(self, prompt: str) -> LLMResult:
+        budget = self._completion_budget()
+        if budget is None:
+            return self._account(self._generate_response(prompt))
+        while True:
+            result = self._account(self._generate_response(prompt, max_tokens=budget))
+            budget = self._next_budget(result, budget)
+            if budget is None:
+                break
+        self._length_tracker.add(result.recv_tokens)
+        return result
+
+    async def _agenerate_adaptive(self, prompt: str) -> LLMResult:
+        budget = self._completion_budget()
+        if budget is None:
+            return self._account(await self._agenerate_response(prompt))
+        while True:
+            result = self._account(await self._agenerate_response(prompt, max_tokens=budget))
+            budget = self._next_budget(result, budget)
+            if budget is None:
+                break
+        self._length_tracker.add(result.recv_tokens)
+        return result
+
+    def _cache_key(self, prompt: str) -> str:
+        request = self._request_kwargs(prompt)
+        request.pop("stream", None)
+        if self.args.stop:
+            # Also when the stop sequences are applied client side
+            request["stop"] = list(self.args.stop)
+        if self.args.seed is None and getattr(self.args, "temperature", 0) > 0:
+            # Unseeded samples of separate runs must not replay one another
+            request["run"] = get_cache_run()
+        return make_cache_key(**request)
+
+    def generate_response(self, prompt: str) -> LLMResult:
+        with span("llm_call", model=getattr(self.args, "model", "")) as trace:
+            cache = get_response_cache()
+            if cache is None:
+                result = self._generate_adaptive(prompt)
+                trace.set(finish_reason=result.finish_reason)
+                return result
+            key = self._cache_key(prompt)
+            cached = cache.get(key)
+            if cached is not None:
+                trace.set(cached=True)
+                return LLMResult.parse_raw(cached)
+            if cache.readonly:
+                raise CacheMissError(key)
+            result = self._generate_adaptive(prompt)
+            cache.put(key, result.json())
+            trace.set(finish_reason=result.finish_reason)
+            return result
+
+    async def agenerate_response(self, prompt: str) -> LLMResult:
+        with span("llm_call", model=getattr(self.args, "model", "")) as trace:
+            cache = get_response_cache()
+            if cache is None:
+                result = await self._agenerate_adaptive(prompt)
+                trace.set(finish_reason=result.finish_reason)
+                return result
+            key = self._cache_key(prompt)
+            cached = cache.get(key)
+            if cached is not None:
+                trace.set(cached=True)
+                return LLMResult.parse_raw(cached)
+            if cache.readonly:
+                raise CacheMissError(key)
+            result = await self._agenerate_adaptive(prompt)
+            cache.put(key, result.json())
+            trace.set(finish_reason=result.finish_reason)
+            return result
 
 
 class BaseCompletionModel(BaseLLM):
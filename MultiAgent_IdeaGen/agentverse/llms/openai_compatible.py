@@ -0,0 +1,145 @@
+"""
+Chat models served through an OpenAI-compatible chat completions API.
+
+The backends only differ in their endpoint, their default arguments and a
+few rules, which they override: e.g. o1 models reject `stop`, so the o1mini
+backend always applies it client side.
+"""
+
+import os
+import time
+from typing import ClassVar, Optional
+
+from pydantic import Field
+
+from agentverse.llms.base import BaseChatModel, BaseModelArgs, LLMResult
+from agentverse.llms.utils.client_pool import get_async_openai_client, get_openai_client
+from agentverse.llms.utils.rate_limiter import endpoint_key, estimate_tokens, get_rate_limiter
+from agentverse.llms.utils.streaming import aread_until_stop, read_until_stop
+from agentverse.tracing import current_span
+
+
+class OpenAICompatibleArgs(BaseModelArgs):
+    model: str = Field(default="")
+    temperature: float = Field(default=0.7)
+    max_tokens: int = Field(default=8000)
+
+
+class OpenAICompatibleChat(BaseChatModel):
+    args: OpenAICompatibleArgs = Field(default_factory=OpenAICompatibleArgs)
+
+    # Environment variables of the endpoint, and the values used without them
+    api_key_env: ClassVar[str] = "OPENAI_API_KEY"
+    base_url_env: ClassVar[str] = "OPENAI_BASE_URL"
+    default_api_key: ClassVar[str] = "YOUR_OPENAI_API_KEY_HERE"
+    default_base_url: ClassVar[str] = "https://api.openai.com/v1"
+
+    def __init__(self, max_retry: int = 3, **kwargs):
+        # Model arguments are given flat in the agent config (model, temperature, stop, ...)
+        args = self.__fields__["args"].type_().dict()
+        for k, v in args.items():
+            args[k] = kwargs.pop(k, v)
+        super().__init__(args=args, max_retry=max_retry, **kwargs)
+
+    def _endpoint(self):
+        # Set your own API key in the environment
+        api_key = os.environ.get(self.api_key_env, self.default_api_key)
+        base_url = os.environ.get(self.base_url_env, self.default_base_url)
+        return base_url, api_key
+
+    def _requests_per_minute(self) -> Optional[float]:
+        return self.args.requests_per_minute
+
+    def _rate_limiter(self, base_url: str, api_key: str):
+        return get_rate_limiter(
+            endpoint_key(base_url, api_key),
+            self._requests_per_minute(),
+            self.args.tokens_per_minute,
+            self.args.max_concurrency,
+        )
+
+    def _streams_stop(self) -> bool:
+        return bool(self.args.stop) and self.args.stream_stop
+
+    def _request_kwargs(self, prompt: str, max_tokens: Optional[int] = None) -> dict:
+        kwargs = dict(
+            model=self.args.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.args.temperature,
+            max_tokens=max_tokens or self.args.max_tokens,
+            stream=False,
+        )
+        if self.args.seed is not None:
+            kwargs["seed"] = self.args.seed
+        if self.args.stop:
+            if self._streams_stop():
+                kwargs["stream"] = True
+            else:
+                kwargs["stop"] = self.args.stop
+        return kwargs
+
+    def _to_result(self, response) -> LLMResult:
+        usage = response.usage
+        return LLMResult(
+            content=response.choices[0].message.content or "",
+            send_tokens=usage.prompt_tokens if usage else 0,
+            recv_tokens=usage.completion_tokens if usage else 0,
+            total_tokens=usage.total_tokens if usage else 0,
+            finish_reason=response.choices[0].finish_reason or "",
+        )
+
+    def _generate_response(self, prompt: str, max_tokens: Optional[int] = None) -> LLMResult:
+        base_url, api_key = self._endpoint()
+        limiter = self._rate_limiter(base_url, api_key)
+        reserved = estimate_tokens(prompt) + (max_tokens or self.args.max_tokens)
+        client = get_openai_client(base_url, api_key)
+        queued_at = time.perf_counter()
+        with limiter.slot():
+            limiter.acquire(reserved)
+            sent_at = time.perf_counter()
+            current_span().add("queue_wait_ms", round((sent_at - queued_at) * 1000.0, 1))
+            # A failed request gives its whole reservation back
+            used = 0
+            try:
+                response = client.chat.completions.create(
+                    **self._request_kwargs(prompt, max_tokens)
+                )
+                if self._streams_stop():
+                    result = read_until_stop(
+                        response, self.args.stop, prompt, self.args.model, sent_at
+                    )
+                else:
+                    result = self._to_result(response)
+                used = result.total_tokens or reserved
+            finally:
+                limiter.settle(reserved, used)
+        return result
+
+    async def _agenerate_response(
+        self, prompt: str, max_tokens: Optional[int] = None
+    ) -> LLMResult:
+        base_url, api_key = self._endpoint()
+        limiter = self._rate_limiter(base_url, api_key)
+        reserved = estimate_tokens(prompt) + (max_tokens or self.args.max_tokens)
+        client = get_async_openai_client(base_url, api_key)
+        queued_at = time.perf_counter()
+        async with limiter.aslot():
+            await limiter.aacquire(reserved)
+            sent_at = time.perf_counter()
+            current_span().add("queue_wait_ms", round((sent_at - queued_at) * 1000.0, 1))
+            # A failed request gives its whole reservation back
+            used = 0
+            try:
+                response = await client.chat.completions.create(
+                    **self._request_kwargs(prompt, max_tokens)
+                )
+                if self._streams_stop():
+                    result = await aread_until_stop(
+                        response, self.args.stop, prompt, self.args.model, sent_at
+                    )
+                else:
+                    result = self._to_result(response)
+                used = result.total_tokens or reserved
+            finally:
+                limiter.settle(reserved, used)
+        return result
@@ -1,2 +1,7 @@
 from .jsonrepair import JsonRepair
-from .token_counter import count_string_tokens, count_message_tokens
+from .token_counter import (
+    count_string_tokens,
+    count_message_tokens,
+    count_rendered_message_tokens,
+    get_token_counter,
+)
@@ -0,0 +1,73 @@
+"""
+Completion budgets sized from the lengths an LLM actually produced.
+
+A discussion turn rarely needs the configured `max_tokens`, but the whole
+budget is reserved against the endpoint's token limits and can delay
+scheduling on the provider side. With an adaptive policy, every request
+asks for a high percentile of the recent completion lengths plus some
+headroom, and a response cut off by that smaller budget is requested again
+with a larger one, up to the configured `max_tokens`.
+
+Lengths are tracked per `key`, which the task loader sets to the task and
+agent name, so runs of the same configuration in one process (sequential
+runs, forks, batches) learn from each other.
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Deque, Dict
+
+from pydantic import BaseModel, Field
+
+
+class AdaptiveMaxTokens(BaseModel):
+    # Trackers are shared by the LLMs with the same key, "" for a private one
+    key: str = Field(default="")
+    percentile: float = Field(default=95.0)
+    headroom: float = Field(default=0.25)
+    # Use the configured max_tokens until this many completions were seen
+    min_samples: int = Field(default=3)
+    min_tokens: int = Field(default=256)
+    window: int = Field(default=200)
+
+
+class CompletionLengthTracker:
+    """Recent completion lengths of one LLM (i.e. one agent)"""
+
+    def __init__(self, policy: AdaptiveMaxTokens):
+        self.policy = policy
+        self.samples: Deque[int] = deque(maxlen=max(1, policy.window))
+
+    def add(self, completion_tokens: int) -> None:
+        if completion_tokens > 0:
+            self.samples.append(completion_tokens)
+
+    def percentile(self, q: float) -> int:
+        ordered = sorted(self.samples)
+        # Nearest-rank percentile
+        rank = max(1, math.ceil(q / 100.0 * len(ordered)))
+        return ordered[rank - 1]
+
+    def budget(self, max_tokens: int) -> int:
+        """max_tokens to request next, never above the configured `max_tokens`"""
+        if len(self.samples) < self.policy.min_samples:
+            return max_tokens
+        estimate = math.ceil(
+            self.percentile(self.policy.percentile) * (1.0 + self.policy.headroom)
+        )
+        return min(max_tokens, max(self.policy.min_tokens, estimate))
+
+
+_trackers: Dict[str, CompletionLengthTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_length_tracker(policy: AdaptiveMaxTokens) -> CompletionLengthTracker:
+    if not policy.key:
+        return CompletionLengthTracker(policy)
+    with _trackers_lock:
+        tracker = _trackers.get(policy.key)
+        if tracker is None:
+            tracker = _trackers[policy.key] = CompletionLengthTracker(policy)
+        return tracker
@@ -0,0 +1,117 @@
+"""
+Long-lived OpenAI-compatible clients shared by every LLM backend in the process.
+
+Clients are keyed by (base_url, api_key) so that all agents talking to the same
+endpoint reuse one connection pool (keep-alive, HTTP/2 when `h2` is installed)
+instead of paying a TCP/TLS handshake on every turn. Async clients are
+additionally keyed by the running event loop, because httpx connections cannot
+be shared across loops.
+
+openai and httpx are imported when the first client is created, so that
+importing this module (e.g. to close the clients) stays cheap.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import TYPE_CHECKING, Dict, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY = 120.0
+# Seconds, (total, connect)
+TIMEOUT = (600.0, 10.0)
+
+_lock = threading.Lock()
+_sync_clients: "Dict[Tuple[str, str], OpenAI]" = {}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _openai():
+    try:
+        import openai
+    except ImportError:
+        raise ImportError("Please install openai: pip install openai")
+    return openai
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _http_client_args() -> dict:
+    import httpx
+
+    return dict(
+        http2=_http2_available(),
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(TIMEOUT[0], connect=TIMEOUT[1]),
+    )
+
+
+def get_openai_client(base_url: str, api_key: str) -> "OpenAI":
+    """Return the process-wide synchronous client for an endpoint"""
+    key = (base_url, api_key)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            import httpx
+
+            http_client = httpx.Client(**_http_client_args())
+            client = _openai().OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            _sync_clients[key] = client
+    return client
+
+
+def get_async_openai_client(base_url: str, api_key: str) -> "AsyncOpenAI":
+    """Return the asynchronous client for an endpoint on the running event loop"""
+    loop = asyncio.get_running_loop()
+    key = (base_url, api_key)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            import httpx
+
+            http_client = httpx.AsyncClient(**_http_client_args())
+            client = _openai().AsyncOpenAI(
+                api_key=api_key, base_url=base_url, http_client=http_client
+            )
+            clients[key] = client
+    return client
+
+
+async def aclose_async_clients() -> None:
+    """Close the async clients bound to the running event loop.
+
+    Call this before the loop shuts down (e.g. at the end of `Simulation.run`)
+    so that pooled connections are released cleanly.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        await client.close()
+
+
+def close_clients() -> None:
+    """Close the synchronous clients of this process"""
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        client.close()
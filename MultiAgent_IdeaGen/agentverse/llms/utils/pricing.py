@@ -0,0 +1,55 @@
+"""
+USD prices of the chat models, to account for what a run cost.
+
+Prices are per million tokens, as (prompt, completion), and a model name is
+matched by its longest known prefix, so dated snapshots such as
+`gpt-4o-mini-2024-07-18` use the price of their family. An LLM config can
+override the table with `price_per_million_tokens: [prompt, completion]`,
+e.g. for a self-hosted or discounted endpoint.
+"""
+
+from typing import Dict, Optional, Set, Tuple
+
+from agentverse.logging import logger
+
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "deepseek-v3": (0.27, 1.10),
+    "deepseek-chat": (0.27, 1.10),
+    "deepseek-r1": (0.55, 2.19),
+    "deepseek-reasoner": (0.55, 2.19),
+    "o1-mini": (1.10, 4.40),
+    "o1": (15.00, 60.00),
+    "o3-mini": (1.10, 4.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+_unpriced: Set[str] = set()
+
+
+def model_price(model: str) -> Optional[Tuple[float, float]]:
+    """(prompt, completion) USD per million tokens, None for an unknown model"""
+    matches = [name for name in MODEL_PRICES if model.startswith(name)]
+    if not matches:
+        return None
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+def completion_cost(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    price: Optional[Tuple[float, float]] = None,
+) -> float:
+    """USD cost of one request, 0 (with a warning, once) for an unknown model"""
+    if price is None:
+        price = model_price(model)
+    if price is None:
+        if model not in _unpriced:
+            _unpriced.add(model)
+            logger.warn(f"No price known for model {model}, its cost is counted as 0")
+        return 0.0
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
@@ -0,0 +1,291 @@
+"""
+Token-bucket rate limiting shared by all LLM backends.
+
+One `RateLimiter` exists per endpoint in the process, enforcing a
+requests-per-minute and a tokens-per-minute budget and optionally capping the
+number of requests in flight. Callers reserve capacity
+before sending a request and settle the token bucket with the real usage
+afterwards. When `AGENTVERSE_RATE_LIMIT_DIR` is set, the bucket state lives in
+a lock-protected file in that directory, so separate processes (runner
+workers, the evaluation scripts) share a single budget per endpoint.
+
+This module only needs the standard library: Proposal_Evaluation loads this
+file as its rate limiter (see ai_scientist/shared.py).
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import weakref
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+RATE_LIMIT_DIR_ENV = "AGENTVERSE_RATE_LIMIT_DIR"
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap upper-bound-ish token estimate used for reservations"""
+    return len(text) // 4 + 1
+
+
+def endpoint_key(base_url: str, api_key: str = "") -> str:
+    """Identify an endpoint by its url and (a digest of) the key whose quota is used"""
+    digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8]
+    return f"{base_url.rstrip('/')}#{digest}"
+
+
+class _Bucket:
+    """A token bucket that is allowed to go into debt.
+
+    A reservation always succeeds immediately and returns how long the caller
+    has to wait before its share of the budget is available, which makes the
+    bucket usable from both threads and coroutines.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.level = self.capacity
+        self.updated = time.time()
+
+    def reserve(self, amount: float, now: float) -> float:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.level -= amount
+        if self.level >= 0:
+            return 0.0
+        return -self.level / self.rate
+
+    def refund(self, amount: float) -> None:
+        self.level = min(self.capacity, self.level + amount)
+
+    def rescale(self, per_minute: float, now: float) -> None:
+        """Change the limit, keeping the current level (capped at the new capacity)"""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        self.capacity = float(per_minute)
+        self.rate = float(per_minute) / 60.0
+        self.level = min(self.capacity, self.level)
+
+    def state(self) -> Tuple[float, float]:
+        return self.level, self.updated
+
+    def load(self, state: Tuple[float, float]) -> None:
+        self.level, self.updated = state
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one endpoint"""
+
+    def __init__(
+        self,
+        key: str,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        state_dir: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.key = key
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, _Bucket] = {}
+        self.max_concurrency: Optional[int] = None
+        self._thread_slots: Optional[threading.BoundedSemaphore] = None
+        self._loop_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.configure(requests_per_minute, tokens_per_minute, max_concurrency)
+
+        self._state_path = None
+        if state_dir is not None:
+            if fcntl is None:
+                logger.warning(
+                    "Cross-process rate limiting needs fcntl, falling back to a per-process limiter."
+                )
+            else:
+                os.makedirs(state_dir, exist_ok=True)
+                name = re.sub(r"[^A-Za-z0-9_.-]+", "_", key)
+                self._state_path = os.path.join(state_dir, f"{name}.json")
+
+    def configure(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> None:
+        """Install the limits, keeping the stricter one if a limit already exists"""
+        with self._lock:
+            if max_concurrency and (
+                self.max_concurrency is None or max_concurrency < self.max_concurrency
+            ):
+                self.max_concurrency = max_concurrency
+                self._thread_slots = None
+                self._loop_slots = weakref.WeakKeyDictionary()
+            for name, limit in (
+                ("requests", requests_per_minute),
+                ("tokens", tokens_per_minute),
+            ):
+                if not limit:
+                    continue
+                bucket = self._buckets.get(name)
+                if bucket is None:
+                    self._buckets[name] = _Bucket(limit)
+                elif limit < bucket.capacity:
+                    # A fresh bucket would start full and allow a burst over the new limit
+                    bucket.rescale(limit, time.time())
+
+    @property
+    def enabled(self) -> bool:
+        return len(self._buckets) > 0
+
+    def _reserve(self, tokens: int) -> float:
+        amounts = {"requests": 1, "tokens": tokens}
+        with self._lock:
+            if self._state_path is None:
+                now = time.time()
+                return max(
+                    [b.reserve(amounts[n], now) for n, b in self._buckets.items()]
+                )
+            with open(self._state_path + ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._load_shared_state()
+                    now = time.time()
+                    wait = max(
+                        [b.reserve(amounts[n], now) for n, b in self._buckets.items()]
+                    )
+                    self._save_shared_state()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+            return wait
+
+    def _load_shared_state(self) -> None:
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        for name, bucket in self._buckets.items():
+            if name in state:
+                bucket.load(state[name])
+
+    def _save_shared_state(self) -> None:
+        state = {name: bucket.state() for name, bucket in self._buckets.items()}
+        tmp_path = f"{self._state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._state_path)
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Hold one of the endpoint's in-flight request slots (no-op without a cap)"""
+        if not self.max_concurrency:
+            yield
+            return
+        with self._lock:
+            if self._thread_slots is None:
+                self._thread_slots = threading.BoundedSemaphore(self.max_concurrency)
+            slots = self._thread_slots
+        with slots:
+            yield
+
+    @contextlib.asynccontextmanager
+    async def aslot(self):
+        """Asynchronous version of slot, the cap applies per event loop"""
+        if not self.max_concurrency:
+            yield
+            return
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._loop_slots.get(loop)
+            if slots is None:
+                slots = self._loop_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with slots:
+            yield
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until a request of `tokens` tokens may be sent. Returns the wait"""
+        if not self.enabled:
+            return 0.0
+        wait = self._reserve(tokens)
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            except BaseException:
+                self.settle(tokens, 0)
+                raise
+        return wait
+
+    async def aacquire(self, tokens: int = 0) -> float:
+        """Asynchronous version of acquire"""
+        if not self.enabled:
+            return 0.0
+        wait = self._reserve(tokens)
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                # Cancelled while waiting, the request is not sent
+                self.settle(tokens, 0)
+                raise
+        return wait
+
+    def settle(self, reserved_tokens: int, used_tokens: int) -> None:
+        """Return the unused part of a token reservation to the bucket.
+
+        Callers settle whether or not the request succeeded, with 0 used
+        tokens when no response was received.
+        """
+        bucket = self._buckets.get("tokens")
+        if bucket is None or used_tokens >= reserved_tokens:
+            return
+        with self._lock:
+            if self._state_path is None:
+                bucket.refund(reserved_tokens - used_tokens)
+                return
+            with open(self._state_path + ".lock", "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    self._load_shared_state()
+                    bucket.refund(reserved_tokens - used_tokens)
+                    self._save_shared_state()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+_registry_lock = threading.Lock()
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(
+    key: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+) -> RateLimiter:
+    """Return the process-wide limiter of an endpoint, creating it if needed"""
+    with _registry_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(
+                key,
+                requests_per_minute,
+                tokens_per_minute,
+                state_dir=os.environ.get(RATE_LIMIT_DIR_ENV) or None,
+                max_concurrency=max_concurrency,
+            )
+            _limiters[key] = limiter
+            return limiter
+    limiter.configure(requests_per_minute, tokens_per_minute, max_concurrency)
+    return limiter
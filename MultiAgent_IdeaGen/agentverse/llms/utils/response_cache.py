@@ -0,0 +1,206 @@
+"""
+Content-addressed on-disk cache of LLM responses.
+
+Responses are stored in SQLite under the SHA-256 of the request (model,
+messages, sampling parameters), with size-bounded LRU eviction. The cache is
+enabled through environment variables:
+
+- `AGENTVERSE_LLM_CACHE`: path of the SQLite file (unset disables the cache)
+- `AGENTVERSE_LLM_CACHE_MODE`: `readwrite` (default) or `replay`; replay
+  never writes and raises `CacheMissError` instead of calling the API
+- `AGENTVERSE_LLM_CACHE_MAX_MB`: size bound of the stored responses (default 512)
+
+Sampled requests without a seed are also keyed by the run they belong to
+(see `cache_run`), so the repetitions of a configuration stay independent
+samples while re-running one of them replays its responses.
+
+This module only needs the standard library: Proposal_Evaluation loads this
+file as its response cache (see ai_scientist/shared.py).
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+CACHE_PATH_ENV = "AGENTVERSE_LLM_CACHE"
+CACHE_MODE_ENV = "AGENTVERSE_LLM_CACHE_MODE"
+CACHE_MAX_MB_ENV = "AGENTVERSE_LLM_CACHE_MAX_MB"
+
+CACHE_MODES = ("readwrite", "replay")
+# Writes after which the size of the cache is recounted, for the writes of other processes
+RECOUNT_WRITES = 1000
+# Eviction frees the cache down to this fraction of its bound, not just below it
+EVICT_TO = 0.9
+
+_cache_run: ContextVar[str] = ContextVar("llm_cache_run", default="")
+
+
+class CacheMissError(Exception):
+    """Raised in replay mode when a request is not in the cache."""
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def __str__(self):
+        return f"LLM response {self.key[:12]} is not cached (replay mode)"
+
+
+@contextlib.contextmanager
+def cache_run(run: str):
+    """Key the unseeded sampled requests made in the block by `run`"""
+    token = _cache_run.set(run)
+    try:
+        yield
+    finally:
+        _cache_run.reset(token)
+
+
+def get_cache_run() -> str:
+    return _cache_run.get()
+
+
+def make_cache_key(**request: Any) -> str:
+    """Hash a request, e.g. make_cache_key(model=..., messages=..., temperature=...)"""
+    canonical = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed LRU cache of serialized responses"""
+
+    def __init__(self, path: str, mode: str = "readwrite", max_bytes: int = 512 << 20):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode {mode}, expected one of {CACHE_MODES}")
+        self.path = path
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access ON responses(last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._size()
+
+    def _size(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    @property
+    def readonly(self) -> bool:
+        return self.mode == "replay"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if not self.readonly:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE key = ?",
+                    (time.time(), key),
+                )
+                self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        if self.readonly:
+            return
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._total_bytes += size - (replaced[0] if replaced else 0)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # The running total misses what other processes wrote, recount it
+        # before evicting and every RECOUNT_WRITES writes
+        if self._total_bytes > self.max_bytes or self.writes % RECOUNT_WRITES == 0:
+            self._total_bytes = self._size()
+        total = self._total_bytes
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY last_access ASC"
+        )
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            stale.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        self.evictions += len(stale)
+        self._total_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_cache_lock = threading.Lock()
+_caches: Dict[str, ResponseCache] = {}
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the cache configured by the environment, or None if disabled"""
+    path = os.environ.get(CACHE_PATH_ENV)
+    if not path:
+        return None
+    with _cache_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ResponseCache(
+                path,
+                mode=os.environ.get(CACHE_MODE_ENV, "readwrite"),
+                max_bytes=int(float(os.environ.get(CACHE_MAX_MB_ENV, 512)) * (1 << 20)),
+            )
+            _caches[path] = cache
+    return cache
@@ -0,0 +1,112 @@
+"""
+Stop sequences enforced on the client side, for streamed chat completions.
+
+Some models do not accept the `stop` parameter (e.g. o1-mini), and some
+boundaries are better cut by us than by the server. The response is then
+streamed, and the request is closed as soon as a stop sequence appears, so
+the tokens after it are neither generated much further nor paid for.
+
+Streamed responses of the pinned openai client carry no usage, so the
+tokens of a streamed request are counted locally with the model's
+tokenizer.
+"""
+
+import time
+from typing import List, Optional
+
+from agentverse.llms.base import LLMResult
+from agentverse.llms.utils.token_counter import count_string_tokens
+from agentverse.tracing import current_span
+
+
+def truncate_at_stop(text: str, stop: List[str]) -> Optional[str]:
+    """Text before the earliest stop sequence, or None if there is none"""
+    positions = [i for i in (text.find(s) for s in stop if s) if i >= 0]
+    return text[: min(positions)] if positions else None
+
+
+class StopSequenceCollector:
+    """Accumulates the deltas of a streamed completion until a stop sequence"""
+
+    def __init__(self, stop: List[str]):
+        self.stop = [s for s in stop if s]
+        self.window = max((len(s) for s in self.stop), default=1)
+        self.text = ""
+        self.finish_reason = ""
+        self.usage = None
+        self.stopped = False
+        self.first_token_at: Optional[float] = None
+
+    def feed(self, chunk) -> bool:
+        """Add a chunk, return True once a stop sequence has been produced"""
+        if getattr(chunk, "usage", None) is not None:
+            self.usage = chunk.usage
+        if not chunk.choices:
+            return False
+        choice = chunk.choices[0]
+        if choice.finish_reason:
+            self.finish_reason = choice.finish_reason
+        delta = choice.delta.content or ""
+        if not delta:
+            return False
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        # Only the tail can contain a stop sequence that the new delta completes
+        start = max(0, len(self.text) - self.window + 1)
+        self.text += delta
+        truncated = truncate_at_stop(self.text[start:], self.stop)
+        if truncated is not None:
+            self.text = self.text[:start] + truncated
+            self.finish_reason = "stop"
+            self.stopped = True
+        return self.stopped
+
+    def result(self, prompt: str, model: str) -> LLMResult:
+        if self.usage is not None:
+            send_tokens = self.usage.prompt_tokens
+            recv_tokens = self.usage.completion_tokens
+        else:
+            # No usage chunk: not sent, or the stream was closed before it
+            send_tokens = count_string_tokens(prompt, model)
+            recv_tokens = count_string_tokens(self.text, model)
+        return LLMResult(
+            content=self.text,
+            send_tokens=send_tokens,
+            recv_tokens=recv_tokens,
+            total_tokens=send_tokens + recv_tokens,
+            finish_reason=self.finish_reason,
+        )
+
+    def trace(self, sent_at: Optional[float]) -> None:
+        """Record the time to first token, from `sent_at` (a perf_counter time)"""
+        if sent_at is not None and self.first_token_at is not None:
+            current_span().set(ttft_ms=round((self.first_token_at - sent_at) * 1000.0, 1))
+
+
+def read_until_stop(
+    stream, stop: List[str], prompt: str, model: str, sent_at: Optional[float] = None
+) -> LLMResult:
+    collector = StopSequenceCollector(stop)
+    try:
+        for chunk in stream:
+            if collector.feed(chunk):
+                break
+    finally:
+        # Closing the connection is what stops the generation
+        stream.response.close()
+    collector.trace(sent_at)
+    return collector.result(prompt, model)
+
+
+async def aread_until_stop(
+    stream, stop: List[str], prompt: str, model: str, sent_at: Optional[float] = None
+) -> LLMResult:
+    collector = StopSequenceCollector(stop)
+    try:
+        async for chunk in stream:
+            if collector.feed(chunk):
+                break
+    finally:
+        await stream.response.aclose()
+    collector.trace(sent_at)
+    return collector.result(prompt, model)
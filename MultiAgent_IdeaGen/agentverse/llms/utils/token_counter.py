@@ -1,65 +1,174 @@
-# Modified from AutoGPT https://github.com/Significant-Gravitas/AutoGPT/blob/release-v0.4.7/autogpt/llm/utils/token_counter.py
-
-import tiktoken
-from typing import List, Union, Dict
-from agentverse.logging import logger
-from agentverse.message import Message
-from agentverse.llms import LOCAL_LLMS, LOCAL_LLMS_MAPPING
-
-
-def count_string_tokens(prompt: str = "", model: str = "gpt-3.5-turbo") -> int:
-    if model.startswith("gpt-3.5-turbo") or model.startswith("gpt-4"):
-        return len(tiktoken.encoding_for_model(model).encode(prompt))
-    elif model.lower() in LOCAL_LLMS or model in LOCAL_LLMS:
-        from transformers import AutoTokenizer
-        encoding = AutoTokenizer.from_pretrained(LOCAL_LLMS_MAPPING[model.lower()]['hf_model_name'])
-        return len(encoding.encode(prompt))
-
-
-def count_message_tokens(
-    messages: Union[Dict, List[Dict]], model: str = "gpt-3.5-turbo"
-) -> int:
-    if isinstance(messages, dict):
-        messages = [messages]
-
-    if model.startswith("gpt-3.5-turbo"):
-        tokens_per_message = (
-            4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
-        )
-        tokens_per_name = -1  # if there's a name, the role is omitted
-        encoding_model = "gpt-3.5-turbo"
-    elif model.startswith("gpt-4"):
-        tokens_per_message = 3
-        tokens_per_name = 1
-        encoding_model = "gpt-4"
-    elif model.lower() in LOCAL_LLMS or model in LOCAL_LLMS:
-        from transformers import AutoTokenizer
-
-        encoding = AutoTokenizer.from_pretrained(LOCAL_LLMS_MAPPING[model.lower()]['hf_model_name'])
-    else:
-        raise NotImplementedError(
-            f"count_message_tokens() is not implemented for model {model}.\n"
-            " See https://github.com/openai/openai-python/blob/main/chatml.md for"
-            " information on how messages are converted to tokens."
-        )
-    if model.startswith("gpt-3.5-turbo") or model.startswith("gpt-4"):
-        try:
-            encoding = tiktoken.encoding_for_model(encoding_model)
-        except KeyError:
-            logger.warn("Warning: model not found. Using cl100k_base encoding.")
-            encoding = tiktoken.get_encoding("cl100k_base")
-
-    num_tokens = 0
-    for message in messages:
-        num_tokens += tokens_per_message
-        for key, value in message.items():
-            # TODO: count number of function_call's token more accurately
-            if key == "function_call":
-                num_tokens += len(encoding.encode(value["name"]))
-                num_tokens += len(encoding.encode(value["arguments"]))
-            else:
-                num_tokens += len(encoding.encode(value))
-                if key == "name":
-                    num_tokens += tokens_per_name
-    num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
-    return num_tokens
+# Modified from AutoGPT https://github.com/Significant-Gravitas/AutoGPT/blob/release-v0.4.7/autogpt/llm/utils/token_counter.py
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple, Union
+from agentverse.logging import logger
+from agentverse.message import Message
+from agentverse.llms import LOCAL_LLMS, LOCAL_LLMS_MAPPING
+
+# Local tokenizer files (a tokenizer.json or a Hugging Face tokenizer directory)
+# of model families whose tokenizer is not in tiktoken
+TOKENIZER_PATH_ENVS = {
+    "deepseek": "DEEPSEEK_TOKENIZER_PATH",
+    "qwen": "QWEN_TOKENIZER_PATH",
+}
+FALLBACK_ENCODING = "cl100k_base"
+# Number of token counts of strings kept by _count_tokens
+COUNT_CACHE_SIZE = 4096
+
+_tokenizers: Dict[str, Callable[[str], int]] = {}
+_tokenizers_lock = threading.Lock()
+_counts: "OrderedDict[Tuple[bytes, int, str], int]" = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def _estimate_tokens(text: str) -> int:
+    # About 4 characters per token in English text
+    return (len(text) + 3) // 4
+
+
+def _tiktoken_counter(model: str) -> Callable[[str], int]:
+    import tiktoken
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding(FALLBACK_ENCODING)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _local_file_counter(path: str) -> Callable[[str], int]:
+    tokenizer_file = path if path.endswith(".json") else os.path.join(path, "tokenizer.json")
+    if os.path.isfile(tokenizer_file):
+        try:
+            from tokenizers import Tokenizer
+        except ImportError:
+            pass
+        else:
+            tokenizer = Tokenizer.from_file(tokenizer_file)
+            return lambda text: len(
+                tokenizer.encode(text, add_special_tokens=False).ids
+            )
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(
+        os.path.dirname(path) if path.endswith(".json") else path
+    )
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+
+
+def _load_counter(model: str) -> Callable[[str], int]:
+    name = model.lower()
+    if name.startswith("gpt-") or name.startswith("o1"):
+        return _tiktoken_counter(model)
+    if name in LOCAL_LLMS:
+        from transformers import AutoTokenizer
+
+        encoding = AutoTokenizer.from_pretrained(LOCAL_LLMS_MAPPING[name]["hf_model_name"])
+        return lambda text: len(encoding.encode(text))
+    for family, env in TOKENIZER_PATH_ENVS.items():
+        if name.startswith(family):
+            path = os.environ.get(env)
+            if path:
+                return _local_file_counter(path)
+            logger.warn(
+                f"No tokenizer for {model}, set {env} to its tokenizer files. "
+                f"Counting tokens with {FALLBACK_ENCODING}."
+            )
+            break
+    return _tiktoken_counter(FALLBACK_ENCODING)
+
+
+def get_token_counter(model: str) -> Callable[[str], int]:
+    """Return the memoized token counting function of a model.
+
+    Tokenizers are loaded lazily, once per model and process. If a tokenizer
+    cannot be loaded, e.g. tiktoken's encodings cannot be downloaded offline,
+    tokens are estimated from the length of the text instead.
+    """
+    counter = _tokenizers.get(model)
+    if counter is None:
+        with _tokenizers_lock:
+            counter = _tokenizers.get(model)
+            if counter is None:
+                try:
+                    counter = _load_counter(model)
+                except Exception as e:
+                    logger.warn(
+                        f"Could not load a tokenizer for {model} ({type(e).__name__}: {e}), "
+                        "estimating 4 characters per token."
+                    )
+                    counter = _estimate_tokens
+                _tokenizers[model] = counter
+    return counter
+
+
+def _count_tokens(text: str, model: str) -> int:
+    # Keyed by a digest of the text, so that whole prompts are not kept alive
+    key = (hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest(), len(text), model)
+    with _counts_lock:
+        count = _counts.get(key)
+        if count is not None:
+            _counts.move_to_end(key)
+            return count
+    count = get_token_counter(model)(text)
+    with _counts_lock:
+        _counts[key] = count
+        if len(_counts) > COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return count
+
+
+def count_string_tokens(prompt: str = "", model: str = "gpt-3.5-turbo") -> int:
+    return _count_tokens(prompt, model)
+
+
+def count_rendered_message_tokens(
+    message: Message, model: str = "gpt-3.5-turbo", add_sender_prefix: bool = True
+) -> int:
+    """Tokens of the message as it appears in the chat history, cached on the message"""
+    key = (model, add_sender_prefix)
+    count = message._token_counts.get(key)
+    if count is None:
+        if add_sender_prefix and message.sender != "":
+            text = f"[{message.sender}]: {message.content}"
+        else:
+            text = str(message.content)
+        count = count_string_tokens(text, model)
+        message._token_counts[key] = count
+    return count
+
+
+def count_message_tokens(
+    messages: Union[Dict, List[Dict]], model: str = "gpt-3.5-turbo"
+) -> int:
+    if isinstance(messages, dict):
+        messages = [messages]
+
+    if model.startswith("gpt-3.5-turbo"):
+        tokens_per_message = (
+            4  # every message follows <|start|>{role/name}\n{content}<|end|>\n
+        )
+        tokens_per_name = -1  # if there's a name, the role is omitted
+    else:
+        # gpt-4 overhead, a close estimate for the other chat models
+        tokens_per_message = 3
+        tokens_per_name = 1
+
+    num_tokens = 0
+    for message in messages:
+        num_tokens += tokens_per_message
+        for key, value in message.items():
+            # TODO: count number of function_call's token more accurately
+            if key == "function_call":
+                num_tokens += _count_tokens(value["name"], model)
+                num_tokens += _count_tokens(value["arguments"], model)
+            else:
+                num_tokens += _count_tokens(value, model)
+                if key == "name":
+                    num_tokens += tokens_per_name
+    num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
+    return num_tokens
@@ -13,6 +13,17 @@ from agentverse.utils import Singleton
 
 
 # from autogpt.speech import say_text
+class LazyFileHandler(logging.FileHandler):
+    """File handler that creates its directory and opens its file on the first record"""
+
+    def __init__(self, filename, mode="a", encoding=None):
+        super().__init__(filename, mode, encoding, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
 class JsonFileHandler(logging.FileHandler):
     def __init__(self, filename, mode="a", encoding=None, delay=False):
         super().__init__(filename, mode, encoding, delay)
@@ -36,11 +47,9 @@ class Logger(metaclass=Singleton):
     """
 
     def __init__(self):
-        # create log directory if it doesn't exist
+        # The log directory and files are created when something is first logged
         this_files_dir_path = os.path.dirname(__file__)
         log_dir = os.path.join(this_files_dir_path, "../logs")
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
 
         log_file = "activity.log"
         error_file = "error.log"
@@ -58,9 +67,7 @@ class Logger(metaclass=Singleton):
         self.console_handler.setFormatter(console_formatter)
 
         # Info handler in activity.log
-        self.file_handler = logging.FileHandler(
-            os.path.join(log_dir, log_file), "a", "utf-8"
-        )
+        self.file_handler = LazyFileHandler(os.path.join(log_dir, log_file), "a", "utf-8")
         self.file_handler.setLevel(logging.DEBUG)
         info_formatter = AutoGptFormatter(
             "%(asctime)s %(levelname)s %(title)s %(message_no_color)s"
@@ -68,9 +75,7 @@ class Logger(metaclass=Singleton):
         self.file_handler.setFormatter(info_formatter)
 
         # Error handler error.log
-        error_handler = logging.FileHandler(
-            os.path.join(log_dir, error_file), "a", "utf-8"
-        )
+        error_handler = LazyFileHandler(os.path.join(log_dir, error_file), "a", "utf-8")
         error_handler.setLevel(logging.ERROR)
         error_formatter = AutoGptFormatter(
             "%(asctime)s %(levelname)s %(module)s:%(funcName)s:%(lineno)d %(title)s"
@@ -179,6 +184,7 @@ class Logger(metaclass=Singleton):
         # Define log directory
         this_files_dir_path = os.path.dirname(__file__)
         log_dir = os.path.join(this_files_dir_path, "../logs")
+        os.makedirs(log_dir, exist_ok=True)
 
         # Create a handler for JSON files
         json_file_path = os.path.join(log_dir, file_name)
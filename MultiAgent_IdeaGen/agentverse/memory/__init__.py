@@ -3,4 +3,19 @@ from agentverse.registry import Registry
 memory_registry = Registry(name="MemoryRegistry")
 
 from .base import BaseMemory
-from .chat_history import ChatHistoryMemory
\ No newline at end of file
+from .chat_history import ChatHistoryMemory
+from .transcript import Transcript
+from .shared_chat_history import SharedChatHistoryMemory
+
+# Needs numpy (and faiss when installed), imported on first use
+memory_registry.register_lazy(
+    "vector_history", "agentverse.memory.vector_history:VectorHistoryMemory"
+)
+
+
+def __getattr__(name):
+    if name == "VectorHistoryMemory":
+        from .vector_history import VectorHistoryMemory
+
+        return VectorHistoryMemory
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Dict, List
+from typing import Any, Callable, Dict, List
 
 from pydantic import BaseModel, Field
 
@@ -21,3 +21,11 @@ class BaseMemory(BaseModel):
 
     def to_messages(self) -> List[dict]:
         pass
+
+    def state_dict(self, encode: Callable[[Message], Any]) -> Dict:
+        """State to checkpoint, messages are stored through `encode`"""
+        return {}
+
+    def load_state_dict(self, state: Dict, decode: Callable[[Any], Message]) -> None:
+        """Restore a state returned by `state_dict`"""
+        pass
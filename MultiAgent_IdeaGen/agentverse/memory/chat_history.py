@@ -1,30 +1,47 @@
+import asyncio
 import json
 import logging
 import os
-from openai import OpenAI
 import copy
-from typing import List, Optional, Tuple, Dict
+from typing import Any, Callable, List, Optional, Tuple, Dict
 
-from pydantic import Field
+from pydantic import Field, PrivateAttr
 
 from agentverse.message import Message, ExecutorMessage
 from . import memory_registry
 from .base import BaseMemory
-from agentverse.llms.utils import count_message_tokens, count_string_tokens
-from agentverse.llms import OpenAIChat
+from .transcript import render_message
+from agentverse.llms.utils import (
+    count_message_tokens,
+    count_rendered_message_tokens,
+    count_string_tokens,
+)
+from agentverse.llms import BaseLLM
+from agentverse.logging import logger
+
+# How the running summary appears in the rendered chat history
+SUMMARY_TEMPLATE = "[Summary of the earlier discussion]: {summary}"
 
-try:
-    from agentverse.llms.openai import DEFAULT_CLIENT as openai_client
-except ImportError:
-    openai_client = None
 
 @memory_registry.register("chat_history")
 class ChatHistoryMemory(BaseMemory):
+    """Chat history replayed verbatim.
+
+    With `has_summary` and a `summary_llm`, older messages are compacted into
+    a running summary once the verbatim part exceeds `max_history_tokens`.
+    Compaction runs as a background task while the other agents are
+    generating and is swapped in when done, the most recent
+    `keep_recent_messages` messages always stay verbatim.
+    """
+
     messages: List[Message] = Field(default=[])
     has_summary: bool = False
     max_summary_tlength: int = 500
     last_trimmed_index: int = 0
     summary: str = ""
+    summary_llm: Optional[BaseLLM] = None
+    max_history_tokens: int = 6000
+    keep_recent_messages: int = 6
     SUMMARIZATION_PROMPT: str = '''Your task is to create a concise running summary of actions and information results in the provided text, focusing on key and potentially important information to remember.
 
 You will receive the current summary and your latest actions. Combine them, adding relevant key information from the latest development in 1st person past tense and keeping the summary concise.
@@ -39,23 +56,138 @@ Latest Development:
 {new_events}
 """
 '''
+    # Rendered history per prefix mode: (number of messages rendered, text)
+    _rendered: Dict[bool, Tuple[int, str]] = PrivateAttr(default_factory=dict)
+    _compaction: Optional[asyncio.Task] = PrivateAttr(default=None)
+    # Bumped on reset so that a compaction of the old history is discarded
+    _generation: int = PrivateAttr(default=0)
+    # Per model, prefix sums of the token counts of the rendered messages
+    _token_prefix: Dict[str, List[int]] = PrivateAttr(default_factory=dict)
 
     def add_message(self, messages: List[Message]) -> None:
         for message in messages:
             self.messages.append(message)
+        self._schedule_compaction()
+
+    def state_dict(self, encode: Callable[[Message], Any]) -> Dict:
+        return {
+            "messages": [encode(message) for message in self.messages],
+            "summary": self.summary,
+            "last_trimmed_index": self.last_trimmed_index,
+        }
+
+    def load_state_dict(self, state: Dict, decode: Callable[[Any], Message]) -> None:
+        self.reset()
+        self.messages = [decode(message) for message in state.get("messages", [])]
+        self.summary = state.get("summary", "")
+        self.last_trimmed_index = state.get("last_trimmed_index", 0)
+
+    def token_prefix_sums(self, model: str) -> List[int]:
+        """prefix[i] is the number of tokens of messages[:i] rendered with sender prefix.
+
+        Extended incrementally, so the token count of any window of the
+        history is a subtraction.
+        """
+        prefix = self._token_prefix.get(model)
+        if prefix is None or len(prefix) > len(self.messages) + 1:
+            prefix = self._token_prefix[model] = [0]
+        for message in self.messages[len(prefix) - 1 :]:
+            # One extra token for the line break joining the history
+            prefix.append(prefix[-1] + count_rendered_message_tokens(message, model) + 1)
+        return prefix
+
+    def _verbatim_start(self) -> int:
+        return self.last_trimmed_index if self.has_summary else 0
+
+    def history(self) -> List[Message]:
+        """The messages seen verbatim by the owner of this memory"""
+        start = self._verbatim_start()
+        return self.messages[start:] if start else self.messages
 
     def to_string(self, add_sender_prefix: bool = False) -> str:
-        if add_sender_prefix:
-            return "\n".join(
-                [
-                    f"[{message.sender}]: {message.content}"
-                    if message.sender != ""
-                    else message.content
-                    for message in self.messages
-                ]
-            )
-        else:
-            return "\n".join([message.content for message in self.messages])
+        start = self._verbatim_start()
+        text = self._render_incremental(
+            add_sender_prefix,
+            len(self.messages) - start,
+            lambda offset: [
+                render_message(message, add_sender_prefix)
+                for message in self.messages[start + offset :]
+            ],
+        )
+        if not (self.has_summary and self.summary):
+            return text
+        summary = SUMMARY_TEMPLATE.format(summary=self.summary)
+        return f"{summary}\n{text}" if text else summary
+
+    def _schedule_compaction(self) -> None:
+        if not self.has_summary or self.summary_llm is None:
+            return
+        if self._compaction is not None and not self._compaction.done():
+            return
+        start = self.last_trimmed_index
+        end = len(self.messages) - self.keep_recent_messages
+        if end <= start:
+            return
+        model = getattr(self.summary_llm.args, "model", "")
+        prefix = self.token_prefix_sums(model)
+        if prefix[-1] - prefix[start] <= self.max_history_tokens:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Synchronous use, compact at the next message added on a loop
+            return
+        self._compaction = loop.create_task(
+            self._compact(start, end, self._generation)
+        )
+
+    async def _compact(self, start: int, end: int, generation: int) -> None:
+        """Fold messages[start:end] into the running summary"""
+        new_events = "\n".join(
+            [render_message(m, add_sender_prefix=True) for m in self.messages[start:end]]
+        )
+        prompt = self.SUMMARIZATION_PROMPT.format(
+            summary=self.summary, new_events=new_events
+        )
+        try:
+            response = await self.summary_llm.agenerate_response(prompt)
+        except Exception as e:
+            logger.warn(f"Failed to summarize the chat history: {e}")
+            return
+        if generation != self._generation or self.last_trimmed_index != start:
+            return
+        self.summary = response.content.strip()
+        self.last_trimmed_index = end
+        self.invalidate_rendered()
+
+    async def wait_for_compaction(self) -> None:
+        """Wait until a running compaction has been swapped in"""
+        if self._compaction is not None and not self._compaction.done():
+            await self._compaction
+
+    def _render_incremental(
+        self,
+        add_sender_prefix: bool,
+        count: int,
+        render_from: Callable[[int], List[str]],
+    ) -> str:
+        """Extend the rendered history with the lines of messages it lacks.
+
+        `render_from(start)` renders the messages from index `start` on. Only
+        appending is tracked; any other change of the history must go through
+        `invalidate_rendered`.
+        """
+        rendered_count, text = self._rendered.get(add_sender_prefix, (0, ""))
+        if rendered_count > count:
+            rendered_count, text = 0, ""
+        if rendered_count < count:
+            new_text = "\n".join(render_from(rendered_count))
+            text = new_text if rendered_count == 0 else f"{text}\n{new_text}"
+            self._rendered[add_sender_prefix] = (count, text)
+        return text
+
+    def invalidate_rendered(self) -> None:
+        self._rendered = {}
 
     async def to_messages(
         self,
@@ -68,9 +200,10 @@ Latest Development:
         messages = []
 
         if self.has_summary:
-            start_index = self.last_trimmed_index
+            # history() already starts at last_trimmed_index
+            start_index = 0
 
-        for message in self.messages[start_index:]:
+        for message in self.history()[start_index:]:
             if message.sender == my_name:
                 if isinstance(message, ExecutorMessage):
                     if message.tool_name != "":
@@ -130,13 +263,26 @@ Latest Development:
 
     def reset(self) -> None:
         self.messages = []
+        if self._compaction is not None and not self._compaction.done():
+            self._compaction.cancel()
+        self._compaction = None
+        self._generation += 1
+        self.summary = ""
+        self.last_trimmed_index = 0
+        self._token_prefix = {}
+        self.invalidate_rendered()
 
     async def trim_messages(
         self, current_message_chain: List[Dict], model: str, history: List[Dict]
     ) -> Tuple[Dict, List[Dict]]:
-        new_messages_not_in_chain = [
-            msg for msg in history if msg not in current_message_chain
-        ]
+        # Messages are compared by identity, the chain holds the same dicts
+        in_chain = set(map(id, current_message_chain))
+        new_messages_not_in_chain = []
+        last_index = 0
+        for index, msg in enumerate(history):
+            if id(msg) not in in_chain:
+                new_messages_not_in_chain.append(msg)
+                last_index = index
 
         if not new_messages_not_in_chain:
             return self.summary_message(), []
@@ -145,8 +291,7 @@ Latest Development:
             new_events=new_messages_not_in_chain, model=model
         )
 
-        last_message = new_messages_not_in_chain[-1]
-        self.last_trimmed_index += history.index(last_message)
+        self.last_trimmed_index += last_index
 
         return new_summary_message, new_messages_not_in_chain
 
@@ -163,6 +308,9 @@ Latest Development:
 
         new_events = copy.deepcopy(new_events)
 
+        # Delete all user messages
+        new_events = [event for event in new_events if event["role"] != "user"]
+
         # Replace "assistant" with "you". This produces much better first person past tense results.
         for event in new_events:
             if event["role"].lower() == "assistant":
@@ -171,14 +319,12 @@ Latest Development:
             elif event["role"].lower() == "system":
                 event["role"] = "your computer"
 
-            # Delete all user messages
-            elif event["role"] == "user":
-                new_events.remove(event)
-
         prompt_template_length = len(
             self.SUMMARIZATION_PROMPT.format(summary="", new_events="")
         )
-        max_input_tokens = OpenAIChat.send_token_limit(model) - max_summary_length
+        from agentverse.agents.context_budget import get_context_length
+
+        max_input_tokens = get_context_length(model) - max_summary_length
         summary_tlength = count_string_tokens(self.summary, model)
         batch: List[Dict] = []
         batch_tlength = 0
@@ -206,20 +352,15 @@ Latest Development:
     async def _update_summary_with_batch(
         self, new_events_batch: List[dict], model: str, max_summary_length: int
     ) -> None:
-        if openai_client is None:
-            # Skip summarization if no OpenAI client is available
+        if self.summary_llm is None:
+            logger.warn("has_summary is set but the memory has no summary_llm")
             return
-            
+
         prompt = self.SUMMARIZATION_PROMPT.format(
             summary=self.summary, new_events=new_events_batch
         )
-
-        self.summary = await openai_client.chat.completions.acreate(
-            messages=[{"role": "user", "content": prompt}],
-            model=model,
-            max_tokens=max_summary_length,
-            temperature=0.5,
-        ).choices[0].message.content
+        response = await self.summary_llm.agenerate_response(prompt)
+        self.summary = response.content.strip()
 
     def summary_message(self) -> dict:
         return {
@@ -229,19 +370,24 @@ Latest Development:
 
 
 def add_history_upto_token_limit(
-    prompt: List[dict], history: List[dict], t_limit: int, model: str
+    prompt: List[dict],
+    history: List[dict],
+    t_limit: int,
+    model: str,
 ) -> List[Message]:
-    limit_reached = False
+    """Prepend the most recent messages that fit in `t_limit` tokens to `prompt`
+    and return the older ones.
+
+    Messages are counted from the newest and counting stops at the first one
+    that does not fit.
+    """
+    start = len(history)
     current_prompt_length = 0
-    trimmed_messages: List[Dict] = []
-    for message in history[::-1]:
-        token_to_add = count_message_tokens(message, model)
+    while start > 0:
+        token_to_add = count_message_tokens(history[start - 1], model)
         if current_prompt_length + token_to_add > t_limit:
-            limit_reached = True
-
-        if not limit_reached:
-            prompt.insert(0, message)
-            current_prompt_length += token_to_add
-        else:
-            trimmed_messages.insert(0, message)
-    return trimmed_messages
+            break
+        current_prompt_length += token_to_add
+        start -= 1
+    prompt[:0] = history[start:]
+    return history[:start]
@@ -0,0 +1,89 @@
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import Field
+
+from agentverse.message import Message
+from . import memory_registry
+from .chat_history import ChatHistoryMemory
+from .transcript import Transcript
+
+
+@memory_registry.register("shared_chat_history")
+class SharedChatHistoryMemory(ChatHistoryMemory):
+    """Chat history read from the environment's transcript.
+
+    Instead of holding its own copy of every message, the memory keeps a
+    cursor into the shared `Transcript` and the indices of the entries its
+    owner may see. Messages added directly to the agent are appended to the
+    transcript as private to it, by its index among the environment's agents
+    since names may be shared. Until the environment attaches a transcript
+    it behaves like `ChatHistoryMemory`; summary compaction only applies
+    before that.
+    """
+
+    transcript: Optional[Transcript] = None
+    owner: str = ""
+    owner_index: Optional[int] = None
+    cursor: int = 0
+    visible: List[int] = Field(default_factory=list)
+
+    def attach(
+        self, transcript: Transcript, owner: str, owner_index: Optional[int] = None
+    ) -> None:
+        self.transcript = transcript
+        self.owner = owner
+        self.owner_index = owner_index
+        self.cursor = 0
+        self.visible = []
+        self.invalidate_rendered()
+
+    def _sync(self) -> None:
+        transcript = self.transcript
+        if self.cursor > len(transcript):
+            # The environment started a new transcript
+            self.cursor = 0
+            self.visible = []
+            self.invalidate_rendered()
+        for index in range(self.cursor, len(transcript)):
+            if transcript.is_visible(index, self.owner, self.owner_index):
+                self.visible.append(index)
+        self.cursor = len(transcript)
+
+    def add_message(self, messages: List[Message]) -> None:
+        if self.transcript is None:
+            return super().add_message(messages)
+        for message in messages:
+            self.transcript.append(message, receiver={self.owner}, owner=self.owner_index)
+
+    def history(self) -> List[Message]:
+        if self.transcript is None:
+            return super().history()
+        self._sync()
+        return [self.transcript.messages[i] for i in self.visible]
+
+    def to_string(self, add_sender_prefix: bool = False) -> str:
+        if self.transcript is None:
+            return super().to_string(add_sender_prefix)
+        self._sync()
+        return self._render_incremental(
+            add_sender_prefix,
+            len(self.visible),
+            lambda start: [
+                self.transcript.render(i, add_sender_prefix)
+                for i in self.visible[start:]
+            ],
+        )
+
+    def state_dict(self, encode: Callable[[Message], Any]) -> Dict:
+        # The transcript is checkpointed by the environment, only the view is stored
+        return {**super().state_dict(encode), "cursor": self.cursor, "visible": self.visible}
+
+    def load_state_dict(self, state: Dict, decode: Callable[[Any], Message]) -> None:
+        super().load_state_dict(state, decode)
+        self.cursor = state.get("cursor", 0)
+        self.visible = list(state.get("visible", []))
+
+    def reset(self) -> None:
+        super().reset()
+        self.cursor = 0
+        self.visible = []
@@ -0,0 +1,81 @@
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set
+
+from pydantic import BaseModel, Field, PrivateAttr
+
+from agentverse.message import Message
+
+
+def render_message(message: Message, add_sender_prefix: bool = False) -> str:
+    if add_sender_prefix and message.sender != "":
+        return f"[{message.sender}]: {message.content}"
+    return message.content
+
+
+class Transcript(BaseModel):
+    """Append-only log of the messages exchanged in one environment.
+
+    Every message is stored once, together with the receivers it had when it
+    was sent, and agents read it through `SharedChatHistoryMemory` views.
+    Receivers are agent names; a message added to the memory of one agent is
+    instead owned by the index of that agent, so that agents sharing a name
+    (e.g. a researcher and its tool agent) do not see each other's. The
+    rendered line of each message is cached, so it is formatted once no matter
+    how many agents see it.
+    """
+
+    messages: List[Message] = Field(default_factory=list)
+    receivers: List[FrozenSet[str]] = Field(default_factory=list)
+    owners: List[Optional[int]] = Field(default_factory=list)
+    _lines: dict = PrivateAttr(default_factory=lambda: {False: [], True: []})
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(
+        self,
+        message: Message,
+        receiver: Optional[Set[str]] = None,
+        owner: Optional[int] = None,
+    ) -> int:
+        """Add a message, visible to `receiver` (default: its own receivers),
+        or only to the agent at index `owner` if given"""
+        # Snapshot the receivers, the updater consumes message.receiver
+        receiver = message.receiver if receiver is None else receiver
+        self.messages.append(message)
+        self.receivers.append(frozenset(receiver))
+        self.owners.append(owner)
+        return len(self.messages) - 1
+
+    def is_visible(
+        self, index: int, agent_name: str, agent_index: Optional[int] = None
+    ) -> bool:
+        owner = self.owners[index]
+        if owner is not None:
+            return owner == agent_index
+        receiver = self.receivers[index]
+        return "all" in receiver or agent_name in receiver
+
+    def render(self, index: int, add_sender_prefix: bool = False) -> str:
+        lines = self._lines[add_sender_prefix]
+        for message in self.messages[len(lines) : index + 1]:
+            lines.append(render_message(message, add_sender_prefix))
+        return lines[index]
+
+    def state_dict(self, encode: Callable[[Message], Any]) -> Dict:
+        return {
+            "messages": [encode(message) for message in self.messages],
+            "receivers": [sorted(receiver) for receiver in self.receivers],
+            "owners": self.owners,
+        }
+
+    def load_state_dict(self, state: Dict, decode: Callable[[Any], Message]) -> None:
+        self.reset()
+        owners = state.get("owners") or [None] * len(state["messages"])
+        for message, receiver, owner in zip(state["messages"], state["receivers"], owners):
+            self.append(decode(message), receiver=set(receiver), owner=owner)
+
+    def reset(self) -> None:
+        self.messages = []
+        self.receivers = []
+        self.owners = []
+        self._lines = {False: [], True: []}
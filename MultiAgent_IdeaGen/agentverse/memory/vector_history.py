@@ -0,0 +1,170 @@
+import re
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr
+
+from agentverse.message import Message
+from agentverse.registry import Registry
+from . import memory_registry
+from .chat_history import ChatHistoryMemory
+from .transcript import render_message
+
+embedder_registry = Registry(name="EmbedderRegistry")
+
+_WORD = re.compile(r"\w+")
+
+
+class BaseEmbedder(BaseModel):
+    dim: int = 1024
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return one L2-normalized float32 row per text"""
+        raise NotImplementedError
+
+
+@embedder_registry.register("hashing")
+class HashingEmbedder(BaseEmbedder):
+    """Feature hashing of word unigrams and bigrams with sublinear term frequency.
+
+    Needs no model or network, and the hash (crc32) is stable across
+    processes, so embeddings of a resumed discussion are the same.
+    """
+
+    dim: int = 1024
+    bigrams: bool = True
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD.findall(text.lower())
+        if not self.bigrams:
+            return words
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode("utf-8"))
+                # The top bit gives the sign, which keeps collisions unbiased
+                index, sign = h % self.dim, 1.0 if h & 0x80000000 else -1.0
+                counts[index] = counts.get(index, 0.0) + sign
+            for index, count in counts.items():
+                if count:
+                    vectors[row, index] = np.copysign(1.0 + np.log(abs(count)), count)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+class VectorIndex:
+    """Inner-product index over normalized vectors, FAISS-CPU backed if available"""
+
+    def __init__(self, dim: int, use_faiss: bool = True):
+        self.dim = dim
+        self._faiss_index = None
+        if use_faiss:
+            try:
+                import faiss
+
+                self._faiss_index = faiss.IndexFlatIP(dim)
+            except ImportError:
+                pass
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, vectors: np.ndarray) -> None:
+        if self._faiss_index is not None:
+            self._faiss_index.add(vectors)
+        else:
+            needed = self._size + len(vectors)
+            if needed > len(self._vectors):
+                # Grow geometrically so that adding is amortized O(1)
+                capacity = max(needed, 2 * len(self._vectors), 64)
+                grown = np.zeros((capacity, self.dim), dtype=np.float32)
+                grown[: self._size] = self._vectors[: self._size]
+                self._vectors = grown
+            self._vectors[self._size : needed] = vectors
+        self._size += len(vectors)
+
+    def search(self, query: np.ndarray, k: int, limit: Optional[int] = None) -> List[int]:
+        """Indices of the `k` vectors most similar to `query` among the first `limit`"""
+        limit = self._size if limit is None else min(limit, self._size)
+        k = min(k, limit)
+        if k <= 0:
+            return []
+        if self._faiss_index is not None:
+            # Ask for enough neighbours to still have k after dropping the newest ones
+            _, ids = self._faiss_index.search(query.reshape(1, -1), k + self._size - limit)
+            return [int(i) for i in ids[0] if 0 <= i < limit][:k]
+        scores = self._vectors[:limit] @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        return [int(i) for i in top[np.argsort(-scores[top])]]
+
+
+@memory_registry.register("vector_history")
+class VectorHistoryMemory(ChatHistoryMemory):
+    """Chat history that only replays the relevant part of the past.
+
+    Every message is embedded when it is added. The prompt gets the last
+    `recent_messages` messages verbatim, preceded by the `top_k` older
+    messages most similar to them, in chronological order.
+    """
+
+    top_k: int = 4
+    recent_messages: int = 6
+    embedder: BaseEmbedder = Field(default_factory=HashingEmbedder)
+    use_faiss: bool = True
+    _index: Optional[VectorIndex] = PrivateAttr(default=None)
+    # Selection for the current history length, shared by the prompt and its budget
+    _selected: Optional[Tuple[int, List[Message]]] = PrivateAttr(default=None)
+
+    def __init__(self, **kwargs):
+        embedder = kwargs.get("embedder")
+        if isinstance(embedder, dict):
+            embedder = dict(embedder)
+            kwargs["embedder"] = embedder_registry.build(
+                embedder.pop("type", "hashing"), **embedder
+            )
+        super().__init__(**kwargs)
+
+    def _get_index(self) -> VectorIndex:
+        if self._index is None or len(self._index) > len(self.messages):
+            # Rows past the end belong to messages that were replaced
+            self._index = VectorIndex(self.embedder.dim, self.use_faiss)
+            self._selected = None
+        if len(self._index) < len(self.messages):
+            # Messages set directly (e.g. restored) are embedded lazily
+            pending = self.messages[len(self._index) :]
+            self._index.add(self.embedder.embed([str(m.content) for m in pending]))
+        return self._index
+
+    def add_message(self, messages: List[Message]) -> None:
+        super().add_message(messages)
+        self._get_index()
+
+    def history(self) -> List[Message]:
+        recent_start = max(0, len(self.messages) - self.recent_messages)
+        if recent_start == 0 or self.top_k <= 0:
+            return self.messages
+        if self._selected is not None and self._selected[0] == len(self.messages):
+            return self._selected[1]
+        recent = self.messages[recent_start:]
+        query = self.embedder.embed(["\n".join([str(m.content) for m in recent])])[0]
+        relevant = sorted(self._get_index().search(query, self.top_k, limit=recent_start))
+        selected = [self.messages[i] for i in relevant] + recent
+        self._selected = (len(self.messages), selected)
+        return selected
+
+    def to_string(self, add_sender_prefix: bool = False) -> str:
+        return "\n".join(
+            [render_message(message, add_sender_prefix) for message in self.history()]
+        )
+
+    def reset(self) -> None:
+        super().reset()
+        self._index = None
+        self._selected = None
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Tuple, Set, Union, Any
+from pydantic import BaseModel, Field, PrivateAttr
+from typing import Dict, List, Tuple, Set, Union, Any
 
 from agentverse.utils import AgentAction
 
@@ -10,8 +10,26 @@ class Message(BaseModel):
     receiver: Set[str] = Field(default=set({"all"}))
     sender_agent: object = Field(default=None)
     tool_response: List[Tuple[AgentAction, str]] = Field(default=[])
+    # Token counts of the rendered message per (model, sender prefix)
+    _token_counts: Dict[Tuple[str, bool], int] = PrivateAttr(default_factory=dict)
 
 
 class ExecutorMessage(Message):
     tool_name: str = Field(default="")
     tool_input: Any = None
+
+
+def message_to_dict(message: Message) -> Dict[str, Any]:
+    """JSON-serializable form of a message, without its sender agent"""
+    data = message.dict(exclude={"sender_agent"})
+    data["receiver"] = sorted(data["receiver"])
+    if isinstance(message, ExecutorMessage):
+        data["message_type"] = "executor"
+    return data
+
+
+def message_from_dict(data: Dict[str, Any]) -> Message:
+    data = dict(data)
+    if data.pop("message_type", None) == "executor":
+        return ExecutorMessage(**data)
+    return Message(**data)
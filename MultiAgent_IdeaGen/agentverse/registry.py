@@ -1,10 +1,16 @@
+import importlib
 from typing import Dict
 
 from pydantic import BaseModel
 
 
 class Registry(BaseModel):
-    """Registry for storing and building classes."""
+    """Registry for storing and building classes.
+
+    Entries can also be registered lazily as "module:attribute" strings. The
+    module is imported on the first build of the entry, so optional heavy
+    dependencies are only loaded by the configurations that use them.
+    """
 
     name: str
     entries: Dict = {}
@@ -16,12 +22,26 @@ class Registry(BaseModel):
 
         return decorator
 
-    def build(self, type: str, **kwargs):
+    def register_lazy(self, key: str, target: str) -> None:
+        """Register `target` ("module:attribute") under `key`, imported on first use"""
+        # An entry registered by an already imported module takes precedence
+        self.entries.setdefault(key, target)
+
+    def get(self, type: str):
         if type not in self.entries:
             raise ValueError(
                 f'{type} is not registered. Please register with the .register("{type}") method provided in {self.name} registry'
             )
-        return self.entries[type](**kwargs)
+        entry = self.entries[type]
+        if isinstance(entry, str):
+            module_name, _, attribute = entry.partition(":")
+            # Importing the module usually registers the class itself
+            entry = getattr(importlib.import_module(module_name), attribute)
+            self.entries[type] = entry
+        return entry
+
+    def build(self, type: str, **kwargs):
+        return self.get(type)(**kwargs)
 
     def get_all_entries(self):
-        return self.entries
+        return {key: self.get(key) for key in list(self.entries)}
@@ -1,20 +1,52 @@
 import asyncio
+import contextlib
+import copy
 import logging
-from typing import List
+import os
+import re
+import sys
+import time
+import uuid
+from typing import Any, Awaitable, Dict, List, Optional
 
 # from agentverse.agents import Agent
 from agentverse.agents.simulation_agent.conversation import BaseAgent
 from agentverse.environments import BaseEnvironment
-from agentverse.initialization import load_agent, load_environment, prepare_task_config
+from agentverse.checkpoint import environment_state, fork_random_states, restore_environment
+from agentverse.initialization import (
+    build_task_config,
+    load_agent,
+    load_environment,
+    read_task_config,
+)
+from agentverse.llms.utils.client_pool import aclose_async_clients
+from agentverse.llms.utils.response_cache import cache_run
+from agentverse.tracing import TRACE_DIR_ENV, Tracer, format_summary, get_tracer, tracing
 
 openai_logger = logging.getLogger("openai")
 openai_logger.setLevel(logging.WARNING)
+trace_logger = logging.getLogger(__name__)
 
 
 class Simulation:
-    def __init__(self, agents: List[BaseAgent], environment: BaseEnvironment):
+    def __init__(
+        self,
+        agents: List[BaseAgent],
+        environment: BaseEnvironment,
+        config: Optional[Dict] = None,
+        task: str = "",
+    ):
         self.agents = agents
         self.environment = environment
+        # The unbuilt config, kept to build the children of a fork
+        self.config = config
+        self.task = task
+        # JSONL file of the spans of the next run, see agentverse.tracing
+        self.trace_path: Optional[str] = None
+        self.trace_summary: Optional[Dict[str, Any]] = None
+        # Which repetition of the config this is, it keys the cached unseeded
+        # samples (see agentverse.llms.utils.response_cache)
+        self.cache_run = ""
 
     @classmethod
     def from_task(cls, task: str, tasks_dir: str):
@@ -23,8 +55,20 @@ class Simulation:
         Then this method will load the configuration from the yaml file in that directory.
         """
         # Prepare the config of the task
-        task_config = prepare_task_config(task, tasks_dir)
+        return cls.from_config(read_task_config(task, tasks_dir), task)
 
+    @classmethod
+    def from_config(cls, config: Dict, task: str = ""):
+        """Build an AgentVerse from an already parsed yaml config,
+        e.g. one whose topic placeholders were filled in memory.
+        """
+        simulation = cls._from_task_config(build_task_config(copy.deepcopy(config), task))
+        simulation.config = config
+        simulation.task = task
+        return simulation
+
+    @classmethod
+    def _from_task_config(cls, task_config: Dict):
         # Build the agents
         agents = []
         for agent_configs in task_config["agents"]:
@@ -40,11 +84,132 @@ class Simulation:
 
     def run(self):
         """Run the environment from scratch until it is done."""
+        asyncio.run(_close_clients_after(self.arun()))
+
+    async def arun(self):
+        """Asynchronous version of run.
+        The whole discussion is driven on the caller's event loop, so pooled
+        async clients are reused across turns.
+        """
         self.environment.reset()
-        while not self.environment.is_done():
-            asyncio.run(self.environment.step())
+        await self.acontinue()
+
+    def resume(self, checkpoint: str):
+        """Restore the state saved in `checkpoint` and run the remaining turns."""
+        asyncio.run(_close_clients_after(self.aresume(checkpoint)))
+
+    async def aresume(self, checkpoint: str):
+        """Asynchronous version of resume"""
+        self.environment.reset()
+        self.environment.restore_checkpoint(checkpoint)
+        self.replay_transcript()
+        await self.acontinue()
+
+    def run_until(self, turn: int):
+        """Run the environment from scratch until `turn` turns are done, e.g. to fork it there."""
+        asyncio.run(_close_clients_after(self.arun_until(turn)))
+
+    async def arun_until(self, turn: int):
+        """Asynchronous version of run_until"""
+        self.environment.reset()
+        with self._tracing(), cache_run(self.cache_run):
+            while self.environment.cnt_turn < turn and not self.environment.is_done():
+                await self.environment.step()
+
+    def fork(self, num_children: int) -> List["Simulation"]:
+        """Branch the discussion at the current turn into `num_children` simulations.
+
+        The children are built from the same config and start from this
+        state. They share the messages said so far, with the token counts
+        cached on them, but each has its own memories, rule state and random
+        stream, so their discussions diverge from here.
+        """
+        if self.config is None:
+            raise ValueError("Only simulations built from a config can be forked")
+        state = environment_state(self.environment, share_messages=True)
+        children = []
+        for i, random_state in enumerate(fork_random_states(state["random_state"], num_children)):
+            child = Simulation.from_config(self.config, self.task)
+            child.cache_run = f"{self.cache_run}/branch{i}"
+            restore_environment(child.environment, state, random_state=random_state)
+            children.append(child)
+        return children
+
+    def continue_run(self):
+        """Run the remaining turns from the current state, e.g. of a forked child."""
+        asyncio.run(_close_clients_after(self.acontinue()))
+
+    async def acontinue(self):
+        """Asynchronous version of continue_run"""
+        with self._tracing(), cache_run(self.cache_run):
+            while not self.environment.is_done():
+                await self.environment.step()
         self.environment.report_metrics()
 
+    def _trace_file(self) -> Optional[str]:
+        if self.trace_path:
+            return self.trace_path
+        trace_dir = os.environ.get(TRACE_DIR_ENV)
+        if not trace_dir:
+            return None
+        name = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.task or "simulation")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return os.path.join(trace_dir, f"{name}_{timestamp}_{uuid.uuid4().hex[:8]}.jsonl")
+
+    @contextlib.contextmanager
+    def _tracing(self):
+        """Trace the turns of the block, if tracing is enabled and not done by a caller.
+        The summary is kept in `trace_summary`, logged and appended to the trace.
+        """
+        path = self._trace_file()
+        if path is None or get_tracer() is not None:
+            yield
+            return
+        tracer = Tracer(path)
+        try:
+            with tracing(tracer):
+                yield
+        finally:
+            self.trace_summary = tracer.summary()
+            tracer.write_summary(self.trace_summary)
+            tracer.close()
+            trace_logger.info(f"Trace written to {path}\n{format_summary(self.trace_summary)}")
+
+    def replay_transcript(self):
+        """Print what was said so far, so a resumed or forked run's output reads like one run"""
+        if hasattr(self.environment, "print_messages"):
+            self.environment.print_messages(
+                [m for m in self.environment.transcript.messages if m.sender != ""]
+            )
+
+    @staticmethod
+    async def arun_many(
+        simulations: List["Simulation"], max_concurrency: Optional[int] = None
+    ) -> List[Optional[BaseException]]:
+        """Run several simulations concurrently on the current event loop.
+        Returns, for each simulation, None on success or the exception it raised,
+        so a failing discussion does not stop the others.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or max(1, len(simulations)))
+
+        async def arun_one(simulation: Simulation):
+            async with semaphore:
+                await simulation.arun()
+
+        return await asyncio.gather(
+            *[arun_one(simulation) for simulation in simulations],
+            return_exceptions=True,
+        )
+
+    @classmethod
+    def run_many(
+        cls, simulations: List["Simulation"], max_concurrency: Optional[int] = None
+    ) -> List[Optional[BaseException]]:
+        """Run several simulations concurrently on one event loop until all are done."""
+        return asyncio.run(
+            _close_clients_after(cls.arun_many(simulations, max_concurrency))
+        )
+
     def reset(self):
         self.environment.reset()
         for agent in self.agents:
@@ -52,9 +217,25 @@ class Simulation:
 
     def next(self, *args, **kwargs):
         """Run the environment for one step and return the return message."""
-        return_message = asyncio.run(self.environment.step(*args, **kwargs))
+        return_message = asyncio.run(_close_clients_after(self.anext(*args, **kwargs)))
         return return_message
 
+    async def anext(self, *args, **kwargs):
+        """Asynchronous version of next"""
+        return await self.environment.step(*args, **kwargs)
+
     def update_state(self, *args, **kwargs):
         """Run the environment for one step and return the return message."""
         self.environment.update_state(*args, **kwargs)
+
+
+async def _close_clients_after(coroutine: Awaitable):
+    # The pooled async clients are bound to this loop, release them with it
+    try:
+        return await coroutine
+    finally:
+        await aclose_async_clients()
+        # The Semantic Scholar client is only loaded once a tool used it
+        s2_client = sys.modules.get("agentverse.tools.s2_client")
+        if s2_client is not None:
+            await s2_client.aclose_s2_clients()
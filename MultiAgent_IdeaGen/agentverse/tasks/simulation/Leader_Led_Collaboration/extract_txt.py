@@ -50,7 +50,7 @@ def process_text_files(source_dir: str, output_dir: str) -> None:
                 
                 if start_match:
                     proposal_text = start_match.group(1)
-                    proposal_text = re.sub(r'References:.*', '', proposal_text, flags=re.DOTALL).strip()
+                    proposal_text = re.sub(r'(References:|^\s*Total spent:).*', '', proposal_text, flags=re.DOTALL | re.MULTILINE).strip()
                     proposals.append(f"'''\n{proposal_text}\n'''")
             except Exception as e:
                 print(f"Error processing file {file_path}: {e}")
@@ -53,7 +53,7 @@ try:
         
         return temp_dir
 
-    def run_multi_agent_simulation(topic: str, run_id: int = 0, num_runs: int = 1):
+    def run_multi_agent_simulation(topic: str, run_id: int = 0, num_runs: int = 1, resume: bool = False):
         """Run multi-agent academic discussion"""
         # Configure unique logging for this run
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -95,6 +95,15 @@ try:
             
             print("Initializing AI-Researcher tools...")
             agentverse = Simulation.from_task(task, tasks_dir)
+            # Each run samples its own responses, also from the response cache
+            agentverse.cache_run = f"run{run_id}"
+            # Save the state after every turn, so an interrupted run can be resumed
+            # Patterns share topics and run ids, so checkpoints are kept per pattern
+            checkpoint_path = os.path.join(
+                "checkpoints", Path(__file__).parent.name, f"multi_{topic_lower}_run{run_id}.json"
+            )
+            agentverse.environment.checkpoint_path = checkpoint_path
+            resuming = resume and os.path.exists(checkpoint_path)
             print("System initialization complete!")
             print()
             
@@ -108,8 +117,16 @@ try:
             
             # Capture output
             output_buffer = io.StringIO()
+            if resuming:
+                print(f"Resuming from checkpoint: {checkpoint_path}")
             with redirect_stdout(output_buffer):
-                agentverse.run()
+                if resuming:
+                    agentverse.resume(checkpoint_path)
+                else:
+                    agentverse.run()
+            # The run is complete, its checkpoint is no longer needed
+            if os.path.exists(checkpoint_path):
+                os.remove(checkpoint_path)
             
             # Write captured output to file
             with open(output_filename, 'w', encoding='utf-8') as f:
@@ -137,9 +154,55 @@ try:
             except:
                 pass
 
+    def run_multi_agent_branches(topic: str, num_runs: int, branch_at: int):
+        """Run the first `branch_at` turns once and fork them into `num_runs` discussions"""
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        topic_lower = topic.lower().replace(" ", "_")
+        log_filename = f"logs/multi_{topic_lower}_branches_{timestamp}.log"
+        os.makedirs(os.path.dirname(log_filename), exist_ok=True)
+        logging.basicConfig(
+            filename=log_filename,
+            level=logging.INFO,
+            format="%(asctime)s - %(levelname)s - %(message)s"
+        )
+        logging.info(f"Forking {num_runs} runs at turn {branch_at} for topic: {topic}")
+
+        temp_dir = None
+        try:
+            temp_dir = load_and_process_config(Path(__file__).parent / "config.yaml", topic)
+            task_dir = Path(temp_dir) / "multi_topic"
+            task_dir.mkdir(exist_ok=True)
+            shutil.copy(Path(temp_dir) / "config.yaml", task_dir / "config.yaml")
+            agentverse = Simulation.from_task("multi_topic", str(temp_dir))
+
+            # The shared opening turns are generated once
+            print(f"Running the first {branch_at} turns on: {topic}")
+            with redirect_stdout(io.StringIO()):
+                agentverse.run_until(branch_at)
+
+            for run_id, branch in enumerate(agentverse.fork(num_runs)):
+                output_filename = f"outputs/multi_{topic_lower}_run{run_id}_{timestamp}.txt"
+                os.makedirs(os.path.dirname(output_filename), exist_ok=True)
+                output_buffer = io.StringIO()
+                with redirect_stdout(output_buffer):
+                    branch.replay_transcript()
+                    branch.continue_run()
+                with open(output_filename, 'w', encoding='utf-8') as f:
+                    f.write(output_buffer.getvalue())
+                logging.info(f"Output saved to {output_filename}")
+                print(f"Branch {run_id + 1}/{num_runs} saved to: {output_filename}")
+
+        except Exception as e:
+            print(f"Error during execution: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            if temp_dir is not None:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
     def run_multi_agent_simulation_wrapper(args):
-        topic, run_id, num_runs = args
-        run_multi_agent_simulation(topic, run_id, num_runs)
+        topic, run_id, num_runs, resume = args
+        run_multi_agent_simulation(topic, run_id, num_runs, resume)
 
     def main():
         """Main function"""
@@ -152,15 +215,21 @@ try:
                            help='Number of content generations (default: 1)')
         parser.add_argument('--parallel', action='store_true',
                         help='Enable parallel execution (default: off)')
+        parser.add_argument('--resume', action='store_true',
+                        help='Continue each run from its last checkpoint, if any (default: off)')
+        parser.add_argument('--branch_at', type=int, default=None,
+                        help='Run the first BRANCH_AT turns once and fork them into the num_runs runs (default: off)')
         
         args = parser.parse_args()
         
-        if args.parallel:
+        if args.branch_at is not None:
+            run_multi_agent_branches(args.topic, args.num_runs, args.branch_at)
+        elif args.parallel:
             with multiprocessing.Pool() as pool:
-                pool.map(run_multi_agent_simulation_wrapper, [(args.topic, i, args.num_runs) for i in range(args.num_runs)])
+                pool.map(run_multi_agent_simulation_wrapper, [(args.topic, i, args.num_runs, args.resume) for i in range(args.num_runs)])
         else:
             for i in range(args.num_runs):
-                run_multi_agent_simulation(args.topic, run_id=i, num_runs=args.num_runs)
+                run_multi_agent_simulation(args.topic, run_id=i, num_runs=args.num_runs, resume=args.resume)
 
     if __name__ == "__main__":
         main()
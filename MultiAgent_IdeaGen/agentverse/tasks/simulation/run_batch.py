@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Run a sweep of topics x collaboration patterns x runs in one process
+"""
+
+import sys
+import os
+import argparse
+
+project_root = os.path.join(os.path.dirname(__file__), '..', '..', '..')
+sys.path.insert(0, project_root)
+
+from agentverse.batch import load_manifest, run_batch
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description='Batch runner for the collaboration patterns')
+    parser.add_argument('--manifest', type=str,
+                        default=os.path.join(os.path.dirname(__file__), 'batch_example.yaml'),
+                        help='YAML manifest, or JSONL file with one job per line')
+    parser.add_argument('--max_concurrency', type=int, default=None,
+                        help='Maximum number of discussions running at the same time')
+    parser.add_argument('--output_dir', type=str, default=None,
+                        help='Directory of the outputs and results.jsonl')
+
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+    if args.max_concurrency is not None:
+        manifest.max_concurrency = args.max_concurrency
+    if args.output_dir is not None:
+        manifest.output_dir = args.output_dir
+
+    jobs = manifest.expand()
+    print(f"Running {len(jobs)} discussions, at most {manifest.max_concurrency} at a time")
+    results = run_batch(manifest)
+    failed = [r for r in results if r["status"] != "ok"]
+    print(f"Done: {len(results) - len(failed)} succeeded, {len(failed)} failed, "
+          f"results in {os.path.join(manifest.output_dir, 'results.jsonl')}")
+
+
+if __name__ == "__main__":
+    main()
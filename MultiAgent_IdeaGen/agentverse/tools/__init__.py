@@ -2,13 +2,18 @@
 AgentVerse Tools Module
 """
 
-# Only import tools used by the config.yaml
-from .ai_researcher_tools import (
-    semantic_scholar_search,
-    get_paper_details
-)
-
+# Only the tools used by the config.yaml, imported on first use, since they
+# need langchain and e.g. the local index builder does not
 __all__ = [
     'semantic_scholar_search',
-    'get_paper_details'
-] 
\ No newline at end of file
+    'get_paper_details',
+    'get_papers_details'
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import ai_researcher_tools
+
+        return getattr(ai_researcher_tools, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,10 +5,14 @@ Based on core functionalities from Stanford AI-Researcher project
 """
 
 import json
-from typing import Dict, List, Any
-from semanticscholar import SemanticScholar
+import re
+import threading
+from typing import Dict, List, Any, Optional
 
 from agentverse.logging import logger
+from agentverse.tools.literature_cache import get_literature_cache, make_literature_key
+from agentverse.tools.local_index import get_local_index
+from agentverse.tools.single_flight import SingleFlight
 
 # LangChain tool wrappers
 from langchain.tools import tool
@@ -23,18 +27,50 @@ class AIResearcherSearchTool(BaseTool):
         return semantic_scholar_search(query)
     
     async def _arun(self, query: str) -> str:
-        return semantic_scholar_search(query)
+        return await asemantic_scholar_search(query)
+
+
+class SemanticScholarSearchTool(BaseTool):
+    name: str = "semantic_scholar_search"
+    description: str = "Direct Semantic Scholar API search for papers"
+    # "local" to search an offline index instead, see local_index.py
+    backend: str = ""
+    index_path: str = ""
+    
+    def _run(self, query: str, limit: int = 10) -> str:
+        return semantic_scholar_search(query, limit, self.backend, self.index_path)
+    
+    async def _arun(self, query: str, limit: int = 10) -> str:
+        return await asemantic_scholar_search(query, limit, self.backend, self.index_path)
 
 
 class GetPaperDetailsTool(BaseTool):
     name: str = "get_paper_details"
     description: str = "Tool for getting detailed paper information"
+    backend: str = ""
+    index_path: str = ""
     
     def _run(self, paper_id: str) -> str:
-        return get_paper_details(paper_id)
+        return get_paper_details(paper_id, self.backend, self.index_path)
     
     async def _arun(self, paper_id: str) -> str:
-        return get_paper_details(paper_id)
+        return await aget_paper_details(paper_id, self.backend, self.index_path)
+
+
+class GetPapersDetailsTool(BaseTool):
+    name: str = "get_papers_details"
+    description: str = (
+        "Tool for looking up several papers at once, e.g. to verify citations. "
+        "Input: paper ids (Semantic Scholar ids, DOI:..., ARXIV:...) separated by commas"
+    )
+    backend: str = ""
+    index_path: str = ""
+    
+    def _run(self, paper_ids: str) -> str:
+        return get_papers_details(paper_ids, self.backend, self.index_path)
+    
+    async def _arun(self, paper_ids: str) -> str:
+        return await aget_papers_details(paper_ids, self.backend, self.index_path)
 
 
 # Compatibility wrappers
@@ -52,7 +88,9 @@ def get_paper_details_tool(paper_id: str) -> str:
 # Tool name mapping
 TOOL_MAPPING = {
     "ai_researcher_search": AIResearcherSearchTool(),
+    "semantic_scholar_search": SemanticScholarSearchTool(),
     "get_paper_details": GetPaperDetailsTool(),
+    "get_papers_details": GetPapersDetailsTool(),
 }
 
 
@@ -65,12 +103,25 @@ def get_tool(tool_name: str):
         # Try to return function directly
         if tool_name == "ai_researcher_search":
             return AIResearcherSearchTool()
+        elif tool_name == "semantic_scholar_search":
+            return SemanticScholarSearchTool()
         elif tool_name == "get_paper_details":
             return GetPaperDetailsTool()
+        elif tool_name == "get_papers_details":
+            return GetPapersDetailsTool()
         else:
             raise ValueError(f"Unknown tool: {tool_name}")
 
 
+SEARCH_FIELDS = ['paperId', 'title', 'authors', 'year', 'abstract',
+                 'citationCount', 'venue', 'url', 'publicationDate']
+PAPER_FIELDS = ['paperId', 'title', 'authors', 'year', 'abstract',
+                'citationCount', 'venue', 'url', 'references', 'citations']
+# Batch lookups return only what a prompt needs to cite a paper
+BATCH_FIELDS = ['paperId', 'title', 'authors', 'year', 'venue',
+                'citationCount', 'url', 'externalIds']
+
+
 class AIResearcherTools:
     """
     AI-Researcher integrated tool class (minimal version)
@@ -83,43 +134,85 @@ class AIResearcherTools:
         if semantic_scholar_api_key is None:
             semantic_scholar_api_key = os.environ.get("SEMANTIC_SCHOLAR_API_KEY", "YOUR_SEMANTIC_SCHOLAR_API_KEY_HERE")
         self.s2_api_key = semantic_scholar_api_key
+        from semanticscholar import SemanticScholar
+
         self.sch = SemanticScholar(api_key=self.s2_api_key)
         
-        # Paper cache
-        self.search_cache = {}
+        # Searches and papers are cached across runs, see literature_cache.py
+        self.cache = get_literature_cache()
+        self.single_flight = SingleFlight()
         
         logger.info("AI-Researcher Tools initialized with Semantic Scholar API")
     
+    def _search_key(self, query: str, limit: int) -> str:
+        return make_literature_key("s2-search", query=query, limit=limit, fields=SEARCH_FIELDS)
+    
+    def _paper_key(self, paper_id: str) -> str:
+        return make_literature_key("s2-paper", paper_id=paper_id.strip(), fields=PAPER_FIELDS)
+    
+    def _batch_key(self, paper_id: str) -> str:
+        return make_literature_key("s2-paper", paper_id=paper_id, fields=BATCH_FIELDS)
+    
     def _semantic_scholar_search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Semantic Scholar API search"""
         
-        if query in self.search_cache:
-            return self.search_cache[query]
+        key = self._search_key(query, limit)
+        cached = self.cache.get("search", key)
+        if cached is not None:
+            return cached
         
         try:
-            # Search papers
-            results = self.sch.search_paper(
-                query=query,
-                limit=limit,
-                fields=['paperId', 'title', 'authors', 'year', 'abstract', 
-                       'citationCount', 'venue', 'url', 'publicationDate']
-            )
+            # Concurrent identical searches share one request
+            return self.single_flight.do(key, lambda: self._fetch_search(key, query, limit))
             
-            papers = []
-            for paper in results:
-                if paper and hasattr(paper, 'raw_data'):
-                    paper_data = paper.raw_data
-                    cleaned_paper = self._clean_paper_data(paper_data)
-                    papers.append(cleaned_paper)
-            
-            self.search_cache[query] = papers
-            return papers
+        except Exception as e:
+            logger.error(f"Semantic Scholar search failed: {e}")
+            return []
+    
+    def _fetch_search(self, key: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        # Search papers
+        results = self.sch.search_paper(
+            query=query,
+            limit=limit,
+            fields=SEARCH_FIELDS
+        )
+        
+        papers = []
+        for paper in results:
+            if paper and hasattr(paper, 'raw_data'):
+                paper_data = paper.raw_data
+                cleaned_paper = self._clean_paper_data(paper_data)
+                papers.append(cleaned_paper)
+        
+        self.cache.put("search", key, papers)
+        return papers
+    
+    async def _asemantic_scholar_search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Asynchronous version of _semantic_scholar_search, which does not block the event loop"""
+        key = self._search_key(query, limit)
+        cached = self.cache.get("search", key)
+        if cached is not None:
+            return cached
+        
+        try:
+            return await self.single_flight.ado(key, lambda: self._afetch_search(key, query, limit))
             
         except Exception as e:
             logger.error(f"Semantic Scholar search failed: {e}")
             return []
     
-    def _clean_paper_data(self, paper_data: Dict) -> Dict[str, Any]:
+    async def _afetch_search(self, key: str, query: str, limit: int) -> List[Dict[str, Any]]:
+        from agentverse.tools.s2_client import get_async_s2_client
+        
+        results = await get_async_s2_client(self.s2_api_key).search_paper(
+            query, limit, SEARCH_FIELDS
+        )
+        papers = [self._clean_paper_data(paper_data) for paper_data in results]
+        self.cache.put("search", key, papers)
+        return papers
+    
+    @staticmethod
+    def _clean_paper_data(paper_data: Dict) -> Dict[str, Any]:
         """Clean paper data"""
         authors = []
         if paper_data.get('authors'):
@@ -138,32 +231,214 @@ class AIResearcherTools:
             'publicationDate': paper_data.get('publicationDate', '')
         }
     
+    def _get_paper_details(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """Semantic Scholar paper record, None if there is no such paper"""
+        key = self._paper_key(paper_id)
+        cached = self.cache.get("paper", key)
+        if cached is not None:
+            return cached
+        return self.single_flight.do(key, lambda: self._fetch_paper(key, paper_id))
+    
+    def _fetch_paper(self, key: str, paper_id: str) -> Optional[Dict[str, Any]]:
+        paper = self.sch.get_paper(paper_id, fields=PAPER_FIELDS)
+        if not paper or not hasattr(paper, 'raw_data'):
+            return None
+        self.cache.put("paper", key, paper.raw_data)
+        return paper.raw_data
+    
+    async def _aget_paper_details(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        """Asynchronous version of _get_paper_details"""
+        key = self._paper_key(paper_id)
+        cached = self.cache.get("paper", key)
+        if cached is not None:
+            return cached
+        return await self.single_flight.ado(key, lambda: self._afetch_paper(key, paper_id))
+    
+    async def _afetch_paper(self, key: str, paper_id: str) -> Optional[Dict[str, Any]]:
+        from agentverse.tools.s2_client import get_async_s2_client
+        
+        paper = await get_async_s2_client(self.s2_api_key).get_paper(paper_id, PAPER_FIELDS)
+        if paper is None:
+            return None
+        self.cache.put("paper", key, paper)
+        return paper
+    
+
+    def _cached_papers(self, paper_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {paper_id: self.cache.get("paper", self._batch_key(paper_id)) for paper_id in paper_ids}
+    
+    def _store_papers(
+        self, paper_ids: List[str], records: List[Optional[Dict[str, Any]]]
+    ) -> Dict[str, Optional[Dict[str, Any]]]:
+        for paper_id, record in zip(paper_ids, records):
+            if record is not None:
+                self.cache.put("paper", self._batch_key(paper_id), record)
+        return dict(zip(paper_ids, records))
+    
+    def _get_papers_details(self, paper_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Projected records of several papers, None for those that do not exist.
+        The papers that are not cached are fetched with one batch request.
+        """
+        papers = self._cached_papers(paper_ids)
+        missing = sorted(paper_id for paper_id, paper in papers.items() if paper is None)
+        if missing:
+            key = make_literature_key("s2-batch", paper_ids=missing, fields=BATCH_FIELDS)
+            papers.update(self.single_flight.do(key, lambda: self._fetch_papers(missing)))
+        return papers
+    
+    def _fetch_papers(self, paper_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        from agentverse.tools.s2_client import get_s2_client
+        
+        records = get_s2_client(self.s2_api_key).get_papers(paper_ids, BATCH_FIELDS)
+        return self._store_papers(paper_ids, records)
+    
+    async def _aget_papers_details(self, paper_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Asynchronous version of _get_papers_details"""
+        papers = self._cached_papers(paper_ids)
+        missing = sorted(paper_id for paper_id, paper in papers.items() if paper is None)
+        if missing:
+            key = make_literature_key("s2-batch", paper_ids=missing, fields=BATCH_FIELDS)
+            papers.update(await self.single_flight.ado(key, lambda: self._afetch_papers(missing)))
+        return papers
+    
+    async def _afetch_papers(self, paper_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        from agentverse.tools.s2_client import get_async_s2_client
+        
+        records = await get_async_s2_client(self.s2_api_key).get_papers(paper_ids, BATCH_FIELDS)
+        return self._store_papers(paper_ids, records)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"cache": self.cache.stats(), "single_flight": self.single_flight.stats()}
+    
+
+# Global tool object, created on first use rather than on import
+_ai_researcher_tools = None
+_ai_researcher_tools_lock = threading.Lock()
+
+
+def get_ai_researcher_tools() -> AIResearcherTools:
+    global _ai_researcher_tools
+    if _ai_researcher_tools is None:
+        with _ai_researcher_tools_lock:
+            if _ai_researcher_tools is None:
+                _ai_researcher_tools = AIResearcherTools()
+    return _ai_researcher_tools
+
+
+def get_literature_stats() -> Optional[Dict[str, Any]]:
+    """Cache and coalescing counters of the literature tools, None if they were not used"""
+    if _ai_researcher_tools is None:
+        return None
+    return _ai_researcher_tools.stats()
+
 
-# Instantiate global tool object
-ai_researcher_tools = AIResearcherTools()
+def __getattr__(name):
+    # `ai_researcher_tools` used to be a module attribute
+    if name == "ai_researcher_tools":
+        return get_ai_researcher_tools()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def semantic_scholar_search(query: str, limit: int = 10) -> str:
+def semantic_scholar_search(query: str, limit: int = 10, backend: str = "", index_path: str = "") -> str:
     """Direct Semantic Scholar search tool interface"""
     try:
-        papers = ai_researcher_tools._semantic_scholar_search(query, limit)
+        index = get_local_index(backend, index_path)
+        if index is not None:
+            papers = [AIResearcherTools._clean_paper_data(paper) for paper in index.search(query, limit)]
+        else:
+            papers = get_ai_researcher_tools()._semantic_scholar_search(query, limit)
         return json.dumps(papers, indent=2, ensure_ascii=False)
     except Exception as e:
         return f"Semantic Scholar search failed: {e}"
 
 
-def get_paper_details(paper_id: str) -> str:
+def get_paper_details(paper_id: str, backend: str = "", index_path: str = "") -> str:
     """Get paper details tool interface"""
     try:
-        paper = ai_researcher_tools.sch.get_paper(
-            paper_id,
-            fields=['paperId', 'title', 'authors', 'year', 'abstract', 
-                   'citationCount', 'venue', 'url', 'references', 'citations']
-        )
+        index = get_local_index(backend, index_path)
+        if index is not None:
+            paper = index.get_paper(paper_id)
+        else:
+            paper = get_ai_researcher_tools()._get_paper_details(paper_id)
+        
+        if paper is not None:
+            return json.dumps(paper, indent=2, ensure_ascii=False)
+        else:
+            return f"Paper not found: {paper_id}"
+    except Exception as e:
+        return f"Get paper details failed: {e}"
+
+
+async def asemantic_scholar_search(query: str, limit: int = 10, backend: str = "", index_path: str = "") -> str:
+    """Asynchronous version of semantic_scholar_search"""
+    if get_local_index(backend, index_path) is not None:
+        # Local searches take milliseconds, there is nothing to wait for
+        return semantic_scholar_search(query, limit, backend, index_path)
+    try:
+        papers = await get_ai_researcher_tools()._asemantic_scholar_search(query, limit)
+        return json.dumps(papers, indent=2, ensure_ascii=False)
+    except Exception as e:
+        return f"Semantic Scholar search failed: {e}"
+
+
+async def aget_paper_details(paper_id: str, backend: str = "", index_path: str = "") -> str:
+    """Asynchronous version of get_paper_details"""
+    if get_local_index(backend, index_path) is not None:
+        return get_paper_details(paper_id, backend, index_path)
+    try:
+        paper = await get_ai_researcher_tools()._aget_paper_details(paper_id)
         
-        if paper and hasattr(paper, 'raw_data'):
-            return json.dumps(paper.raw_data, indent=2, ensure_ascii=False)
+        if paper is not None:
+            return json.dumps(paper, indent=2, ensure_ascii=False)
         else:
             return f"Paper not found: {paper_id}"
     except Exception as e:
-        return f"Get paper details failed: {e}"
\ No newline at end of file
+        return f"Get paper details failed: {e}"
+
+
+def parse_paper_ids(paper_ids: str) -> List[str]:
+    """Distinct ids of a comma or whitespace separated string, or of a JSON list"""
+    try:
+        parsed = json.loads(paper_ids)
+    except ValueError:
+        parsed = None
+    if not isinstance(parsed, list):
+        parsed = re.split(r"[,;\s]+", paper_ids)
+    ids = [str(paper_id).strip().strip("\"'") for paper_id in parsed]
+    return list(dict.fromkeys(paper_id for paper_id in ids if paper_id))
+
+
+def _format_papers(paper_ids: List[str], papers: Dict[str, Any]) -> str:
+    return json.dumps(
+        [papers.get(paper_id) or {"paperId": paper_id, "error": "Paper not found"} for paper_id in paper_ids],
+        indent=2,
+        ensure_ascii=False,
+    )
+
+
+def get_papers_details(paper_ids: str, backend: str = "", index_path: str = "") -> str:
+    """Get the details of several papers with one request"""
+    try:
+        ids = parse_paper_ids(paper_ids)
+        index = get_local_index(backend, index_path)
+        if index is not None:
+            papers = {
+                paper_id: {field: paper.get(field) for field in BATCH_FIELDS} if paper else None
+                for paper_id, paper in zip(ids, index.get_papers(ids))
+            }
+        else:
+            papers = get_ai_researcher_tools()._get_papers_details(ids)
+        return _format_papers(ids, papers)
+    except Exception as e:
+        return f"Get papers details failed: {e}"
+
+
+async def aget_papers_details(paper_ids: str, backend: str = "", index_path: str = "") -> str:
+    """Asynchronous version of get_papers_details"""
+    if get_local_index(backend, index_path) is not None:
+        return get_papers_details(paper_ids, backend, index_path)
+    try:
+        ids = parse_paper_ids(paper_ids)
+        return _format_papers(ids, await get_ai_researcher_tools()._aget_papers_details(ids))
+    except Exception as e:
+        return f"Get papers details failed: {e}"
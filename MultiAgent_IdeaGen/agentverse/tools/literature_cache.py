@@ -0,0 +1,227 @@
+"""
+Persistent cache of literature search results and paper records.
+
+Semantic Scholar results are stored in SQLite (in WAL mode, so the workers of
+a parallel run and separate runs share one file) under the SHA-256 of the
+normalized request, with a time-to-live per kind of entry and size-bounded
+LRU eviction. The cache is configured through environment variables:
+
+- `AGENTVERSE_LITERATURE_CACHE`: path of the SQLite file (default
+  `~/.cache/agentverse/literature.sqlite`), `off` keeps it in memory only
+- `AGENTVERSE_LITERATURE_CACHE_MAX_MB`: size bound of the stored entries (default 256)
+- `AGENTVERSE_LITERATURE_SEARCH_TTL_DAYS`: lifetime of search results (default 7)
+- `AGENTVERSE_LITERATURE_PAPER_TTL_DAYS`: lifetime of paper records (default 30)
+
+This module only needs the standard library: Proposal_Evaluation loads this
+file as its literature cache (see ai_scientist/shared.py).
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+LITERATURE_CACHE_ENV = "AGENTVERSE_LITERATURE_CACHE"
+LITERATURE_CACHE_MAX_MB_ENV = "AGENTVERSE_LITERATURE_CACHE_MAX_MB"
+SEARCH_TTL_DAYS_ENV = "AGENTVERSE_LITERATURE_SEARCH_TTL_DAYS"
+PAPER_TTL_DAYS_ENV = "AGENTVERSE_LITERATURE_PAPER_TTL_DAYS"
+
+DEFAULT_CACHE_PATH = os.path.join("~", ".cache", "agentverse", "literature.sqlite")
+MEMORY = ":memory:"
+
+_DAY = 24 * 60 * 60.0
+# Writes after which the size of the cache is recounted, for the writes of other processes
+RECOUNT_WRITES = 1000
+# Eviction frees the cache down to this fraction of its bound, not just below it
+EVICT_TO = 0.9
+
+
+def normalize_query(query: str) -> str:
+    """Spelling-insensitive form of a search query: case, width, spacing and quotes"""
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = re.sub(r"\s+", " ", query)
+    return query.strip(" \"'`.,;:")
+
+
+def make_literature_key(source: str, **request: Any) -> str:
+    """Hash a request, e.g. make_literature_key("s2-search", query=..., limit=...)"""
+    if isinstance(request.get("query"), str):
+        request["query"] = normalize_query(request["query"])
+    canonical = json.dumps(
+        dict(request, source=source), sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LiteratureCache:
+    """SQLite-backed LRU cache of JSON values, grouped in kinds with their own TTL"""
+
+    def __init__(
+        self,
+        path: str = MEMORY,
+        max_bytes: int = 256 << 20,
+        ttl: Optional[Dict[str, float]] = None,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        # Seconds an entry of each kind stays valid, kinds not listed never expire
+        self.ttl = dict(ttl or {})
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.writes = 0
+        self.evictions = 0
+
+        if path != MEMORY:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        if path != MEMORY:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " kind TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (kind, key))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_access ON entries(last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._size()
+
+    def _size(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def get(self, kind: str, key: str, default: Any = None) -> Any:
+        """The cached value, or `default` when it is missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            value, created = row
+            ttl = self.ttl.get(kind)
+            if ttl is not None and created + ttl < now:
+                self.expired += 1
+                self.misses += 1
+                self._conn.execute("DELETE FROM entries WHERE kind = ? AND key = ?", (kind, key))
+                self._total_bytes -= len(value.encode("utf-8"))
+                self._conn.commit()
+                return default
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE entries SET last_access = ? WHERE kind = ? AND key = ?",
+                (now, kind, key),
+            )
+            self._conn.commit()
+        return json.loads(value)
+
+    def put(self, kind: str, key: str, value: Any) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        size = len(encoded.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT size FROM entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+            self._total_bytes += size - (replaced[0] if replaced else 0)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, value, size, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, key, encoded, size, now, now),
+            )
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # The running total misses what other processes wrote, recount it
+        # before evicting and every RECOUNT_WRITES writes
+        if self._total_bytes > self.max_bytes or self.writes % RECOUNT_WRITES == 0:
+            self._total_bytes = self._size()
+        total = self._total_bytes
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT kind, key, size FROM entries ORDER BY last_access ASC"
+        )
+        stale = []
+        for kind, key, size in rows:
+            if total <= self.max_bytes * EVICT_TO:
+                break
+            stale.append((kind, key))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", stale)
+        self.evictions += len(stale)
+        self._total_bytes = total
+
+    def purge_expired(self) -> int:
+        """Delete the expired entries, return how many there were"""
+        now = time.time()
+        removed = 0
+        with self._lock:
+            for kind, ttl in self.ttl.items():
+                removed += self._conn.execute(
+                    "DELETE FROM entries WHERE kind = ? AND created < ?", (kind, now - ttl)
+                ).rowcount
+            self._conn.commit()
+            self._total_bytes = self._size()
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            kinds = {
+                kind: {"entries": entries, "bytes": size}
+                for kind, entries, size in self._conn.execute(
+                    "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM entries GROUP BY kind"
+                )
+            }
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "kinds": kinds,
+        }
+
+
+_cache_lock = threading.Lock()
+_caches: Dict[str, LiteratureCache] = {}
+
+
+def get_literature_cache() -> LiteratureCache:
+    """Return the cache configured by the environment, one per path and process"""
+    path = os.environ.get(LITERATURE_CACHE_ENV, DEFAULT_CACHE_PATH)
+    path = MEMORY if path.lower() in ("", "off", MEMORY) else os.path.expanduser(path)
+    with _cache_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = LiteratureCache(
+                path,
+                max_bytes=int(float(os.environ.get(LITERATURE_CACHE_MAX_MB_ENV, 256)) * (1 << 20)),
+                ttl={
+                    "search": float(os.environ.get(SEARCH_TTL_DAYS_ENV, 7)) * _DAY,
+                    "paper": float(os.environ.get(PAPER_TTL_DAYS_ENV, 30)) * _DAY,
+                },
+            )
+            _caches[path] = cache
+    return cache
@@ -0,0 +1,394 @@
+"""
+Offline paper index with BM25 search, a drop-in backend for the literature tools.
+
+An index is built once from a dump of paper metadata (JSONL, or Parquet when
+pyarrow is installed) and stored as a directory of flat arrays:
+
+- `terms.npy`: the sorted vocabulary, `offsets.npy`: where each term's
+  postings start in `postings_doc.npy` / `postings_tf.npy`
+- `doc_len.npy`: token count of each paper, `meta.json`: BM25 parameters
+- `docs.jsonl` and `doc_offsets.npy`: the paper records, read on demand
+- `keys.npy` / `key_doc.npy`: paper ids (S2 id, `DOI:...`, `ARXIV:...`),
+  sorted, with the paper they belong to
+
+The arrays are memory-mapped, so opening an index costs a few milliseconds
+whatever its size, and a search only touches the postings of its terms.
+
+Building spills the postings to disk in sorted runs of `run_postings`
+postings and merges them at the end, so the postings of a full-corpus dump
+never have to fit in memory. The vocabulary, the paper ids and two integers
+per paper are still held in memory while building (roughly 100 bytes per
+paper, plus the distinct terms).
+
+    python -m agentverse.tools.local_index build --input papers.jsonl --output paper_index
+    python -m agentverse.tools.local_index search --index paper_index "sparse attention"
+
+The tools use the index instead of Semantic Scholar when their config says
+`backend: local` (with `index_path`), or when `AGENTVERSE_LITERATURE_BACKEND`
+is `local` and `AGENTVERSE_LOCAL_INDEX` points to the index.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from agentverse.logging import logger
+
+LITERATURE_BACKEND_ENV = "AGENTVERSE_LITERATURE_BACKEND"
+LOCAL_INDEX_ENV = "AGENTVERSE_LOCAL_INDEX"
+
+INDEX_VERSION = 1
+MAX_TERM_LENGTH = 32
+# Postings kept in memory while building before they are spilled to a sorted run
+RUN_POSTINGS = 20_000_000
+# Title terms count this many times, a match in the title says more than one in the abstract
+TITLE_WEIGHT = 2
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the"
+    " their this to was were which with we our via using based".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token
+        for token in _TOKEN.findall(text.lower())
+        if token not in STOPWORDS and len(token) <= MAX_TERM_LENGTH
+    ]
+
+
+def _normalize_record(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A dump record in the shape of the Semantic Scholar API, None without id or title"""
+    paper_id = record.get("paperId") or record.get("paper_id") or record.get("corpusid") or record.get("id")
+    if paper_id is None or not record.get("title"):
+        return None
+    authors = []
+    for author in record.get("authors") or []:
+        if isinstance(author, str):
+            authors.append({"name": author})
+        elif isinstance(author, dict) and author.get("name"):
+            authors.append({"name": author["name"]})
+    return {
+        "paperId": str(paper_id),
+        "title": record["title"],
+        "authors": authors,
+        "year": record.get("year"),
+        "abstract": record.get("abstract") or "",
+        "citationCount": record.get("citationCount", record.get("citationcount", 0)),
+        "venue": record.get("venue") or "",
+        "url": record.get("url") or "",
+        "publicationDate": record.get("publicationDate", record.get("publicationdate", "")),
+        "externalIds": record.get("externalIds", record.get("externalids")) or {},
+    }
+
+
+def _paper_keys(paper: Dict[str, Any]) -> List[str]:
+    keys = [paper["paperId"]]
+    for source, value in paper["externalIds"].items():
+        if source.upper() in ("DOI", "ARXIV") and value:
+            keys.append(f"{source.upper()}:{value}".lower())
+    return keys
+
+
+def read_dump(path: str) -> Iterator[Dict[str, Any]]:
+    """Records of a JSONL (optionally .gz) or Parquet dump"""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet dumps needs pyarrow: pip install pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches():
+            yield from batch.to_pylist()
+        return
+    if path.endswith(".gz"):
+        import gzip
+
+        handle = gzip.open(path, "rt", encoding="utf-8")
+    else:
+        handle = open(path, "r", encoding="utf-8")
+    with handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _spill_run(postings: Dict[str, List[int]], frequencies: Dict[str, List[float]], path: str) -> None:
+    """Write the postings of one run, in term order, to `path`.*.npy"""
+    terms = sorted(postings)
+    np.save(f"{path}.terms.npy", np.array(terms, dtype=f"<U{MAX_TERM_LENGTH}"))
+    np.save(f"{path}.counts.npy", np.array([len(postings[t]) for t in terms], dtype=np.int64))
+    np.save(f"{path}.doc.npy", np.array([d for t in terms for d in postings[t]], dtype=np.int32))
+    np.save(f"{path}.tf.npy", np.array([f for t in terms for f in frequencies[t]], dtype=np.float32))
+
+
+def _merge_runs(runs: List[str], output: str) -> int:
+    """Merge the sorted runs into the index arrays, return the number of terms.
+
+    Documents are numbered in reading order, so the postings of a term are
+    its postings in each run, one run after the other.
+    """
+    terms = np.array([], dtype=f"<U{MAX_TERM_LENGTH}")
+    for run in runs:
+        terms = np.union1d(terms, np.load(f"{run}.terms.npy"))
+    counts = np.zeros(len(terms), dtype=np.int64)
+    for run in runs:
+        counts[np.searchsorted(terms, np.load(f"{run}.terms.npy"))] += np.load(f"{run}.counts.npy")
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    np.save(os.path.join(output, "terms.npy"), terms)
+    np.save(os.path.join(output, "offsets.npy"), offsets)
+
+    total = int(offsets[-1])
+    postings_doc = np.lib.format.open_memmap(
+        os.path.join(output, "postings_doc.npy"), mode="w+", dtype=np.int32, shape=(total,)
+    )
+    postings_tf = np.lib.format.open_memmap(
+        os.path.join(output, "postings_tf.npy"), mode="w+", dtype=np.float32, shape=(total,)
+    )
+    # Where the next postings of each term go
+    cursor = offsets[:-1].copy()
+    for run in runs:
+        run_terms = np.searchsorted(terms, np.load(f"{run}.terms.npy"))
+        run_counts = np.load(f"{run}.counts.npy")
+        run_starts = np.zeros(len(run_counts), dtype=np.int64)
+        np.cumsum(run_counts[:-1], out=run_starts[1:])
+        target = np.repeat(cursor[run_terms] - run_starts, run_counts) + np.arange(
+            int(run_counts.sum()), dtype=np.int64
+        )
+        postings_doc[target] = np.load(f"{run}.doc.npy")
+        postings_tf[target] = np.load(f"{run}.tf.npy")
+        cursor[run_terms] += run_counts
+    postings_doc.flush()
+    postings_tf.flush()
+    del postings_doc, postings_tf
+    return len(terms)
+
+
+def build_index(
+    inputs: List[str],
+    output: str,
+    k1: float = 1.2,
+    b: float = 0.75,
+    log_every: int = 100000,
+    run_postings: int = RUN_POSTINGS,
+) -> Dict[str, Any]:
+    """Build the index of the papers in `inputs` into the directory `output`"""
+    os.makedirs(output, exist_ok=True)
+    runs_dir = os.path.join(output, "runs")
+    os.makedirs(runs_dir, exist_ok=True)
+    runs: List[str] = []
+    postings: Dict[str, List[int]] = defaultdict(list)
+    frequencies: Dict[str, List[float]] = defaultdict(list)
+    buffered = 0
+    doc_len = array("i")
+    doc_offsets = array("q")
+    keys: Dict[str, int] = {}
+    started = time.time()
+
+    with open(os.path.join(output, "docs.jsonl"), "wb") as docs:
+        for path in inputs:
+            for record in read_dump(path):
+                paper = _normalize_record(record)
+                if paper is None:
+                    continue
+                doc = len(doc_len)
+                counts = Counter(tokenize(paper["title"]) * TITLE_WEIGHT + tokenize(paper["abstract"]))
+                for term, tf in counts.items():
+                    postings[term].append(doc)
+                    frequencies[term].append(tf)
+                buffered += len(counts)
+                doc_len.append(sum(counts.values()))
+                for key in _paper_keys(paper):
+                    keys.setdefault(key, doc)
+                doc_offsets.append(docs.tell())
+                docs.write(json.dumps(paper, ensure_ascii=False).encode("utf-8") + b"\n")
+                if buffered >= run_postings:
+                    runs.append(os.path.join(runs_dir, str(len(runs))))
+                    _spill_run(postings, frequencies, runs[-1])
+                    postings, frequencies, buffered = defaultdict(list), defaultdict(list), 0
+                if log_every and len(doc_len) % log_every == 0:
+                    logger.info(
+                        f"{len(doc_len)} papers indexed, {len(runs)} runs spilled "
+                        f"({time.time() - started:.0f}s)"
+                    )
+        doc_offsets.append(docs.tell())
+    if postings or not runs:
+        runs.append(os.path.join(runs_dir, str(len(runs))))
+        _spill_run(postings, frequencies, runs[-1])
+    del postings, frequencies
+
+    num_terms = _merge_runs(runs, output)
+    shutil.rmtree(runs_dir)
+    np.save(os.path.join(output, "doc_len.npy"), np.frombuffer(doc_len, dtype=np.int32))
+    np.save(os.path.join(output, "doc_offsets.npy"), np.frombuffer(doc_offsets, dtype=np.int64))
+    sorted_keys = sorted(keys)
+    np.save(os.path.join(output, "keys.npy"), np.array(sorted_keys, dtype=str))
+    np.save(os.path.join(output, "key_doc.npy"), np.array([keys[k] for k in sorted_keys], dtype=np.int32))
+
+    meta = {
+        "version": INDEX_VERSION,
+        "num_docs": len(doc_len),
+        "num_terms": num_terms,
+        "avgdl": float(np.mean(doc_len)) if doc_len else 0.0,
+        "k1": k1,
+        "b": b,
+        "title_weight": TITLE_WEIGHT,
+        "sources": [os.path.abspath(path) for path in inputs],
+    }
+    with open(os.path.join(output, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+class LocalPaperIndex:
+    """A built index, opened read-only and memory-mapped"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version {self.meta.get('version')} in {path}")
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        self.terms = load("terms")
+        self.offsets = load("offsets")
+        self.postings_doc = load("postings_doc")
+        self.postings_tf = load("postings_tf")
+        self.doc_len = load("doc_len")
+        self.doc_offsets = load("doc_offsets")
+        self.keys = load("keys")
+        self.key_doc = load("key_doc")
+        self._docs = open(os.path.join(path, "docs.jsonl"), "rb")
+        self._docs_lock = threading.Lock()
+
+    def _postings(self, term: str):
+        i = int(np.searchsorted(self.terms, term))
+        if i >= len(self.terms) or self.terms[i] != term:
+            return None
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.postings_doc[start:end], self.postings_tf[start:end]
+
+    def document(self, doc: int) -> Dict[str, Any]:
+        start, end = int(self.doc_offsets[doc]), int(self.doc_offsets[doc + 1])
+        with self._docs_lock:
+            self._docs.seek(start)
+            return json.loads(self._docs.read(end - start))
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Records of the `limit` best BM25 matches of `query`"""
+        if limit <= 0:
+            return []
+        num_docs = self.meta["num_docs"]
+        k1, b, avgdl = self.meta["k1"], self.meta["b"], self.meta["avgdl"] or 1.0
+        scores = None
+        for term in set(tokenize(query)):
+            postings = self._postings(term)
+            if postings is None:
+                continue
+            docs, tf = postings
+            idf = math.log(1.0 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = k1 * (1.0 - b + b * self.doc_len[docs] / avgdl)
+            if scores is None:
+                scores = np.zeros(num_docs, dtype=np.float32)
+            # A term occurs once in a document's postings, so no index repeats
+            scores[docs] += idf * tf * (k1 + 1.0) / (tf + norm)
+        if scores is None:
+            return []
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [self.document(int(doc)) for doc in ranked]
+
+    def get_paper(self, paper_id: str) -> Optional[Dict[str, Any]]:
+        paper_id = paper_id.strip()
+        for key in (paper_id, paper_id.lower()):
+            i = int(np.searchsorted(self.keys, key))
+            if i < len(self.keys) and self.keys[i] == key:
+                return self.document(int(self.key_doc[i]))
+        return None
+
+    def get_papers(self, paper_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        return [self.get_paper(paper_id) for paper_id in paper_ids]
+
+    def close(self) -> None:
+        self._docs.close()
+
+
+_indexes: Dict[str, LocalPaperIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_local_index(backend: Optional[str] = None, index_path: Optional[str] = None) -> Optional[LocalPaperIndex]:
+    """The index to serve the literature tools from, None to use Semantic Scholar.
+    `backend` and `index_path` come from the tool config and take precedence
+    over the environment.
+    """
+    backend = backend or os.environ.get(LITERATURE_BACKEND_ENV, "semantic_scholar")
+    if backend != "local":
+        return None
+    index_path = index_path or os.environ.get(LOCAL_INDEX_ENV)
+    if not index_path:
+        raise ValueError(f"The local literature backend needs index_path or {LOCAL_INDEX_ENV}")
+    index_path = os.path.abspath(os.path.expanduser(index_path))
+    with _indexes_lock:
+        index = _indexes.get(index_path)
+        if index is None:
+            index = _indexes[index_path] = LocalPaperIndex(index_path)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query an offline paper index")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Index a dump of paper metadata")
+    build.add_argument("--input", nargs="+", required=True, help="JSONL(.gz) or Parquet files")
+    build.add_argument("--output", required=True, help="Directory of the index")
+    build.add_argument("--k1", type=float, default=1.2)
+    build.add_argument("--b", type=float, default=0.75)
+    build.add_argument("--run_postings", type=int, default=RUN_POSTINGS,
+                       help="Postings held in memory before spilling a sorted run")
+    search = commands.add_parser("search", help="Search an index")
+    search.add_argument("--index", required=True)
+    search.add_argument("--limit", type=int, default=10)
+    search.add_argument("query")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.time()
+        meta = build_index(
+            args.input, args.output, k1=args.k1, b=args.b, run_postings=args.run_postings
+        )
+        print(
+            f"Indexed {meta['num_docs']} papers, {meta['num_terms']} terms "
+            f"into {args.output} in {time.time() - started:.1f}s"
+        )
+    else:
+        started = time.time()
+        index = LocalPaperIndex(args.index)
+        opened = time.time()
+        papers = index.search(args.query, args.limit)
+        searched = time.time()
+        for paper in papers:
+            print(f"{paper['paperId']}  {paper.get('year') or '----'}  {paper['title']}")
+        print(f"\nOpened in {(opened - started) * 1000:.1f} ms, searched in {(searched - opened) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Semantic Scholar Graph API clients: asynchronous for the async tool paths,
+and batched paper lookups for both.
+
+The `semanticscholar` package only offers blocking calls, which stall the
+event loop and with it every discussion running on it. These clients talk
+to the API with httpx instead. One async client exists per API key and event loop
+(httpx connections cannot be shared across loops), with a pooled
+connection and a bound on the requests in flight. Rate-limited and failed
+requests are retried with exponential backoff, honoring `Retry-After`.
+
+Many papers are looked up with one `/paper/batch` request per
+`BATCH_SIZE` ids instead of one request per paper.
+
+`SEMANTIC_SCHOLAR_MAX_CONCURRENCY` sets the bound (default 4).
+"""
+
+import asyncio
+import os
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+from agentverse.logging import logger
+
+S2_API_URL = "https://api.semanticscholar.org/graph/v1"
+S2_MAX_CONCURRENCY_ENV = "SEMANTIC_SCHOLAR_MAX_CONCURRENCY"
+RETRY_STATUS = (429, 500, 502, 503, 504)
+TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+# Most ids the batch endpoint accepts in one request
+BATCH_SIZE = 500
+
+
+def _headers(api_key: Optional[str]) -> Dict[str, str]:
+    return {"x-api-key": api_key} if api_key else {}
+
+
+def _retry_delay(response: httpx.Response, attempt: int, max_retries: int) -> Optional[float]:
+    """Seconds to wait before retrying `response`, None if it is final"""
+    if response.status_code not in RETRY_STATUS or attempt >= max_retries:
+        return None
+    retry_after = response.headers.get("retry-after", "")
+    delay = float(retry_after) if retry_after.isdigit() else 2.0 ** attempt
+    logger.warn(f"Semantic Scholar returned {response.status_code}, retrying in {delay:.0f}s")
+    return delay
+
+
+def _chunks(ids: List[str]) -> List[List[str]]:
+    ids = [paper_id.strip() for paper_id in ids]
+    return [ids[i : i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
+
+
+class SemanticScholarClient:
+    """Blocking batch lookups, for the synchronous tool paths"""
+
+    def __init__(self, api_key: Optional[str] = None, max_retries: int = 4, base_url: str = S2_API_URL):
+        self.max_retries = max_retries
+        self._http = httpx.Client(base_url=base_url, headers=_headers(api_key), timeout=TIMEOUT)
+
+    def _post(self, path: str, params: Dict[str, Any], body: Dict[str, Any]) -> Any:
+        for attempt in range(self.max_retries + 1):
+            response = self._http.post(path, params=params, json=body)
+            delay = _retry_delay(response, attempt, self.max_retries)
+            if delay is not None:
+                time.sleep(delay)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    def get_papers(self, paper_ids: List[str], fields: List[str]) -> List[Optional[Dict]]:
+        """Records of `paper_ids` in their order, None for the ids that are not found"""
+        papers = []
+        for chunk in _chunks(paper_ids):
+            papers.extend(self._post("/paper/batch", {"fields": ",".join(fields)}, {"ids": chunk}))
+        return papers
+
+    def close(self) -> None:
+        self._http.close()
+
+
+class AsyncSemanticScholar:
+    """Paper search and lookup on one event loop"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 4,
+        max_retries: int = 4,
+        base_url: str = S2_API_URL,
+    ):
+        self.max_retries = max_retries
+        self._slots = asyncio.Semaphore(max(1, max_concurrency))
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers=_headers(api_key),
+            limits=httpx.Limits(
+                max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+            ),
+            timeout=TIMEOUT,
+        )
+
+    async def _get(self, path: str, params: Dict[str, Any]) -> Optional[Dict]:
+        """JSON body of a GET request, None if the resource does not exist"""
+        for attempt in range(self.max_retries + 1):
+            async with self._slots:
+                response = await self._http.get(path, params=params)
+            if response.status_code == 404:
+                return None
+            delay = _retry_delay(response, attempt, self.max_retries)
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def _post(self, path: str, params: Dict[str, Any], body: Dict[str, Any]) -> Any:
+        for attempt in range(self.max_retries + 1):
+            async with self._slots:
+                response = await self._http.post(path, params=params, json=body)
+            delay = _retry_delay(response, attempt, self.max_retries)
+            if delay is not None:
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    async def search_paper(self, query: str, limit: int, fields: List[str]) -> List[Dict]:
+        """Raw records of the papers matching `query`, as `raw_data` of the sync client"""
+        body = await self._get(
+            "/paper/search", {"query": query, "limit": limit, "fields": ",".join(fields)}
+        )
+        return [paper for paper in (body or {}).get("data") or [] if paper]
+
+    async def get_paper(self, paper_id: str, fields: List[str]) -> Optional[Dict]:
+        return await self._get(
+            f"/paper/{quote(paper_id.strip(), safe=':')}", {"fields": ",".join(fields)}
+        )
+
+    async def get_papers(self, paper_ids: List[str], fields: List[str]) -> List[Optional[Dict]]:
+        """Records of `paper_ids` in their order, None for the ids that are not found"""
+        params = {"fields": ",".join(fields)}
+        chunks = await asyncio.gather(
+            *[self._post("/paper/batch", params, {"ids": chunk}) for chunk in _chunks(paper_ids)]
+        )
+        return [paper for chunk in chunks for paper in chunk]
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+_lock = threading.Lock()
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncSemanticScholar]]" = (
+    weakref.WeakKeyDictionary()
+)
+_sync_clients: Dict[str, SemanticScholarClient] = {}
+
+
+def get_s2_client(api_key: Optional[str] = None) -> SemanticScholarClient:
+    """Return the process-wide blocking client for `api_key`"""
+    with _lock:
+        client = _sync_clients.get(api_key or "")
+        if client is None:
+            client = _sync_clients[api_key or ""] = SemanticScholarClient(api_key)
+    return client
+
+
+def get_async_s2_client(api_key: Optional[str] = None) -> AsyncSemanticScholar:
+    """Return the client for `api_key` on the running event loop"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _clients.setdefault(loop, {})
+        client = clients.get(api_key or "")
+        if client is None:
+            client = AsyncSemanticScholar(
+                api_key, max_concurrency=int(os.environ.get(S2_MAX_CONCURRENCY_ENV, 4))
+            )
+            clients[api_key or ""] = client
+    return client
+
+
+async def aclose_s2_clients() -> None:
+    """Close the clients bound to the running event loop, before it shuts down"""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _clients.pop(loop, {})
+    for client in clients.values():
+        await client.aclose()
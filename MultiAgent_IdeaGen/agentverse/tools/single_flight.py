@@ -0,0 +1,98 @@
+"""
+Coalescing of identical concurrent requests ("single flight").
+
+The literature cache is only filled once a response arrives, so agents or
+discussions asking the same question at the same moment would all go to the
+network. With a `SingleFlight` group, the first caller of a key runs the
+request and the callers arriving while it is in flight wait for its result
+(or its exception) instead. Threads share calls made with `do`, coroutines
+on one event loop share calls made with `ado`; separate processes are
+served by the persistent cache.
+"""
+
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict
+
+from agentverse.tracing import current_span
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one call per key at a time, concurrent callers share its outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            current_span().set(coalesced=True)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self.calls += 1
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                # A task of its own, so a cancelled caller does not cancel the others
+                task = tasks[key] = loop.create_task(fn())
+                task.add_done_callback(lambda _: self._forget(tasks, key, task))
+                self.executions += 1
+            else:
+                self.coalesced += 1
+                current_span().set(coalesced=True)
+        return await asyncio.shield(task)
+
+    def _forget(self, tasks: Dict[str, asyncio.Task], key: str, task: asyncio.Task) -> None:
+        with self._lock:
+            if tasks.get(key) is task:
+                del tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved, the callers that awaited it got it
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,285 @@
+"""
+Structured traces of simulation runs.
+
+While a `Tracer` is active, the environment, the agents and the LLMs open
+nested spans: one per turn, per agent step, per LLM call and per tool call.
+Every finished span is written as one JSON line (name, ids, start time,
+duration and attributes such as the agent, the token counts, the cost, the
+time spent waiting for the rate limiter or the time to first token), and the
+tracer aggregates them into a summary at the end of the run.
+
+The active tracer and span are held in context variables, so the concurrent
+agents of a turn and the simulations sharing an event loop each nest their
+spans correctly. Without an active tracer, `span` and `current_span` cost
+next to nothing.
+
+Tracing is enabled by `Simulation.trace_path`, or for every simulation by
+setting `AGENTVERSE_TRACE_DIR` to a directory that receives one file per run.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+TRACE_DIR_ENV = "AGENTVERSE_TRACE_DIR"
+
+# Attributes a span takes from its parent, so that e.g. an LLM call knows its agent
+INHERITED_ATTRIBUTES = ("turn", "agent")
+
+
+class Span:
+    """An open span, whose attributes can be set until it is finished"""
+
+    __slots__ = ("name", "span_id", "parent_id", "attributes", "start")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = {}
+        if parent is not None:
+            for key in INHERITED_ATTRIBUTES:
+                if key in parent.attributes:
+                    self.attributes[key] = parent.attributes[key]
+        self.attributes.update(attributes)
+        self.start = time.time()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def add(self, key: str, value: float) -> None:
+        """Accumulate a numeric attribute, e.g. over the retries of a call"""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+
+class _NoopSpan:
+    """Stands in for a span when nothing is traced"""
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def add(self, key: str, value: float) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_tracer: ContextVar[Optional["Tracer"]] = ContextVar("agentverse_tracer", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("agentverse_span", default=None)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+
+def _latency_stats(durations: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(durations),
+        "total_ms": round(sum(durations), 1),
+        "p50_ms": round(_percentile(durations, 50), 1),
+        "p95_ms": round(_percentile(durations, 95), 1),
+        "max_ms": round(max(durations, default=0.0), 1),
+    }
+
+
+class Tracer:
+    """Collects the spans of one run and appends them to a JSONL file, if given"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._file = None
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        if self.path is None:
+            return
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        # Flushed per span, so the trace of a crashed run is complete up to the crash
+        self._file.flush()
+
+    def finish(self, span: Span, duration: float, error: Optional[str] = None) -> None:
+        record = {
+            "trace": self.trace_id,
+            "span": span.span_id,
+            "parent": span.parent_id,
+            "name": span.name,
+            "start": round(span.start, 6),
+            "duration_ms": round(duration * 1000.0, 3),
+            "attributes": span.attributes,
+        }
+        if error is not None:
+            record["error"] = error
+        with self._lock:
+            self.records.append(record)
+            self._write(record)
+
+    def write_summary(self, summary: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write({"trace": self.trace_id, "name": "summary", "summary": summary})
+
+    def summary(self) -> Dict[str, Any]:
+        """Latency, token and cost totals of the finished spans"""
+        with self._lock:
+            records = list(self.records)
+        latency: Dict[str, List[float]] = {}
+        for record in records:
+            latency.setdefault(record["name"], []).append(record["duration_ms"])
+
+        agents: Dict[str, Dict[str, Any]] = {}
+        tools: Dict[str, Dict[str, Any]] = {}
+        for record in records:
+            attributes = record["attributes"]
+            if record["name"] in ("llm_call", "agent_step"):
+                agent = agents.setdefault(
+                    attributes.get("agent", ""),
+                    {
+                        "calls": 0,
+                        "cached": 0,
+                        "errors": 0,
+                        "retries": 0,
+                        "prompt_tokens": 0,
+                        "completion_tokens": 0,
+                        "cost": 0.0,
+                        "latency_ms": 0.0,
+                        "queue_wait_ms": 0.0,
+                        "ttft_ms": [],
+                    },
+                )
+            if record["name"] == "agent_step":
+                agent["retries"] += attributes.get("retries", 0)
+            elif record["name"] == "llm_call":
+                agent["calls"] += 1
+                agent["cached"] += int(bool(attributes.get("cached")))
+                agent["errors"] += int("error" in record)
+                agent["prompt_tokens"] += attributes.get("prompt_tokens", 0)
+                agent["completion_tokens"] += attributes.get("completion_tokens", 0)
+                agent["cost"] += attributes.get("cost", 0.0)
+                agent["latency_ms"] += record["duration_ms"]
+                agent["queue_wait_ms"] += attributes.get("queue_wait_ms", 0.0)
+                if "ttft_ms" in attributes:
+                    agent["ttft_ms"].append(attributes["ttft_ms"])
+            elif record["name"] == "tool_call":
+                tool = tools.setdefault(attributes.get("tool", ""), {"durations": [], "errors": 0})
+                tool["durations"].append(record["duration_ms"])
+                tool["errors"] += int("error" in record)
+
+        for agent in agents.values():
+            ttft = agent.pop("ttft_ms")
+            if ttft:
+                agent["ttft_p50_ms"] = round(_percentile(ttft, 50), 1)
+            agent["cost"] = round(agent["cost"], 6)
+            agent["latency_ms"] = round(agent["latency_ms"], 1)
+            agent["queue_wait_ms"] = round(agent["queue_wait_ms"], 1)
+
+        return {
+            "trace": self.trace_id,
+            "spans": {name: _latency_stats(values) for name, values in latency.items()},
+            "agents": agents,
+            "tools": {
+                name: dict(_latency_stats(tool["durations"]), errors=tool["errors"])
+                for name, tool in tools.items()
+            },
+            "prompt_tokens": sum(a["prompt_tokens"] for a in agents.values()),
+            "completion_tokens": sum(a["completion_tokens"] for a in agents.values()),
+            "cost": round(sum(a["cost"] for a in agents.values()), 6),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Human-readable version of `Tracer.summary`"""
+    lines = [
+        f"Trace {summary['trace']}: {summary['prompt_tokens']} prompt + "
+        f"{summary['completion_tokens']} completion tokens, ${summary['cost']:.4f}"
+    ]
+    for name, stats in summary["spans"].items():
+        lines.append(
+            f"  {name:<12} n={stats['count']:<4} total={stats['total_ms'] / 1000:.1f}s "
+            f"p50={stats['p50_ms']:.0f}ms p95={stats['p95_ms']:.0f}ms max={stats['max_ms']:.0f}ms"
+        )
+    for name, agent in summary["agents"].items():
+        line = (
+            f"  {name or '(no agent)'}: {agent['calls']} LLM calls"
+            f" ({agent['cached']} cached, {agent['errors']} failed,"
+            f" {agent['retries']} retries), {agent['prompt_tokens']}+"
+            f"{agent['completion_tokens']} tokens, ${agent['cost']:.4f},"
+            f" {agent['latency_ms'] / 1000:.1f}s in calls,"
+            f" {agent['queue_wait_ms'] / 1000:.1f}s queued"
+        )
+        if "ttft_p50_ms" in agent:
+            line += f", ttft p50 {agent['ttft_p50_ms']:.0f}ms"
+        lines.append(line)
+    for name, tool in summary["tools"].items():
+        lines.append(
+            f"  tool {name}: n={tool['count']} p50={tool['p50_ms']:.0f}ms"
+            f" max={tool['max_ms']:.0f}ms errors={tool['errors']}"
+        )
+    return "\n".join(lines)
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+
+def current_span():
+    """The innermost open span, or a no-op stand-in when nothing is traced"""
+    if _current_tracer.get() is None:
+        return _NOOP_SPAN
+    current = _current_span.get()
+    return current if current is not None else _NOOP_SPAN
+
+
+@contextlib.contextmanager
+def tracing(tracer: Tracer) -> Iterator[Tracer]:
+    """Trace the block (and the tasks it starts) with `tracer`"""
+    tracer_token = _current_tracer.set(tracer)
+    span_token = _current_span.set(None)
+    try:
+        yield tracer
+    finally:
+        _current_span.reset(span_token)
+        _current_tracer.reset(tracer_token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Time the block as a span named `name`, nested in the current one.
+
+    Works in coroutines too: the span stays current across the awaits of
+    the block, and tasks started inside it are nested in it.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield _NOOP_SPAN
+        return
+    opened = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(opened)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield opened
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        tracer.finish(opened, time.perf_counter() - started, error)
@@ -1,5 +1,7 @@
-from typing import NamedTuple, Union
+from typing import Any, Mapping, NamedTuple, Optional, Tuple, Union
 from enum import Enum
+from functools import lru_cache
+from string import Template
 
 import abc
 
@@ -61,3 +63,37 @@ class Singleton(abc.ABCMeta, type):
         if cls not in cls._instances:
             cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
         return cls._instances[cls]
+
+
+@lru_cache(maxsize=256)
+def compile_template(template: str) -> Tuple[Tuple[str, Optional[str], str], ...]:
+    """Split a string.Template into static segments and placeholders.
+
+    Returns (literal text, placeholder name, placeholder source) triples; the
+    last one has no placeholder. "$$" and a lone "$" are folded into the text.
+    """
+    parts = []
+    literal = []
+    last = 0
+    for match in Template.pattern.finditer(template):
+        literal.append(template[last : match.start()])
+        last = match.end()
+        name = match.group("named") or match.group("braced")
+        if name is None:
+            literal.append("$" if match.group("escaped") is not None else match.group())
+            continue
+        parts.append(("".join(literal), name, match.group()))
+        literal = []
+    literal.append(template[last:])
+    parts.append(("".join(literal), None, ""))
+    return tuple(parts)
+
+
+def fill_template(template: str, mapping: Mapping[str, Any]) -> str:
+    """Same as Template(template).safe_substitute(mapping), parsing the template once"""
+    pieces = []
+    for literal, name, placeholder in compile_template(template):
+        pieces.append(literal)
+        if name is not None:
+            pieces.append(str(mapping[name]) if name in mapping else placeholder)
+    return "".join(pieces)
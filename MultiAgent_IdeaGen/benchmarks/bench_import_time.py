@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark of the agentverse entry points.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the wall-clock time, the slowest imports by cumulative time, and
+which heavy optional dependencies were loaded. Those should only be
+imported when a configuration builds something that needs them.
+
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --module agentverse.simulation --budget 1.0
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+HEAVY_MODULES = [
+    "langchain",
+    "openai",
+    "httpx",
+    "numpy",
+    "faiss",
+    "tiktoken",
+    "transformers",
+    "semanticscholar",
+]
+
+# import time: self [us] | cumulative | imported package
+_LINE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def import_once(module: str) -> Tuple[float, List[Tuple[int, str]]]:
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        errors = [l for l in process.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(errors[-10:]))
+    imports = []
+    for line in process.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            imports.append((int(match.group(2)), match.group(4)))
+    return elapsed, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import time of agentverse")
+    parser.add_argument("--module", default="agentverse.simulation")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Exit with status 1 if the median import takes longer (seconds)")
+    args = parser.parse_args()
+
+    times = []
+    cumulative: Dict[str, int] = {}
+    for _ in range(args.repeat):
+        elapsed, imports = import_once(args.module)
+        times.append(elapsed)
+        cumulative = {name: us for us, name in imports}
+    times.sort()
+    median = times[len(times) // 2]
+
+    print(f"import {args.module}: median {median:.3f} s over {args.repeat} runs "
+          f"(min {times[0]:.3f} s, interpreter start included)")
+    print("\nSlowest imports by cumulative time (last run):")
+    for name, us in sorted(cumulative.items(), key=lambda x: -x[1])[: args.top]:
+        print(f"  {us / 1000:9.1f} ms  {name}")
+    heavy = [m for m in HEAVY_MODULES if m in cumulative]
+    print(f"\nHeavy dependencies imported: {', '.join(heavy) if heavy else 'none'}")
+
+    if args.budget is not None and median > args.budget:
+        print(f"\nOver budget: {median:.3f} s > {args.budget:.3f} s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
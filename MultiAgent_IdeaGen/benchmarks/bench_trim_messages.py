@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the history trimming path of ChatHistoryMemory.
+
+Compares the previous implementation of add_history_upto_token_limit and
+trim_messages (list.insert(0, ...) and `msg not in chain` membership tests)
+with the current index-based one, on synthetic histories of 1k and 10k
+messages. Token counts are warmed up first, so the timings show the cost of
+trimming itself rather than of the tokenizer.
+
+    python benchmarks/bench_trim_messages.py --sizes 1000 10000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agentverse.llms.utils import count_message_tokens
+from agentverse.memory.chat_history import ChatHistoryMemory, add_history_upto_token_limit
+
+MODEL = "gpt-4"
+
+
+class NoSummaryMemory(ChatHistoryMemory):
+    # Only the trimming is measured, not the summarization call
+    async def update_running_summary(self, new_events, model="", max_summary_length=None):
+        return self.summary_message()
+
+
+def legacy_add_history_upto_token_limit(
+    prompt: List[dict], history: List[dict], t_limit: int, model: str
+) -> List[Dict]:
+    limit_reached = False
+    current_prompt_length = 0
+    trimmed_messages: List[Dict] = []
+    for message in history[::-1]:
+        token_to_add = count_message_tokens(message, model)
+        if current_prompt_length + token_to_add > t_limit:
+            limit_reached = True
+
+        if not limit_reached:
+            prompt.insert(0, message)
+            current_prompt_length += token_to_add
+        else:
+            trimmed_messages.insert(0, message)
+    return trimmed_messages
+
+
+def legacy_trim_selection(current_message_chain: List[Dict], history: List[Dict]):
+    new_messages_not_in_chain = [
+        msg for msg in history if msg not in current_message_chain
+    ]
+    last_message = new_messages_not_in_chain[-1]
+    return new_messages_not_in_chain, history.index(last_message)
+
+
+def make_history(n: int) -> List[Dict]:
+    return [
+        {
+            "role": "assistant",
+            "content": f"[Agent {i % 5}]: turn {i} of the discussion about idea {i % 97}",
+        }
+        for i in range(n)
+    ]
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(n: int, keep_fraction: float, repeat: int) -> None:
+    history = make_history(n)
+    counts = [count_message_tokens(m, MODEL) for m in history]  # warm the caches
+    t_limit = int(sum(counts) * keep_fraction)
+
+    legacy_fill = timed(
+        lambda: legacy_add_history_upto_token_limit([], history, t_limit, MODEL), repeat
+    )
+    new_fill = timed(lambda: add_history_upto_token_limit([], history, t_limit, MODEL), repeat)
+
+    chain: List[Dict] = []
+    add_history_upto_token_limit(chain, history, t_limit, MODEL)
+    legacy_trim = timed(lambda: legacy_trim_selection(chain, history), 1)
+    memory = NoSummaryMemory()
+    loop = asyncio.new_event_loop()
+    new_trim = timed(
+        lambda: loop.run_until_complete(memory.trim_messages(list(chain), MODEL, history)),
+        1,
+    )
+    loop.close()
+
+    print(f"{n:>7} messages, keeping {keep_fraction:.0%} of the tokens")
+    print(f"  add_history_upto_token_limit  legacy {legacy_fill:9.2f} ms   "
+          f"now {new_fill:9.2f} ms")
+    print(f"  trim_messages selection       legacy {legacy_trim:9.2f} ms   "
+          f"now {new_trim:9.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chat history trimming")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--keep", type=float, default=0.5,
+                        help="Fraction of the history tokens that fits the limit")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for n in args.sizes:
+        run(n, args.keep, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import importlib
+import importlib.util
+import os
+import sys
+
+AGENTVERSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agentverse")
+
+
+def load_module(name: str):
+    """Import an agentverse module that only needs the standard library.
+
+    The agentverse package itself needs its requirements (pydantic, ...), so
+    when they are not installed the module is loaded from its file instead,
+    e.g. load_module("agentverse.llms.utils.rate_limiter"). Its agentverse
+    imports must have been loaded this way first.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        pass
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    path = os.path.join(AGENTVERSE_DIR, *name.split(".")[1:]) + ".py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+class FakeClock:
+    """Stands in for the `time` module of the module under test"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
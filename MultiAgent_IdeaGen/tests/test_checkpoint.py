@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("openai")
+
+import yaml
+
+from agentverse.checkpoint import environment_state, restore_environment
+from agentverse.message import Message
+from agentverse.simulation import Simulation
+
+TASKS_DIR = os.path.join(os.path.dirname(__file__), "..", "agentverse", "tasks", "simulation")
+TASKS = sorted(
+    task
+    for task in os.listdir(TASKS_DIR)
+    if os.path.isfile(os.path.join(TASKS_DIR, task, "config.yaml"))
+)
+
+
+def build(task: str) -> Simulation:
+    with open(os.path.join(TASKS_DIR, task, "config.yaml"), encoding="utf-8") as f:
+        content = f.read()
+    content = content.replace("{topic}", "Sparse Attention").replace("{topic_lower}", "sparse attention")
+    return Simulation.from_config(yaml.safe_load(content), task)
+
+
+def fill_memories(simulation: Simulation) -> None:
+    """Give every agent a memory of its own length"""
+    for i, agent in enumerate(simulation.environment.agents):
+        agent.memory.add_message(
+            [Message(content=f"{agent.name} #{i}: {j}", sender=agent.name) for j in range(i + 1)]
+        )
+
+
+def memories(simulation: Simulation):
+    return [[m.content for m in agent.memory.messages] for agent in simulation.environment.agents]
+
+
+@pytest.mark.parametrize("task", TASKS)
+def test_checkpoint_round_trip(task):
+    simulation = build(task)
+    fill_memories(simulation)
+    names = [agent.name for agent in simulation.environment.agents]
+    # The bundled configs reuse a discussion agent's name for the final tool agent
+    assert len(set(names)) < len(names)
+
+    state = json.loads(json.dumps(environment_state(simulation.environment)))
+    restored = build(task)
+    restore_environment(restored.environment, state)
+
+    assert memories(restored) == memories(simulation)
+
+
+def test_restore_rejects_other_agents():
+    simulation = build("Horizontal_Collaboration")
+    state = environment_state(simulation.environment)
+    state["agents"][0]["name"] = "Someone Else"
+    with pytest.raises(ValueError):
+        restore_environment(build("Horizontal_Collaboration").environment, state)
+
+
+@pytest.mark.parametrize("task", TASKS)
+def test_fork_children_start_from_parent_memories(task):
+    simulation = build(task)
+    fill_memories(simulation)
+
+    children = simulation.fork(2)
+
+    for child in children:
+        assert memories(child) == memories(simulation)
+        for agent, parent in zip(child.environment.agents, simulation.environment.agents):
+            # The messages are shared, the memories are not
+            assert agent.memory.messages is not parent.memory.messages
+            assert all(a is b for a, b in zip(agent.memory.messages, parent.memory.messages))
@@ -0,0 +1,96 @@
+import pytest
+
+from conftest import FakeClock, load_module
+
+literature_cache = load_module("agentverse.tools.literature_cache")
+
+DAY = 24 * 60 * 60.0
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(literature_cache, "time", clock)
+    return clock
+
+
+def test_query_spellings_share_a_key():
+    key = literature_cache.make_literature_key("s2-search", query="Sparse Attention", limit=10)
+    for query in ["sparse   attention", '"SPARSE ATTENTION".', "Ｓparse attention\n"]:
+        assert key == literature_cache.make_literature_key("s2-search", query=query, limit=10)
+    assert key != literature_cache.make_literature_key("s2-search", query="Sparse Attention", limit=20)
+    assert key != literature_cache.make_literature_key("openalex", query="Sparse Attention", limit=10)
+
+
+def test_put_then_get_round_trips_json(clock):
+    cache = literature_cache.LiteratureCache()
+    value = {"total": 1, "data": [{"paperId": "p1", "title": "Sparse attention"}]}
+    cache.put("search", "k", value)
+    assert cache.get("search", "k") == value
+    # Kinds do not share keys
+    assert cache.get("paper", "k", default="missing") == "missing"
+    assert (cache.hits, cache.misses, cache.writes) == (1, 1, 1)
+
+
+def test_entries_expire_after_the_ttl_of_their_kind(clock):
+    cache = literature_cache.LiteratureCache(ttl={"search": DAY})
+    cache.put("search", "k", [1])
+    cache.put("paper", "k", [2])
+    clock.sleep(DAY - 1)
+    assert cache.get("search", "k") == [1]
+    clock.sleep(2)
+    assert cache.get("search", "k") is None
+    assert cache.expired == 1
+    # Kinds without a TTL never expire
+    clock.sleep(365 * DAY)
+    assert cache.get("paper", "k") == [2]
+    assert cache._total_bytes == cache._size()
+
+
+def test_purge_expired_deletes_only_the_expired(clock):
+    cache = literature_cache.LiteratureCache(ttl={"search": DAY, "paper": 30 * DAY})
+    cache.put("search", "old", [1])
+    cache.put("paper", "old", [1])
+    clock.sleep(2 * DAY)
+    cache.put("search", "new", [2])
+    assert cache.purge_expired() == 1
+    assert cache.get("search", "new") == [2]
+    assert cache.get("paper", "old") == [1]
+    assert cache.stats()["kinds"] == {
+        "search": {"entries": 1, "bytes": 3},
+        "paper": {"entries": 1, "bytes": 3},
+    }
+
+
+def test_eviction_drops_the_least_recently_used(clock):
+    cache = literature_cache.LiteratureCache(max_bytes=100)
+    for key in "abcd":
+        cache.put("paper", key, "x" * 18)  # 20 bytes as JSON
+        clock.sleep(1.0)
+    assert cache.get("paper", "a") is not None
+    clock.sleep(1.0)
+    cache.put("search", "e", "x" * 28)
+
+    assert cache.get("paper", "b") is None
+    assert cache.get("paper", "a") is not None
+    assert cache.evictions == 1
+    assert cache._total_bytes == cache._size() <= 100 * literature_cache.EVICT_TO
+
+
+def test_cache_file_is_shared(tmp_path):
+    path = str(tmp_path / "literature.sqlite")
+    literature_cache.LiteratureCache(path).put("paper", "p1", {"title": "t"})
+    assert literature_cache.LiteratureCache(path).get("paper", "p1") == {"title": "t"}
+
+
+def test_cache_is_configured_by_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(literature_cache.LITERATURE_CACHE_ENV, "off")
+    assert literature_cache.get_literature_cache().path == literature_cache.MEMORY
+
+    path = str(tmp_path / "literature.sqlite")
+    monkeypatch.setenv(literature_cache.LITERATURE_CACHE_ENV, path)
+    monkeypatch.setenv(literature_cache.SEARCH_TTL_DAYS_ENV, "1")
+    cache = literature_cache.get_literature_cache()
+    assert cache.path == path
+    assert cache.ttl["search"] == DAY
+    assert literature_cache.get_literature_cache() is cache
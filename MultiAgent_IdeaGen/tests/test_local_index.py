@@ -0,0 +1,97 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+local_index = pytest.importorskip("agentverse.tools.local_index")
+
+PAPERS = [
+    {
+        "paperId": "p1",
+        "title": "Sparse attention with learned routing",
+        "abstract": "Routing tokens to clusters makes attention sparse and fast.",
+        "authors": ["Ada Lovelace"],
+        "year": 2021,
+        "externalIds": {"DOI": "10.1000/Sparse.1", "ArXiv": "2101.00001"},
+    },
+    {
+        "paperId": "p2",
+        "title": "Mixture of experts for long context retrieval",
+        "abstract": "Experts retrieve passages from long documents.",
+        "authors": [{"name": "Alan Turing"}],
+        "year": 2022,
+    },
+    {
+        "paperId": "p3",
+        "title": "Curriculum learning over synthetic proofs",
+        "abstract": "Proofs of increasing depth; attention is not needed.",
+        "year": 2023,
+    },
+    # Skipped: no title
+    {"paperId": "p4", "abstract": "An untitled paper."},
+]
+
+
+def write_dump(tmp_path) -> str:
+    path = str(tmp_path / "papers.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for paper in PAPERS:
+            f.write(json.dumps(paper) + "\n")
+    return path
+
+
+@pytest.fixture
+def index(tmp_path):
+    output = str(tmp_path / "index")
+    local_index.build_index([write_dump(tmp_path)], output)
+    index = local_index.LocalPaperIndex(output)
+    yield index
+    index.close()
+
+
+def test_search_ranks_the_matching_paper_first(index):
+    assert index.meta["num_docs"] == 3
+    assert [paper["paperId"] for paper in index.search("sparse attention routing")][0] == "p1"
+    assert [paper["paperId"] for paper in index.search("long context experts", limit=1)] == ["p2"]
+    assert index.search("quantum chromodynamics") == []
+    assert index.search("attention", limit=0) == []
+
+
+def test_papers_are_found_by_id_and_external_ids(index):
+    assert index.get_paper("p2")["authors"] == [{"name": "Alan Turing"}]
+    assert index.get_paper(" DOI:10.1000/SPARSE.1 ")["paperId"] == "p1"
+    assert index.get_paper("arxiv:2101.00001")["paperId"] == "p1"
+    assert index.get_paper("p4") is None
+    assert [paper and paper["paperId"] for paper in index.get_papers(["p3", "missing", "p1"])] == [
+        "p3",
+        None,
+        "p1",
+    ]
+
+
+def test_spilled_runs_merge_into_the_same_index(tmp_path):
+    dump = write_dump(tmp_path)
+    single = str(tmp_path / "single")
+    spilled = str(tmp_path / "spilled")
+    local_index.build_index([dump], single)
+    # A run per paper
+    local_index.build_index([dump], spilled, run_postings=1)
+
+    assert not os.path.exists(os.path.join(spilled, "runs"))
+    for name in ["terms", "offsets", "postings_doc", "postings_tf", "doc_len", "keys", "key_doc"]:
+        expected = np.load(os.path.join(single, f"{name}.npy"))
+        np.testing.assert_array_equal(np.load(os.path.join(spilled, f"{name}.npy")), expected)
+
+
+def test_empty_dump_builds_an_empty_index(tmp_path):
+    dump = tmp_path / "empty.jsonl"
+    dump.write_text("")
+    output = str(tmp_path / "index")
+    meta = local_index.build_index([str(dump)], output)
+    assert (meta["num_docs"], meta["num_terms"]) == (0, 0)
+
+    index = local_index.LocalPaperIndex(output)
+    assert index.search("attention") == []
+    assert index.get_paper("p1") is None
+    index.close()
@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+
+import pytest
+
+novelty = pytest.importorskip("agentverse.environments.simulation_env.rules.terminator.novelty")
+
+from agentverse.memory.transcript import Transcript
+from agentverse.message import Message
+
+IDEAS = [
+    "sparse attention with learned routing between token clusters",
+    "mixture of experts layers for long context retrieval",
+    "curriculum learning over synthetic proofs of increasing depth",
+    "contrastive pretraining of protein and text encoders jointly",
+]
+
+
+def environment():
+    return SimpleNamespace(transcript=Transcript(), cnt_turn=0)
+
+
+def play(terminator, env, *contents) -> bool:
+    """Run one turn in which each content is said by an agent"""
+    for content in contents:
+        env.transcript.append(Message(content=content, sender="agent"))
+    converged = terminator.is_converged(env)
+    env.cnt_turn += 1
+    return converged
+
+
+def test_novel_turns_do_not_converge():
+    terminator = novelty.NoveltyTerminator()
+    env = environment()
+    for idea in IDEAS:
+        assert not play(terminator, env, idea)
+        assert terminator.last_novelty == 1.0
+    assert terminator.stale_turns == 0
+
+
+def test_repeated_turns_converge_after_the_patience():
+    terminator = novelty.NoveltyTerminator(patience=2, min_turns=0)
+    env = environment()
+    assert not play(terminator, env, IDEAS[0])
+    assert not play(terminator, env, IDEAS[0])
+    assert terminator.last_novelty == 0.0
+    assert play(terminator, env, IDEAS[0])
+    # A novel turn restarts the count
+    assert not play(terminator, env, IDEAS[1])
+    assert terminator.stale_turns == 0
+
+
+def test_silent_turns_count_as_repetitive():
+    terminator = novelty.NoveltyTerminator(patience=1, min_turns=0)
+    env = environment()
+    env.transcript.append(Message(content=IDEAS[0], sender=""))
+    assert play(terminator, env)
+
+
+def test_min_turns_are_always_run():
+    terminator = novelty.NoveltyTerminator(patience=1, min_turns=3)
+    env = environment()
+    results = [play(terminator, env, IDEAS[0]) for _ in range(4)]
+    assert results == [False, False, False, True]
+
+
+def test_reset_forgets_the_transcript():
+    terminator = novelty.NoveltyTerminator(patience=1, min_turns=0)
+    env = environment()
+    play(terminator, env, IDEAS[0])
+    terminator.reset()
+    assert (terminator.processed, terminator.stale_turns) == (0, 0)
+
+    env = environment()
+    assert not play(terminator, env, IDEAS[0])
+    assert terminator.last_novelty == 1.0
+
+
+def test_restored_terminator_rebuilds_what_it_has_seen():
+    terminator = novelty.NoveltyTerminator(patience=1, min_turns=0)
+    env = environment()
+    play(terminator, env, IDEAS[0])
+    play(terminator, env, IDEAS[1])
+
+    # A checkpoint keeps the fields, not the shingles
+    restored = novelty.NoveltyTerminator(**terminator.dict())
+    assert restored.processed == 2
+    assert play(restored, env, IDEAS[0])
+    assert restored.last_novelty == 0.0
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert novelty.shingles("Sparse attention, again!") == novelty.shingles("sparse ATTENTION again")
+    assert len(novelty.shingles("one two three four")) == 2
+    assert len(novelty.shingles("two words")) == 1
+    assert novelty.shingles("") == set()
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from conftest import FakeClock, load_module
+
+rate_limiter = load_module("agentverse.llms.utils.rate_limiter")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def tokens_level(limiter) -> float:
+    return limiter._buckets["tokens"].level
+
+
+def test_bucket_waits_for_the_deficit(clock):
+    bucket = rate_limiter._Bucket(60)
+    assert bucket.reserve(60, clock.now) == 0.0
+    # 60 per minute refill one per second
+    assert bucket.reserve(30, clock.now) == pytest.approx(30.0)
+    assert bucket.reserve(0, clock.now + 30.0) == 0.0
+
+
+def test_acquire_sleeps_until_the_budget_is_available(clock):
+    limiter = rate_limiter.RateLimiter("test", requests_per_minute=60)
+    assert limiter.acquire() == 0.0
+    for _ in range(59):
+        limiter.acquire()
+    assert limiter.acquire() == pytest.approx(1.0)
+    assert clock.now == pytest.approx(1001.0)
+
+
+def test_settle_returns_the_unused_tokens(clock):
+    limiter = rate_limiter.RateLimiter("test", tokens_per_minute=600)
+    limiter.acquire(500)
+    limiter.settle(500, 120)
+    assert tokens_level(limiter) == pytest.approx(480.0)
+    # Using more than reserved is not charged afterwards
+    limiter.settle(100, 300)
+    assert tokens_level(limiter) == pytest.approx(480.0)
+
+
+def test_settle_of_a_failed_request_returns_the_reservation(clock):
+    limiter = rate_limiter.RateLimiter("test", tokens_per_minute=600)
+    limiter.acquire(500)
+    limiter.settle(500, 0)
+    assert tokens_level(limiter) == pytest.approx(600.0)
+
+
+def test_stricter_limit_keeps_the_bucket_level(clock):
+    limiter = rate_limiter.RateLimiter("test", tokens_per_minute=6000)
+    limiter.acquire(5900)
+    limiter.configure(tokens_per_minute=600)
+    bucket = limiter._buckets["tokens"]
+    assert bucket.capacity == 600.0
+    assert bucket.level == pytest.approx(100.0)
+    # A looser limit does not replace the stricter one
+    limiter.configure(tokens_per_minute=60000)
+    assert bucket.capacity == 600.0
+    assert limiter._reserve(200) == pytest.approx(10.0)
+
+
+def test_cancelled_wait_returns_the_reservation():
+    limiter = rate_limiter.RateLimiter("test", tokens_per_minute=60)
+    limiter.acquire(60)
+
+    async def cancel_waiting():
+        waiting = asyncio.ensure_future(limiter.aacquire(30))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(cancel_waiting())
+    assert tokens_level(limiter) == pytest.approx(0.0, abs=1.0)
+
+
+@pytest.mark.skipif(rate_limiter.fcntl is None, reason="needs fcntl")
+def test_processes_share_the_budget_through_the_state_dir(tmp_path, clock):
+    first = rate_limiter.RateLimiter("shared", tokens_per_minute=600, state_dir=str(tmp_path))
+    second = rate_limiter.RateLimiter("shared", tokens_per_minute=600, state_dir=str(tmp_path))
+    first.acquire(600)
+    assert second._reserve(60) == pytest.approx(6.0)
+    second.settle(60, 0)
+    first.settle(600, 0)
+    assert first._reserve(600) == 0.0
+
+
+def test_limiters_are_shared_per_endpoint(monkeypatch):
+    monkeypatch.delenv(rate_limiter.RATE_LIMIT_DIR_ENV, raising=False)
+    key = rate_limiter.endpoint_key("https://api.example.com/v1/", "key-a")
+    assert key == rate_limiter.endpoint_key("https://api.example.com/v1", "key-a")
+    assert key != rate_limiter.endpoint_key("https://api.example.com/v1", "key-b")
+
+    limiter = rate_limiter.get_rate_limiter(key, requests_per_minute=100)
+    assert rate_limiter.get_rate_limiter(key, requests_per_minute=50) is limiter
+    assert limiter._buckets["requests"].capacity == 50.0
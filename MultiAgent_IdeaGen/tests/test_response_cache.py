@@ -0,0 +1,149 @@
+import pytest
+
+from conftest import FakeClock, load_module
+
+response_cache = load_module("agentverse.llms.utils.response_cache")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache, "time", clock)
+    return clock
+
+
+def test_cache_key_ignores_the_argument_order():
+    key = response_cache.make_cache_key(model="m", temperature=0.7, messages=[{"content": "hi"}])
+    assert key == response_cache.make_cache_key(
+        messages=[{"content": "hi"}], model="m", temperature=0.7
+    )
+    assert key != response_cache.make_cache_key(model="m", temperature=0.0, messages=[{"content": "hi"}])
+
+
+def test_cache_run_is_scoped_to_the_block():
+    assert response_cache.get_cache_run() == ""
+    with response_cache.cache_run("run1"):
+        with response_cache.cache_run("run2"):
+            assert response_cache.get_cache_run() == "run2"
+        assert response_cache.get_cache_run() == "run1"
+    assert response_cache.get_cache_run() == ""
+
+
+def test_put_then_get(tmp_path):
+    cache = response_cache.ResponseCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("a") is None
+    cache.put("a", "response")
+    assert cache.get("a") == "response"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["entries"]) == (1, 1, 1, 1)
+    assert stats["bytes"] == len("response")
+
+
+def test_replay_mode_never_writes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    response_cache.ResponseCache(path).put("a", "recorded")
+    cache = response_cache.ResponseCache(path, mode="replay")
+    assert cache.readonly
+    cache.put("b", "new")
+    assert cache.get("b") is None
+    assert cache.get("a") == "recorded"
+    assert cache.stats()["entries"] == 1
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        response_cache.ResponseCache(str(tmp_path / "cache.sqlite"), mode="write")
+
+
+def test_eviction_drops_the_least_recently_used(tmp_path, clock):
+    cache = response_cache.ResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=100)
+    for key in "abcd":
+        cache.put(key, "x" * 20)
+        clock.sleep(1.0)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") is not None
+    clock.sleep(1.0)
+    cache.put("e", "x" * 30)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("e") is not None
+    assert cache._total_bytes == cache._size() <= 100 * response_cache.EVICT_TO
+    assert cache.evictions == 1
+
+
+def test_replacing_an_entry_keeps_the_running_total(tmp_path):
+    cache = response_cache.ResponseCache(str(tmp_path / "cache.sqlite"))
+    cache.put("a", "x" * 50)
+    cache.put("a", "x" * 10)
+    assert cache._total_bytes == cache._size() == 10
+
+
+def test_cache_is_configured_by_the_environment(tmp_path, monkeypatch):
+    monkeypatch.delenv(response_cache.CACHE_PATH_ENV, raising=False)
+    assert response_cache.get_response_cache() is None
+
+    monkeypatch.setenv(response_cache.CACHE_PATH_ENV, str(tmp_path / "cache.sqlite"))
+    monkeypatch.setenv(response_cache.CACHE_MODE_ENV, "replay")
+    monkeypatch.setenv(response_cache.CACHE_MAX_MB_ENV, "2")
+    cache = response_cache.get_response_cache()
+    assert cache.readonly
+    assert cache.max_bytes == 2 << 20
+    assert response_cache.get_response_cache() is cache
+
+
+def echo_model(**args):
+    """A chat model answering each call with its prompt and the number of calls"""
+    base = pytest.importorskip("agentverse.llms.base")
+
+    class EchoArgs(base.BaseModelArgs):
+        model: str = "echo"
+        temperature: float = 0.7
+
+    class EchoChat(base.BaseChatModel):
+        args: EchoArgs = EchoArgs()
+        calls: int = 0
+
+        def _request_kwargs(self, prompt, max_tokens=None):
+            return dict(
+                model=self.args.model,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=self.args.temperature,
+            )
+
+        def _generate_response(self, prompt, max_tokens=None):
+            self.calls += 1
+            return base.LLMResult(content=f"{prompt} #{self.calls}")
+
+    return EchoChat(args=EchoArgs(**args))
+
+
+def test_model_replays_the_recorded_responses(tmp_path, monkeypatch):
+    model = echo_model(seed=0)
+    monkeypatch.setenv(response_cache.CACHE_PATH_ENV, str(tmp_path / "cache.sqlite"))
+    assert model.generate_response("hi").content == "hi #1"
+    assert model.generate_response("hi").content == "hi #1"
+    assert model.calls == 1
+
+    monkeypatch.setenv(response_cache.CACHE_PATH_ENV, str(tmp_path / "replay.sqlite"))
+    monkeypatch.setenv(response_cache.CACHE_MODE_ENV, "replay")
+    with pytest.raises(response_cache.CacheMissError):
+        model.generate_response("hi")
+    assert model.calls == 1
+
+
+def test_unseeded_samples_are_keyed_by_run(tmp_path, monkeypatch):
+    model = echo_model()
+    monkeypatch.setenv(response_cache.CACHE_PATH_ENV, str(tmp_path / "cache.sqlite"))
+    with response_cache.cache_run("run1"):
+        assert model.generate_response("hi").content == "hi #1"
+    with response_cache.cache_run("run2"):
+        assert model.generate_response("hi").content == "hi #2"
+    with response_cache.cache_run("run1"):
+        assert model.generate_response("hi").content == "hi #1"
+
+    greedy = echo_model(temperature=0.0)
+    with response_cache.cache_run("run1"):
+        greedy.generate_response("hi")
+    with response_cache.cache_run("run2"):
+        assert greedy.generate_response("hi").content == "hi #1"
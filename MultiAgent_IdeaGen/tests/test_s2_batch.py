@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+s2_client = pytest.importorskip("agentverse.tools.s2_client")
+
+BASE_URL = "https://s2.test/graph/v1"
+FIELDS = ["title", "year"]
+# Three chunks: 500, 500 and 201 ids, every third id does not exist
+IDS = [f" missing{i}" if i % 3 == 0 else f"paper{i} " for i in range(2 * s2_client.BATCH_SIZE + 201)]
+
+
+def batch_response(request: "httpx.Request") -> "httpx.Response":
+    assert request.method == "POST"
+    assert request.url.path == "/graph/v1/paper/batch"
+    assert request.url.params["fields"] == "title,year"
+    ids = json.loads(request.content)["ids"]
+    return httpx.Response(
+        200, json=[None if i.startswith("missing") else {"paperId": i} for i in ids]
+    )
+
+
+def expected_papers():
+    return [None if i.startswith(" missing") else {"paperId": i.strip()} for i in IDS]
+
+
+def test_chunks_are_at_most_a_batch_and_stripped():
+    chunks = s2_client._chunks(IDS)
+    assert [len(chunk) for chunk in chunks] == [500, 500, 201]
+    assert [i for chunk in chunks for i in chunk] == [i.strip() for i in IDS]
+    assert s2_client._chunks([]) == []
+
+
+def test_get_papers_posts_one_request_per_chunk():
+    batches = []
+
+    def handler(request):
+        batches.append(json.loads(request.content)["ids"])
+        return batch_response(request)
+
+    client = s2_client.SemanticScholarClient(base_url=BASE_URL)
+    client.close()
+    client._http = httpx.Client(transport=httpx.MockTransport(handler), base_url=BASE_URL)
+
+    assert client.get_papers(IDS, FIELDS) == expected_papers()
+    assert [len(batch) for batch in batches] == [500, 500, 201]
+    assert batches[0][1] == "paper1"
+    client.close()
+
+
+def test_async_get_papers_keeps_the_order_of_the_ids():
+    answered = []
+
+    async def handler(request):
+        ids = json.loads(request.content)["ids"]
+        # The first chunk is answered last
+        await asyncio.sleep(0.02 if ids[0] == "missing0" else 0.0)
+        answered.append(ids)
+        return batch_response(request)
+
+    async def main():
+        client = s2_client.AsyncSemanticScholar(base_url=BASE_URL)
+        await client.aclose()
+        client._http = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url=BASE_URL)
+        try:
+            return await client.get_papers(IDS, FIELDS)
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(main()) == expected_papers()
+    assert sorted(len(batch) for batch in answered) == [201, 500, 500]
+    assert answered[-1][0] == "missing0"
@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("openai")
+
+import yaml
+
+from agentverse.checkpoint import environment_state, restore_environment
+from agentverse.message import Message
+from agentverse.simulation import Simulation
+
+CONFIG = os.path.join(
+    os.path.dirname(__file__), "..", "agentverse", "tasks", "simulation",
+    "Horizontal_Collaboration", "config.yaml",
+)
+
+
+def build() -> Simulation:
+    with open(CONFIG, encoding="utf-8") as f:
+        config = yaml.safe_load(f.read().replace("{topic}", "Sparse Attention"))
+    for agent in config["agents"]:
+        agent["memory"]["memory_type"] = "shared_chat_history"
+    return Simulation.from_config(config, "Horizontal_Collaboration")
+
+
+def namesakes(simulation: Simulation):
+    agents = simulation.environment.agents
+    for i, agent in enumerate(agents):
+        for other in agents[i + 1 :]:
+            if other.name == agent.name:
+                return agent, other
+    pytest.fail("The config has no agents sharing a name")
+
+
+def contents(agent):
+    return [m.content for m in agent.memory.history()]
+
+
+def test_private_messages_are_not_seen_by_namesakes():
+    simulation = build()
+    agent, tool_agent = namesakes(simulation)
+    simulation.environment.transcript.append(Message(content="to all", receiver={"all"}))
+    tool_agent.memory.add_message([Message(content="tool result", sender=tool_agent.name)])
+
+    assert contents(agent) == ["to all"]
+    assert contents(tool_agent) == ["to all", "tool result"]
+
+    state = json.loads(json.dumps(environment_state(simulation.environment)))
+    restored = build()
+    restore_environment(restored.environment, state)
+    agent, tool_agent = namesakes(restored)
+    tool_agent.memory.add_message([Message(content="after restore", sender=tool_agent.name)])
+
+    assert contents(agent) == ["to all"]
+    assert contents(tool_agent) == ["to all", "tool result", "after restore"]
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from conftest import load_module
+
+load_module("agentverse.tracing")
+single_flight = load_module("agentverse.tools.single_flight")
+
+CALLERS = 4
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def run_threads(group, fn):
+    """Start CALLERS threads calling `fn` through the group under one key"""
+    outcomes = [None] * CALLERS
+
+    def call(i):
+        try:
+            outcomes[i] = group.do("key", fn)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_concurrent_threads_share_one_call():
+    group = single_flight.SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def fetch():
+        executions.append(1)
+        release.wait(5.0)
+        return {"data": []}
+
+    threads, outcomes = run_threads(group, fetch)
+    wait_for(lambda: group.stats()["calls"] == CALLERS)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+    assert group.stats() == {"calls": CALLERS, "executions": 1, "coalesced": CALLERS - 1}
+
+
+def test_concurrent_threads_share_the_error():
+    group = single_flight.SingleFlight()
+    release = threading.Event()
+
+    def fetch():
+        release.wait(5.0)
+        raise ConnectionError("rate limited")
+
+    threads, outcomes = run_threads(group, fetch)
+    wait_for(lambda: group.stats()["calls"] == CALLERS)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(outcome, ConnectionError) for outcome in outcomes)
+    assert group.stats()["executions"] == 1
+
+
+def test_calls_after_completion_run_again():
+    group = single_flight.SingleFlight()
+    assert group.do("key", lambda: 1) == 1
+    assert group.do("key", lambda: 2) == 2
+    assert group.stats()["coalesced"] == 0
+
+
+def test_coroutines_share_one_call_per_key():
+    group = single_flight.SingleFlight()
+    executions = []
+
+    async def fetch(key):
+        executions.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    async def main():
+        return await asyncio.gather(
+            *[group.ado(key, lambda key=key: fetch(key)) for key in ["a", "b", "a", "a", "b"]]
+        )
+
+    assert asyncio.run(main()) == ["A", "B", "A", "A", "B"]
+    assert sorted(executions) == ["a", "b"]
+    assert group.stats() == {"calls": 5, "executions": 2, "coalesced": 3}
+
+
+def test_coroutines_share_the_error():
+    group = single_flight.SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("rate limited")
+
+    async def main():
+        return await asyncio.gather(
+            group.ado("key", fetch), group.ado("key", fetch), return_exceptions=True
+        )
+
+    assert [type(outcome) for outcome in asyncio.run(main())] == [ConnectionError] * 2
+    assert group.stats()["executions"] == 1
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    group = single_flight.SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(group.ado("key", fetch))
+        second = asyncio.ensure_future(group.ado("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "result"
+    assert group.stats()["executions"] == 1
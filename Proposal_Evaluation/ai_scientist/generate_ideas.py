@@ -11,6 +11,7 @@ from openai import OpenAI
 sys.path.append('/AI-Scientist')
 
 from ai_scientist.llm import get_response_from_llm, extract_json_between_markers, create_client, AVAILABLE_LLMS
+from ai_scientist.literature_cache import get_literature_cache, make_literature_key
 
 S2_API_KEY = os.getenv("S2_API_KEY")
 # client = OpenAI(base_url="",
@@ -285,12 +286,26 @@ def on_backoff(details):
     )
 
 
-@backoff.on_exception(
-    backoff.expo, requests.exceptions.HTTPError, on_backoff=on_backoff
-)
+_NOT_CACHED = object()
+
+
 def search_for_papers(query, result_limit=10, engine="semanticscholar") -> Union[None, List[Dict]]:
+    """Search the literature through the persistent cache (see literature_cache.py)"""
     if not query:
         return None
+    cache = get_literature_cache()
+    key = make_literature_key(f"{engine}-search", query=query, limit=result_limit)
+    papers = cache.get("search", key, _NOT_CACHED)
+    if papers is _NOT_CACHED:
+        papers = _search_for_papers(query, result_limit, engine)
+        cache.put("search", key, papers)
+    return papers
+
+
+@backoff.on_exception(
+    backoff.expo, requests.exceptions.HTTPError, on_backoff=on_backoff
+)
+def _search_for_papers(query, result_limit=10, engine="semanticscholar") -> Union[None, List[Dict]]:
     if engine == "semanticscholar":
         rsp = requests.get(
             "https://api.semanticscholar.org/graph/v1/paper/search",
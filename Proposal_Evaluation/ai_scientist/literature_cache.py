@@ -0,0 +1,26 @@
+"""
+Persistent cache of literature search results for ai_scientist/generate_ideas.py.
+
+The implementation is agentverse/tools/literature_cache.py of
+MultiAgent_IdeaGen (see shared.py), configured by the same environment
+variables, so both share one cache file:
+
+- `AGENTVERSE_LITERATURE_CACHE`: path of the SQLite file (default
+  `~/.cache/agentverse/literature.sqlite`), `off` keeps it in memory only
+- `AGENTVERSE_LITERATURE_CACHE_MAX_MB`: size bound of the stored entries (default 256)
+- `AGENTVERSE_LITERATURE_SEARCH_TTL_DAYS`: lifetime of search results (default 7)
+- `AGENTVERSE_LITERATURE_PAPER_TTL_DAYS`: lifetime of paper records (default 30)
+"""
+
+from ai_scientist.shared import load_agentverse_module
+
+_shared = load_agentverse_module("tools/literature_cache.py")
+
+LITERATURE_CACHE_ENV = _shared.LITERATURE_CACHE_ENV
+LITERATURE_CACHE_MAX_MB_ENV = _shared.LITERATURE_CACHE_MAX_MB_ENV
+SEARCH_TTL_DAYS_ENV = _shared.SEARCH_TTL_DAYS_ENV
+PAPER_TTL_DAYS_ENV = _shared.PAPER_TTL_DAYS_ENV
+LiteratureCache = _shared.LiteratureCache
+normalize_query = _shared.normalize_query
+make_literature_key = _shared.make_literature_key
+get_literature_cache = _shared.get_literature_cache
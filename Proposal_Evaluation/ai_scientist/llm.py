@@ -1,8 +1,10 @@
+import functools
+import inspect
 import json
 import os
 import re
+import threading
 import time
-# import threading
 
 import anthropic
 import backoff
@@ -10,8 +12,15 @@ import openai
 import google.generativeai as genai
 from google.generativeai.types import GenerationConfig
 
+from ai_scientist.llm_cache import CacheMissError, get_response_cache, make_cache_key
+from ai_scientist.rate_limiter import endpoint_key, estimate_tokens, get_rate_limiter
+
 MAX_NUM_TOKENS = 4096
 
+# Optional per-endpoint budgets. Set AGENTVERSE_RATE_LIMIT_DIR to share them across processes.
+REQUESTS_PER_MINUTE = float(os.environ.get("LLM_REQUESTS_PER_MINUTE", 0)) or None
+TOKENS_PER_MINUTE = float(os.environ.get("LLM_TOKENS_PER_MINUTE", 0)) or None
+
 AVAILABLE_LLMS = [
     # Anthropic models
     "claude-3-5-sonnet-20240620",
@@ -52,8 +61,87 @@ AVAILABLE_LLMS = [
 ]
 
 
+_rate_limit_state = threading.local()
+
+
+def rate_limited(func):
+    """Reserve the endpoint's request and token budget before calling the LLM."""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # Nested calls (batch fallback to single responses) are already accounted for
+        if getattr(_rate_limit_state, "active", False):
+            return func(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        call = bound.arguments
+        client, model = call["client"], call["model"]
+        limiter = get_rate_limiter(
+            endpoint_key(
+                str(getattr(client, "base_url", model)),
+                str(getattr(client, "api_key", "") or ""),
+            ),
+            REQUESTS_PER_MINUTE,
+            TOKENS_PER_MINUTE,
+        )
+        prompt_tokens = estimate_tokens(
+            call["msg"] + call["system_message"] + json.dumps(call["msg_history"] or [], default=str)
+        )
+        reserved = prompt_tokens + MAX_NUM_TOKENS * call.get("n_responses", 1)
+        limiter.acquire(reserved)
+
+        # A failed call gives its whole reservation back
+        used = 0
+        _rate_limit_state.active = True
+        try:
+            content, new_msg_history = func(*args, **kwargs)
+            contents = content if isinstance(content, list) else [content]
+            used = prompt_tokens + sum(estimate_tokens(c or "") for c in contents)
+        finally:
+            _rate_limit_state.active = False
+            limiter.settle(reserved, used)
+        return content, new_msg_history
+
+    return wrapper
+
+
+def cached(func):
+    """Serve identical requests from the on-disk response cache (see llm_cache.py)."""
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = get_response_cache()
+        if cache is None:
+            return func(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        request = {
+            k: v for k, v in bound.arguments.items() if k not in ("client", "print_debug")
+        }
+        key = make_cache_key(function=func.__name__, max_tokens=MAX_NUM_TOKENS, **request)
+        hit = cache.get(key)
+        if hit is not None:
+            content, new_msg_history = json.loads(hit)
+            return content, new_msg_history
+        if cache.readonly:
+            raise CacheMissError(key)
+
+        content, new_msg_history = func(*args, **kwargs)
+        if content is not None:
+            cache.put(key, json.dumps([content, new_msg_history], ensure_ascii=False))
+        return content, new_msg_history
+
+    return wrapper
+
+
 # Get N responses from a single message, used for ensembling.
+@cached
 @backoff.on_exception(backoff.expo, (openai.RateLimitError, openai.APITimeoutError))
+@rate_limited
 def get_batch_responses_from_llm(
         msg,
         client,
@@ -184,7 +272,9 @@ def print_time_interval(start_time):
     #     # time.sleep(60)
 
 
+@cached
 @backoff.on_exception(backoff.expo, (openai.RateLimitError, openai.APITimeoutError))
+@rate_limited
 def get_response_from_llm(
         msg,
         client,
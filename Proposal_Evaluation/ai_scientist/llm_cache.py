@@ -0,0 +1,25 @@
+"""
+Content-addressed on-disk cache of LLM responses for ai_scientist/llm.py.
+
+The implementation is agentverse/llms/utils/response_cache.py of
+MultiAgent_IdeaGen (see shared.py), configured by the same environment
+variables:
+
+- `AGENTVERSE_LLM_CACHE`: path of the SQLite file (unset disables the cache)
+- `AGENTVERSE_LLM_CACHE_MODE`: `readwrite` (default) or `replay`; replay
+  never writes and raises `CacheMissError` instead of calling the API
+- `AGENTVERSE_LLM_CACHE_MAX_MB`: size bound of the stored responses (default 512)
+"""
+
+from ai_scientist.shared import load_agentverse_module
+
+_shared = load_agentverse_module("llms/utils/response_cache.py")
+
+CACHE_PATH_ENV = _shared.CACHE_PATH_ENV
+CACHE_MODE_ENV = _shared.CACHE_MODE_ENV
+CACHE_MAX_MB_ENV = _shared.CACHE_MAX_MB_ENV
+CACHE_MODES = _shared.CACHE_MODES
+CacheMissError = _shared.CacheMissError
+ResponseCache = _shared.ResponseCache
+make_cache_key = _shared.make_cache_key
+get_response_cache = _shared.get_response_cache
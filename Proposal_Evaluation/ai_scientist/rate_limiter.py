@@ -0,0 +1,18 @@
+"""
+Token-bucket rate limiting for the LLM calls in ai_scientist/llm.py.
+
+The implementation is agentverse/llms/utils/rate_limiter.py of
+MultiAgent_IdeaGen (see shared.py), so when both point
+`AGENTVERSE_RATE_LIMIT_DIR` at the same directory, idea generation and
+proposal evaluation share one requests/tokens-per-minute budget per endpoint.
+"""
+
+from ai_scientist.shared import load_agentverse_module
+
+_shared = load_agentverse_module("llms/utils/rate_limiter.py")
+
+RATE_LIMIT_DIR_ENV = _shared.RATE_LIMIT_DIR_ENV
+RateLimiter = _shared.RateLimiter
+endpoint_key = _shared.endpoint_key
+estimate_tokens = _shared.estimate_tokens
+get_rate_limiter = _shared.get_rate_limiter
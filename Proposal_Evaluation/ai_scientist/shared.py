@@ -0,0 +1,48 @@
+"""
+Modules shared with MultiAgent_IdeaGen.
+
+The LLM rate limiter and the response and literature caches have a single
+implementation, in MultiAgent_IdeaGen/agentverse, so that both projects
+agree on the state files and cache keys they share. Those modules only need
+the standard library, so they are loaded from their files, without importing
+the agentverse package and its dependencies. Set `AGENTVERSE_SOURCE_DIR` to
+the `agentverse` directory of another checkout to load them from there.
+"""
+
+import importlib.util
+import os
+import sys
+import threading
+from types import ModuleType
+
+AGENTVERSE_SOURCE_DIR_ENV = "AGENTVERSE_SOURCE_DIR"
+DEFAULT_AGENTVERSE_SOURCE_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "MultiAgent_IdeaGen", "agentverse"
+)
+
+_lock = threading.Lock()
+
+
+def load_agentverse_module(path: str) -> ModuleType:
+    """Load agentverse/<path>, e.g. "llms/utils/rate_limiter.py", once per process"""
+    name = "ai_scientist._shared_" + os.path.splitext(os.path.basename(path))[0]
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        source_dir = os.environ.get(AGENTVERSE_SOURCE_DIR_ENV) or DEFAULT_AGENTVERSE_SOURCE_DIR
+        file_path = os.path.join(source_dir, *path.split("/"))
+        if not os.path.isfile(file_path):
+            raise ImportError(
+                f"{file_path} not found, set {AGENTVERSE_SOURCE_DIR_ENV} to the agentverse "
+                "directory of MultiAgent_IdeaGen"
+            )
+        spec = importlib.util.spec_from_file_location(name, file_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules[name]
+            raise
+        return module